@@ -1,26 +1,44 @@
 import orjson
-from ninja import NinjaAPI, Query
+from ninja import Query, File, UploadedFile
 from ninja.parser import Parser
 from ninja.errors import HttpError
-from ninja.pagination import LimitOffsetPagination, paginate
-from django.shortcuts import get_object_or_404
-from django.http import Http404
+from ninja.pagination import paginate
+from ninja.throttling import AuthRateThrottle
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.db import IntegrityError, transaction
-from django.db.models import Q, F
+from django.db.models import Q, F, aprefetch_related_objects
 from django.db.models import Sum
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from api.services.livros_filters import apply_livro_filters, apply_ordering
-from api.utils import get_user
+from api.services.livros_filters import aapply_livro_filters, apply_ordering
+from api.services.paginas_lote import aplicar_lote_paginas
+from api.services.busca_livros import buscar_livros, config as config_busca
+from api.services.exportacao import exportar
+from api.services.heatmap import heatmap
+from api.services.progresso_ao_vivo import fluxo as fluxo_ao_vivo
+from livros.services.importacao import importar_leituras, formato_do_nome
+from livros.services.catalogo import upsert_livros, upsert_de_arquivo
+from api.pagination import CursorPagination
+from api.condicional import (
+    ApiCondicional, condicional,
+    versao_categorias, versao_livro, versao_livros, versao_livros_usuario,
+)
+from api.utils import aget_user, get_user, access_key_auth, async_access_key_auth
 from api.schemas import *
+from core.middleware import estatisticas
+from livros import cache as cache_catalogo, eventos
+from contas.models import ContadoresUsuario
 
 from datetime import timedelta, date as date_cls
+from typing import Optional, Literal
+import os
 
 class ORJsonParser(Parser):
     def parser_body(self, request):
         return orjson.loads(request.body)
-api = NinjaAPI(parser=ORJsonParser(), urls_namespace="api")
+api = ApiCondicional(parser=ORJsonParser(), urls_namespace="api")
 
 
 @api.exception_handler(Http404)
@@ -32,10 +50,33 @@ def not_found_handler(request, exc):
     )
 
 
+def _json_do_catalogo(request, namespace, chave, construir):
+    """
+    Resposta JSON já serializada e renderizada, do cache do catálogo
+    (livros/cache.py): acertos não consultam o banco nem passam pelo pydantic.
+    """
+    conteudo = cache_catalogo.obter(
+        namespace, chave, lambda: api.renderer.render(request, construir(), response_status=200)
+    )
+    return HttpResponse(conteudo, content_type=api.get_content_type())
+
+
+async def _ajson_do_catalogo(request, namespace, chave, construir):
+    """_json_do_catalogo() para views async: 'construir' é uma função async."""
+    async def renderizar():
+        return api.renderer.render(request, await construir(), response_status=200)
+
+    conteudo = await cache_catalogo.aobter(namespace, chave, renderizar)
+    return HttpResponse(conteudo, content_type=api.get_content_type())
+
+
 @api.get('categorias/', response=list[CategoriaOutSchema])
+@condicional(versao_categorias)
 def listar_categorias(request):
-    categorias = Categoria.objects.all()
-    return categorias
+    return _json_do_catalogo(
+        request, "categorias", "lista",
+        lambda: [CategoriaOutSchema.from_orm(c).model_dump() for c in Categoria.objects.all()],
+    )
 
 
 @api.get('categoria/{id}/', response=CategoriaOutSchema)
@@ -82,21 +123,43 @@ def deletar_categoria(request, id: int):
 
     return categoria
 
-class SmallLimitOffset(LimitOffsetPagination):
-    default_limit = 20
-    max_limit = 100
-
+# As leituras mais acessadas (livros/, livro/{id}/, user/, user/livros,
+# progresso-mensal) são views async: sob ASGI (uvicorn) liberam o loop
+# enquanto esperam o banco. Sob WSGI (gunicorn, runserver) cada chamada passa
+# por async_to_sync, que sobe um loop numa thread auxiliar, e cada query volta
+# por sync_to_async para a thread da conexão: dois saltos de thread a mais por
+# requisição, sem ganho de concorrência. Medido em docs/carga.md.
 @api.get("livros/", response=list[LivroOutSchema])
-@paginate(SmallLimitOffset)
-def listar_livros(request, f: LivrosBaseQuery = Query(...)):
-    qs = Livro.objects.all()
-    qs = apply_livro_filters(qs, f)
+@condicional(versao_livros)
+@paginate(CursorPagination)
+async def listar_livros(request, f: LivrosBaseQuery = Query(...)):
+    qs = Livro.objects.select_related("categoria")
+    qs = await aapply_livro_filters(qs, f)
     qs = apply_ordering(qs, f.ordering)
     return qs
 
+@api.get(
+    "livros/buscar",
+    response=list[LivroSugestaoOut],
+    auth=access_key_auth,
+    throttle=AuthRateThrottle(config_busca()["TAXA"]),
+)
+def buscar_livros_externos(request, f: BuscaLivrosQuery = Query(...)):
+    """
+    Autocomplete do cadastro: catálogo local, depois cache/provedor externo.
+    Autenticado (chave ou sessão) e com limite de taxa por usuário: cada
+    consulta nova chama o provedor e grava uma linha de ConsultaLivroCache.
+    """
+    return buscar_livros(f.q, f.limite)
+
 @api.get('livro/{id}', response=LivroOutSchema)
-def listar_livro(request, id: int):
-    return get_object_or_404(Livro, id=id)
+@condicional(versao_livro)
+async def listar_livro(request, id: int):
+    async def construir():
+        livro = await aget_object_or_404(Livro.objects.select_related("categoria"), id=id)
+        return LivroOutSchema.from_orm(livro).model_dump()
+
+    return await _ajson_do_catalogo(request, "livros", id, construir)
 
 
 @api.post(
@@ -131,6 +194,25 @@ def criar_livro(request, payload: LivroCreateSchema):
     return (201 if created else 200), obj
 
 
+@api.post("livros/upsert", response={200: CatalogoUpsertOut, 403: ErrorSchema}, auth=access_key_auth)
+def upsert_catalogo(request, payload: CatalogoUpsertIn):
+    """
+    Cria ou atualiza até 1000 livros de uma vez (chave: google_id, isbn ou
+    titulo + autor + total_paginas). Só staff.
+    """
+    if not get_user(request).is_staff:
+        return 403, {"error": "Apenas administradores."}
+    return upsert_livros(enumerate((livro.dict() for livro in payload.livros), start=1))
+
+
+@api.post("livros/upsert/arquivo", response={200: CatalogoUpsertOut, 403: ErrorSchema}, auth=access_key_auth)
+def upsert_catalogo_arquivo(request, arquivo: UploadedFile = File(...), formato: Optional[Literal["csv", "ndjson"]] = None):
+    """Mesmo upsert lendo um CSV (com cabeçalho) ou NDJSON em lotes, sem limite de linhas. Só staff."""
+    if not get_user(request).is_staff:
+        return 403, {"error": "Apenas administradores."}
+    return upsert_de_arquivo(arquivo.file, formato or formato_do_nome(arquivo.name))
+
+
 @api.put(
     "livro/{id}",
     response={
@@ -163,33 +245,38 @@ def deletar_livro(request, id: int):
     return livro
 
 
-@api.get('user/', response={200: UserSchema, 403: ErrorSchema, 404: ErrorSchema})
-def listar_usuario(request):
-    return get_user(request)
+@api.get('user/', response={200: UserSchema, 403: ErrorSchema, 404: ErrorSchema}, auth=async_access_key_auth)
+async def listar_usuario(request):
+    user = await aget_user(request)
+    # o M2M é lido aqui: a serialização roda no event loop e não pode ir ao banco
+    await aprefetch_related_objects([user], "livros")
+    return user
 
 
-@api.get("user/livros", response=list[LivroOutSchema])
-@paginate(SmallLimitOffset)
-def livros_do_usuario(request, f: LivrosUserQuery = Query(...)):
-    user = get_user(request)
+@api.get("user/livros", response=list[LivroOutSchema], auth=async_access_key_auth)
+@condicional(versao_livros_usuario, privado=True)
+@paginate(CursorPagination)
+async def livros_do_usuario(request, f: LivrosUserQuery = Query(...)):
+    user = await aget_user(request)
 
-    # base: só livros vinculados ao usuário
-    qs = Livro.objects.filter(user_books__usuario=user)
-
-    # status por UserBook (sem perder a forma comum de filtrar/ordenar)
+    # base: só livros vinculados ao usuário; o status entra no MESMO filter()
+    # para usar um único JOIN com o UserBook deste usuário
+    vinculo = {"user_books__usuario": user}
     if f.status == "em_andamento":
-        qs = qs.filter(user_books__concluido_em__isnull=True)
+        vinculo["user_books__concluido_em__isnull"] = True
     elif f.status == "concluidos":
-        qs = qs.filter(user_books__concluido_em__isnull=False)
+        vinculo["user_books__concluido_em__isnull"] = False
+    qs = Livro.objects.filter(**vinculo).select_related("categoria")
 
     # aplica os mesmos filtros de LivrosBaseQuery e ordenação
-    qs = apply_livro_filters(qs, f)
+    qs = await aapply_livro_filters(qs, f)
     qs = apply_ordering(qs, f.ordering)
 
-    return qs.distinct()  # evita duplicados se houver múltiplos UserBooks
+    # sem .distinct(): unique (usuario, livro) garante no máximo um UserBook por livro
+    return qs
 
 
-@api.post('user/livro/add_pagina/{livro_id}', response={200: LivroAddPaginaOut, 201: LivroAddPaginaOut, 400: ErrorSchema})
+@api.post('user/livro/add_pagina/{livro_id}', response={200: LivroAddPaginaOut, 201: LivroAddPaginaOut, 400: ErrorSchema}, auth=access_key_auth)
 def adicionar_pagina(request, livro_id: int, payload: LivroAddPagina):
     user = get_user(request)
     livro = Livro.objects.get(id=livro_id)
@@ -210,6 +297,7 @@ def adicionar_pagina(request, livro_id: int, payload: LivroAddPagina):
         ub, _created_ub = UserBook.objects.select_for_update().get_or_create(
             usuario=user, livro=livro, defaults={"pagina_atual": 0}
         )
+        ub.livro = livro  # já carregado: evita nova consulta no clamp
         atual_anterior = ub.pagina_atual or 0
 
         # calcula delta (permitindo negativo; regra virá abaixo)
@@ -243,40 +331,37 @@ def adicionar_pagina(request, livro_id: int, payload: LivroAddPagina):
             leitura = LeituraDiaria(
                 usuario=user, livro=livro, dia=dia_alvo, paginas_lidas=delta
             )
-            leitura.save()  # dispara hooks
+            leitura.save(userbook=ub)  # dispara hooks aplicando só o delta no UserBook travado
             created_today = True
         else:
-            # existe registro; validar negativos
-            if delta < 0:
-                novo = leitura.paginas_lidas + delta
-                if novo < 0:
-                    # tentativa de reduzir além do disponível
-                    raise HttpError(400, "Redução maior que o registrado para o dia.")
-                if novo == 0:
-                    # CHECK > 0 impede salvar zero: deletar o registro do dia
-                    leitura.delete()
-                    ub.refresh_from_db()
-                    return 200, {"userbook": ub, "leitura_diaria": None}
-                # atualizar com F() para atomicidade + save() para disparar hooks
-                leitura.paginas_lidas = F("paginas_lidas") + delta
-                leitura.save(update_fields=["paginas_lidas"])
-                leitura.refresh_from_db(fields=["paginas_lidas"])
-                created_today = False
-            else:
-                # delta >= 0
-                if delta == 0:
-                    return 200, {"userbook": ub, "leitura_diaria": leitura}
-                leitura.paginas_lidas = F("paginas_lidas") + delta
-                leitura.save(update_fields=["paginas_lidas"])
-                leitura.refresh_from_db(fields=["paginas_lidas"])
-                created_today = False
-
-        # após salvar/deletar, o save() de LeituraDiaria recalculou o UserBook
-        ub.refresh_from_db()
+            # existe registro (travado); validar negativos
+            if delta == 0:
+                return 200, {"userbook": ub, "leitura_diaria": leitura}
+            novo = leitura.paginas_lidas + delta
+            if novo < 0:
+                # tentativa de reduzir além do disponível
+                raise HttpError(400, "Redução maior que o registrado para o dia.")
+            if novo == 0:
+                # sem páginas no dia: deletar o registro
+                leitura.delete(userbook=ub)
+                return 200, {"userbook": ub, "leitura_diaria": None}
+            # a linha está travada: o valor absoluto é seguro e o save() calcula o delta
+            leitura.paginas_lidas = novo
+            leitura.save(update_fields=["paginas_lidas", "atualizado_em"], userbook=ub)
+            created_today = False
+
+        # o save()/delete() de LeituraDiaria já atualizou o próprio 'ub' em memória
 
     return (201 if created_today else 200), {"userbook": ub, "leitura_diaria": leitura}
 
 
+@api.post('user/livro/add_paginas', response={200: LivroAddPaginaLoteOut}, auth=access_key_auth)
+def adicionar_paginas_lote(request, payload: LivroAddPaginaLote):
+    """Versão em lote do add_pagina, para clientes que sincronizam leituras offline."""
+    user = get_user(request)
+    return aplicar_lote_paginas(user, payload.entradas)
+
+
 def _parse_month(s: str | None) -> date_cls | None:
     if not s:
         return None
@@ -298,30 +383,20 @@ def _month_bounds(d: date_cls | None):
         end = d.replace(month=d.month + 1, day=1)
     return d, end
 
-@api.get("user/leituras/progresso-mensal", response={200: ProgressoMensalOut})
-def progresso_mensal(request, q: ProgressoMensalQuery = Query(None)):
-    user = get_user(request)
+@api.get("user/leituras/progresso-mensal", response={200: ProgressoMensalOut}, auth=async_access_key_auth)
+async def progresso_mensal(request, q: ProgressoMensalQuery = Query(None)):
+    user = await aget_user(request)
 
     mes = _parse_month(q.mes) if q else None
     start, end = _month_bounds(mes)
 
-    # resumo (usa seu helper no Usuario)
-    resumo = user.progresso_meta_mensal(mes=start, override_meta=(q.meta if q else None))
+    # diário denso direto do resumo diário (sem GROUP BY sobre LeituraDiaria)
+    diario = await ResumoDiario.aserie(user, start, end)
 
-    # diário agregado no banco
-    agg = (
-        LeituraDiaria.objects
-        .filter(usuario=user, dia__gte=start, dia__lt=end)
-        .values("dia")
-        .annotate(total=Coalesce(Sum("paginas_lidas"), 0))
+    # resumo (usa seu helper no Usuario), reaproveitando o total do diário
+    resumo = user.progresso_meta_mensal(
+        mes=start, override_meta=(q.meta if q else None), lidas=sum(diario.values())
     )
-    diario = {row["dia"].isoformat(): int(row["total"]) for row in agg}
-
-    # preenche zeros para todos os dias do mês
-    d = start
-    while d < end:
-        diario.setdefault(d.isoformat(), 0)
-        d += timedelta(days=1)
 
     return {
         "mes": resumo["mes"],        # já vem normalizado como 1º dia
@@ -329,20 +404,161 @@ def progresso_mensal(request, q: ProgressoMensalQuery = Query(None)):
         "lidas": resumo["lidas"],
         "restante": resumo["restante"],
         "pct": resumo["pct"],
-        "diario": dict(sorted(diario.items())),  # ordena por data (opcional)
+        "diario": diario,  # já ordenado por data
+    }
+
+MAX_MESES_PERIODO = 60
+
+@api.get("user/leituras/progresso-periodo", response={200: ProgressoPeriodoOut}, auth=access_key_auth)
+def progresso_periodo(request, q: ProgressoPeriodoQuery = Query(...)):
+    user = get_user(request)
+
+    de = _parse_month(q.de)
+    ate = _parse_month(q.ate) if q.ate else de
+    if ate < de:
+        raise HttpError(422, "'ate' deve ser igual ou posterior a 'de'.")
+    if (ate.year - de.year) * 12 + (ate.month - de.month) >= MAX_MESES_PERIODO:
+        raise HttpError(422, f"O período pode ter no máximo {MAX_MESES_PERIODO} meses.")
+
+    meses = [
+        user.progresso_meta_mensal(mes=mes, override_meta=q.meta, lidas=lidas)
+        for mes, lidas in ResumoMensal.serie(user, de, ate)
+    ]
+    meta = sum(m["meta"] for m in meses)
+    lidas = sum(m["lidas"] for m in meses)
+
+    diario = None
+    if q.diario:
+        _, fim = _month_bounds(ate)
+        diario = ResumoDiario.serie(user, de, fim)
+
+    return {
+        "de": de,
+        "ate": ate,
+        "meta": meta,
+        "lidas": lidas,
+        "pct": int(round((lidas / meta) * 100)) if meta else 0,
+        "meses": meses,
+        "diario": diario,
     }
 
-@api.post("user/meta/anual", response={200: UserSchema})
+@api.get("user/leituras/progresso-anual", response={200: ProgressoAnualOut}, auth=access_key_auth)
+def progresso_anual(request, ano: Optional[int] = Query(None, ge=1900, le=2100)):
+    user = get_user(request)
+    return user.progresso_meta_anual(ano=ano)
+
+MAX_ANOS_HEATMAP = 5
+
+def _etag_do_cliente(request) -> str | None:
+    valor = request.headers.get("If-None-Match")
+    if not valor:
+        return None
+    return valor.split(",")[0].strip().removeprefix("W/").strip('"')
+
+@api.get("user/leituras/heatmap", response={200: HeatmapOut}, auth=access_key_auth)
+def heatmap_leituras(
+    request,
+    response: HttpResponse,
+    ano: Optional[int] = Query(None, ge=1900, le=2100),
+    anos: int = Query(1, ge=1, le=MAX_ANOS_HEATMAP),
+    codificacao: Literal["lista", "varint", "delta"] = "lista",
+):
+    """Páginas por dia de 'anos' anos terminando em 'ano' (série densa, com ETag)."""
+    user = get_user(request)
+    etag, payload = heatmap(
+        user,
+        ano=ano or timezone.localdate().year,
+        anos=anos,
+        codificacao=codificacao,
+        etag=_etag_do_cliente(request),
+    )
+    if payload is None:
+        nao_modificado = HttpResponseNotModified()
+        nao_modificado["ETag"] = f'"{etag}"'
+        return nao_modificado
+    response["ETag"] = f'"{etag}"'
+    response["Cache-Control"] = "private, no-cache"
+    return payload
+
+@api.get("user/leituras/streak", response={200: StreakOut}, auth=access_key_auth)
+def streak_usuario(request):
+    user = get_user(request)
+    streak = StreakLeitura.para(user)
+    return {
+        "atual": streak.atual,
+        "vivo": streak.vivo(),
+        "maior": streak.maior,
+        "ultimo_dia": streak.ultimo_dia,
+    }
+
+@api.get("user/contadores", response={200: ContadoresOut}, auth=access_key_auth)
+def contadores_usuario(request):
+    """Livros em andamento, concluídos e páginas lidas (contadores mantidos, sem agregação)."""
+    return ContadoresUsuario.para(get_user(request))
+
+CONTENT_TYPES_EXPORTACAO = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+@api.get("user/leituras/export", auth=access_key_auth)
+def exportar_leituras(request, q: ExportacaoQuery = Query(...)):
+    """Histórico completo (leituras diárias ou progresso por livro) em streaming."""
+    user = get_user(request)
+    response = StreamingHttpResponse(
+        exportar(user, dados=q.dados, formato=q.formato, de=q.de, ate=q.ate),
+        content_type=CONTENT_TYPES_EXPORTACAO[q.formato],
+    )
+    nome = f"{q.dados}-{timezone.localdate():%Y%m%d}.{q.formato}"
+    response["Content-Disposition"] = f'attachment; filename="{nome}"'
+    return response
+
+@api.get("user/eventos", auth=async_access_key_auth)
+async def eventos_ao_vivo(request):
+    """
+    Feed SSE do progresso (EventSource): evento "estado" ao conectar e
+    "progresso" a cada leitura registrada em qualquer dispositivo. Só sob ASGI.
+    """
+    if not eventos.disponivel(request):
+        raise HttpError(503, "Eventos ao vivo exigem o servidor ASGI e EVENTOS['ATIVO'].")
+    user = await aget_user(request)
+    response = StreamingHttpResponse(fluxo_ao_vivo(user), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: não bufferizar o stream
+    return response
+
+@api.post("user/leituras/import", response={200: ImportacaoOut}, auth=access_key_auth)
+def importar_historico(request, arquivo: UploadedFile = File(...), formato: Optional[Literal["csv", "ndjson"]] = None):
+    """
+    Importa histórico de outro app (CSV com cabeçalho ou NDJSON; mesmas colunas
+    da exportação). O arquivo é lido em lotes; dias já registrados são mantidos.
+    """
+    user = get_user(request)
+    return importar_leituras(user, arquivo.file, formato or formato_do_nome(arquivo.name))
+
+@api.post("user/meta/anual", response={200: UserSchema}, auth=access_key_auth)
 def definir_meta_anual(request, payload: MetaAnualIn):
     user = get_user(request)
     user.meta_anual_paginas = payload.meta_anual_paginas
     user.save(update_fields=["meta_anual_paginas"])
     return user
 
-@api.post("user/meta/mensal", response={200: UserSchema})
+@api.post("user/meta/mensal", response={200: UserSchema}, auth=access_key_auth)
 def definir_meta_mensal(request, payload: MetaMensalIn):
     user = get_user(request)
     user.meta_mensal_paginas = payload.meta_mensal_paginas
     user.save(update_fields=["meta_mensal_paginas"])
     return user
 
+
+
+@api.get("admin/metricas", response={200: MetricasOut, 403: ErrorSchema}, auth=access_key_auth)
+def metricas_endpoints(request, zerar: bool = False):
+    """Agregados do middleware de instrumentação (por processo). Só staff."""
+    user = get_user(request)
+    if not user.is_staff:
+        return 403, {"error": "Apenas administradores."}
+    resumo = estatisticas.resumo()
+    if zerar:
+        estatisticas.zerar()
+    return {"processo": os.getpid(), "endpoints": resumo}
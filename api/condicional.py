@@ -0,0 +1,176 @@
+# api/condicional.py
+"""
+Requisições condicionais (ETag / Last-Modified -> 304) para a API ninja.
+
+@condicional(versao) fica logo abaixo do @api.get (acima do @paginate).
+'versao(request, **kwargs)' devolve (impressão digital, última alteração)
+com uma consulta barata (COUNT + MAX(atualizado_em)), ou None para pular.
+O ETag final combina essa impressão com o caminho completo da requisição
+(filtros, cursor, limite) e o usuário autenticado, então cada página e
+cada filtro tem o seu.
+
+Quando o cliente já tem a versão, a view nem roda (nada de queryset nem
+serialização); senão os cabeçalhos vão para a resposta via
+ApiCondicional.create_response.
+
+Views async também funcionam: a versão é calculada numa thread
+(sync_to_async) e a view é aguardada normalmente.
+
+O ETag é a referência (captura exclusões pelo COUNT); Last-Modified só
+serve a clientes que não mandam If-None-Match.
+"""
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from ninja import NinjaAPI
+
+ATRIBUTO = "_cabecalhos_condicionais"
+
+
+def carimbo(qs, campo: str = "atualizado_em") -> tuple[int, object]:
+    """(COUNT, MAX(campo)) do queryset numa única consulta."""
+    info = qs.order_by().aggregate(n=Count("pk"), ultima=Max(campo))
+    return info["n"], info["ultima"]
+
+
+def _usuario_id(request):
+    auth = getattr(request, "auth", None)
+    if getattr(auth, "pk", None):
+        return auth.pk
+    user = getattr(request, "user", None)
+    return user.pk if getattr(user, "is_authenticated", False) else None
+
+
+def _avaliar(request, versao, privado: bool, kwargs):
+    """
+    (cabeçalhos, resposta pronta): a resposta é o 304/412 quando o cliente já
+    tem a versão; (None, None) quando 'versao' pula o endpoint.
+    """
+    resultado = versao(request, **kwargs)
+    if resultado is None:
+        return None, None
+
+    impressao, ultima = resultado
+    bruto = f"{impressao}|{request.get_full_path()}|{_usuario_id(request)}"
+    etag = f'"{hashlib.sha1(bruto.encode()).hexdigest()[:24]}"'
+    ultima_ts = int(ultima.timestamp()) if ultima else None
+
+    cabecalhos = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache" if privado else "no-cache",
+    }
+    if ultima_ts is not None:
+        cabecalhos["Last-Modified"] = http_date(ultima_ts)
+
+    if request.method in ("GET", "HEAD"):
+        nao_modificado = get_conditional_response(request, etag=etag, last_modified=ultima_ts)
+        if nao_modificado is not None:
+            if isinstance(nao_modificado, HttpResponseNotModified):
+                for nome, valor in cabecalhos.items():
+                    nao_modificado[nome] = valor
+            return cabecalhos, nao_modificado
+
+    setattr(request, ATRIBUTO, cabecalhos)
+    return cabecalhos, None
+
+
+def _carimbar(resultado, cabecalhos):
+    # respostas já prontas (ex.: JSON do cache) não passam pelo create_response
+    if cabecalhos and isinstance(resultado, HttpResponse) and 200 <= resultado.status_code < 300:
+        for nome, valor in cabecalhos.items():
+            resultado[nome] = valor
+    return resultado
+
+
+def condicional(versao, privado: bool = False):
+    def decorador(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper_async(request, *args, **kwargs):
+                # versão e ETag (pode ler a sessão) rodam numa thread, fora do event loop
+                cabecalhos, pronta = await sync_to_async(_avaliar)(request, versao, privado, kwargs)
+                if pronta is not None:
+                    return pronta
+                return _carimbar(await view(request, *args, **kwargs), cabecalhos)
+
+            return wrapper_async
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            cabecalhos, pronta = _avaliar(request, versao, privado, kwargs)
+            if pronta is not None:
+                return pronta
+            return _carimbar(view(request, *args, **kwargs), cabecalhos)
+
+        return wrapper
+
+    return decorador
+
+
+class ApiCondicional(NinjaAPI):
+    """NinjaAPI que aplica os cabeçalhos preparados por @condicional."""
+
+    def create_response(self, request, data, *, status=None, temporal_response=None):
+        response = super().create_response(request, data, status=status, temporal_response=temporal_response)
+        cabecalhos = getattr(request, ATRIBUTO, None)
+        if cabecalhos and 200 <= response.status_code < 300:
+            for nome, valor in cabecalhos.items():
+                response[nome] = valor
+        return response
+
+
+# ---------------------------------------------------------------------------
+# Versões dos endpoints de leitura
+# ---------------------------------------------------------------------------
+
+def _maior(*datas):
+    datas = [d for d in datas if d is not None]
+    return max(datas) if datas else None
+
+
+def versao_categorias(request, **kwargs):
+    from livros.models import Categoria
+
+    n, ultima = carimbo(Categoria.objects.all())
+    return f"c{n}:{ultima}", ultima
+
+
+def versao_livros(request, **kwargs):
+    from livros.models import Categoria, Livro
+
+    n, ultima = carimbo(Livro.objects.all())
+    _, ultima_categoria = carimbo(Categoria.objects.all())
+    return f"l{n}:{ultima}:{ultima_categoria}", _maior(ultima, ultima_categoria)
+
+
+def versao_livro(request, id: int, **kwargs):
+    from livros.models import Livro
+
+    linha = Livro.objects.filter(pk=id).values_list("atualizado_em", "categoria__atualizado_em").first()
+    if linha is None:
+        return None  # a view responde 404
+    return f"l{id}:{linha[0]}:{linha[1]}", _maior(*linha)
+
+
+def versao_livros_usuario(request, **kwargs):
+    from contas.models import UserBook
+    from livros.models import Categoria
+
+    info = (
+        UserBook.objects.filter(usuario_id=_usuario_id(request))
+        .order_by()
+        .aggregate(
+            n=Count("pk"),
+            ultima=Max("atualizado_em"),
+            ultima_livro=Max("livro__atualizado_em"),
+        )
+    )
+    _, ultima_categoria = carimbo(Categoria.objects.all())
+    ultima = _maior(info["ultima"], info["ultima_livro"], ultima_categoria)
+    return f"u{info['n']}:{info['ultima']}:{info['ultima_livro']}:{ultima_categoria}", ultima
@@ -0,0 +1,188 @@
+# api/pagination.py
+import base64
+from datetime import date, datetime
+from typing import Any, List, Literal, Optional
+
+import orjson
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from ninja import Field, Schema
+from ninja.errors import HttpError
+from ninja.pagination import AsyncPaginationBase
+
+
+# ---------------------- helpers de keyset (cursor) ----------------------
+
+def campos_de_ordem(qs) -> list[tuple[str, bool]]:
+    """
+    [(campo, desc)] do ORDER BY do queryset, sempre terminando em 'id'
+    para que a chave seja única (desempate estável).
+    """
+    ordem = list(qs.query.order_by) or list(qs.model._meta.ordering) or ["id"]
+    campos = []
+    for item in ordem:
+        if not isinstance(item, str):
+            raise HttpError(400, "Ordenação não suportada na paginação por cursor.")
+        desc = item.startswith("-")
+        nome = item.lstrip("-")
+        campos.append(("id" if nome == "pk" else nome, desc))
+    if campos[-1][0] != "id":
+        campos.append(("id", campos[0][1]))
+    return campos
+
+
+def campos_anulaveis(model, ordem) -> set[str]:
+    """Campos da ordem que aceitam NULL (seguindo relações 'a__b'); anotações não."""
+    anulaveis = set()
+    for campo, _ in ordem:
+        atual = model
+        for parte in campo.split("__"):
+            try:
+                field = atual._meta.get_field(parte)
+            except FieldDoesNotExist:
+                break
+            if field.null:
+                anulaveis.add(campo)
+                break
+            atual = field.related_model
+            if atual is None:
+                break
+    return anulaveis
+
+
+def ordenar(qs, ordem, anulaveis=()):
+    """
+    ORDER BY da ordem com os NULLs sempre por último nos campos anuláveis
+    (o padrão muda entre SQLite e Postgres), como filtro_keyset() espera.
+    """
+    termos = []
+    for campo, desc in ordem:
+        if campo in anulaveis:
+            termos.append(F(campo).desc(nulls_last=True) if desc else F(campo).asc(nulls_last=True))
+        else:
+            termos.append(("-" if desc else "") + campo)
+    return qs.order_by(*termos)
+
+
+def _json(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return valor
+
+
+def codificar_cursor(ordem, obj) -> str:
+    """Cursor opaco (base64) com os valores de ordenação do último item."""
+    dados = {
+        "o": [("-" if desc else "") + campo for campo, desc in ordem],
+        "v": [_json(getattr(obj, campo)) for campo, _ in ordem],
+    }
+    return base64.urlsafe_b64encode(orjson.dumps(dados)).decode().rstrip("=")
+
+
+def decodificar_cursor(model, ordem, cursor: str) -> list:
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        dados = orjson.loads(bruto)
+        esperado = [("-" if desc else "") + campo for campo, desc in ordem]
+        if dados["o"] != esperado:
+            raise ValueError("cursor de outra ordenação")
+
+        valores = []
+        for (campo, _), valor in zip(ordem, dados["v"]):
+            try:
+                valor = model._meta.get_field(campo).to_python(valor)
+            except FieldDoesNotExist:
+                pass  # anotação (ex.: relevância): usa o valor como veio
+            valores.append(valor)
+        return valores
+    except (ValueError, KeyError, TypeError, ValidationError, orjson.JSONDecodeError):
+        raise HttpError(400, "Cursor inválido para esta consulta.")
+
+
+def filtro_keyset(ordem, valores, anulaveis=()) -> Q:
+    """
+    Linhas estritamente depois de 'valores' na ordem dada:
+    (a > x) OR (a = x AND b > y) OR ... — com '<' nos campos descendentes.
+
+    Nos campos de 'anulaveis' os NULLs vêm por último (ordenar()): depois de
+    um valor x também vêm os NULLs, e depois de um NULL só outros NULLs.
+    """
+    filtro = Q()
+    iguais = Q()
+    for (campo, desc), valor in zip(ordem, valores):
+        if valor is None:
+            iguais &= Q(**{f"{campo}__isnull": True})
+            continue
+        depois = Q(**{f"{campo}__{'lt' if desc else 'gt'}": valor})
+        if campo in anulaveis:
+            depois |= Q(**{f"{campo}__isnull": True})
+        filtro |= iguais & depois
+        iguais &= Q(**{campo: valor})
+    return filtro
+
+
+# ---------------------- paginação ----------------------
+
+class CursorPagination(AsyncPaginationBase):
+    """
+    LimitOffset compatível, com um modo por cursor (keyset).
+
+    - offset (padrão): como antes, com 'count' opcional (contar=false).
+    - cursor: ativado por 'paginacao=cursor' ou por um 'cursor' recebido.
+      Filtra pela ordenação do queryset (ex.: -atualizado_em, -id), então o
+      custo por página não cresce com a profundidade; não conta por padrão.
+
+    Serve views sync e async: nas async a página é lida com o ORM async
+    (iteração assíncrona + acount) e já sai avaliada.
+    """
+
+    class Input(Schema):
+        limit: int = Field(20, ge=1, le=100)
+        offset: int = Field(0, ge=0)
+        cursor: Optional[str] = Field(None, description="Cursor opaco retornado em 'next_cursor'.")
+        paginacao: Literal["offset", "cursor"] = "offset"
+        contar: Optional[bool] = Field(
+            None, description="Executa COUNT(*). Padrão: sim no modo offset, não no modo cursor."
+        )
+
+    class Output(Schema):
+        items: List[Any]
+        count: Optional[int] = None
+        next_cursor: Optional[str] = None
+
+    def _fatia(self, queryset, pagination: Input):
+        """(fatia a avaliar, ordem do cursor ou None, contar?)."""
+        modo_cursor = pagination.paginacao == "cursor" or bool(pagination.cursor)
+        contar = pagination.contar if pagination.contar is not None else not modo_cursor
+        limit = pagination.limit
+
+        if not modo_cursor:
+            return queryset[pagination.offset: pagination.offset + limit], None, contar
+
+        ordem = campos_de_ordem(queryset)
+        anulaveis = campos_anulaveis(queryset.model, ordem)
+        pagina = ordenar(queryset, ordem, anulaveis)
+        if pagination.cursor:
+            valores = decodificar_cursor(queryset.model, ordem, pagination.cursor)
+            pagina = pagina.filter(filtro_keyset(ordem, valores, anulaveis))
+        # um item a mais só para saber se há próxima página
+        return pagina[: limit + 1], ordem, contar
+
+    @staticmethod
+    def _resultado(itens, ordem, limit, count):
+        proximo = None
+        if ordem is not None and len(itens) > limit:
+            proximo = codificar_cursor(ordem, itens[limit - 1])
+        return {"items": itens[:limit], "count": count, "next_cursor": proximo}
+
+    def paginate_queryset(self, queryset, pagination: Input, **params: Any) -> Any:
+        fatia, ordem, contar = self._fatia(queryset, pagination)
+        itens = list(fatia)
+        count = self._items_count(queryset) if contar else None
+        return self._resultado(itens, ordem, pagination.limit, count)
+
+    async def apaginate_queryset(self, queryset, pagination: Input, **params: Any) -> Any:
+        fatia, ordem, contar = self._fatia(queryset, pagination)
+        itens = [obj async for obj in fatia]
+        count = await self._aitems_count(queryset) if contar else None
+        return self._resultado(itens, ordem, pagination.limit, count)
@@ -1,8 +1,9 @@
 from ninja import Schema, ModelSchema
-from livros.models import Livro, Categoria, LeituraDiaria
+from livros.models import Livro, Categoria, LeituraDiaria, StreakLeitura, ResumoDiario, ResumoMensal
 from contas.models import Usuario, UserBook
 from datetime import datetime, date
-from pydantic import Field, model_validator, ConfigDict
+from pydantic import Field, field_validator, model_validator, ConfigDict
+from django.utils import timezone
 from typing import Optional, Literal, Dict
 
 class CategoriaInSchema(ModelSchema):
@@ -109,6 +110,13 @@ class LivroAddPagina(Schema):
         description="Página absoluta atual (ex.: 150)."
     )
 
+    @field_validator("data_de_leitura")
+    @classmethod
+    def _nao_futura(cls, dia):
+        if dia is not None and dia > timezone.localdate():
+            raise ValueError("'data_de_leitura' não pode estar no futuro.")
+        return dia
+
     @model_validator(mode="after")
     def _one_of_delta_or_abs(self):
         # Exatamente UM dos campos deve ser enviado
@@ -116,8 +124,31 @@ class LivroAddPagina(Schema):
             raise ValueError("Envie APENAS 'delta_paginas' OU 'pagina_atual'.")
         return self
 
+class LivroAddPaginaLoteItem(LivroAddPagina):
+    livro_id: int
+
+class LivroAddPaginaLote(Schema):
+    entradas: list[LivroAddPaginaLoteItem] = Field(
+        min_length=1, max_length=500,
+        description="Leituras a aplicar, na ordem em que aconteceram (ex.: fila offline).",
+    )
+
+class LivroAddPaginaLoteResultado(Schema):
+    indice: int                  # posição da entrada no payload
+    livro_id: int
+    dia: Optional[date] = None
+    status: Literal["ok", "ignorado", "erro"]
+    erro: Optional[str] = None
+    delta_aplicado: int = 0
+    paginas_no_dia: Optional[int] = None
+    pagina_atual: Optional[int] = None
+
+class LivroAddPaginaLoteOut(Schema):
+    resultados: list[LivroAddPaginaLoteResultado]
+    userbooks: list[UserBookOut]
+
 class LivrosBaseQuery(Schema):
-    q: Optional[str] = Field(None, description="Busca por título/autor/editora")
+    q: Optional[str] = Field(None, description="Busca por título/autor/ISBN (sem acentos, por prefixo)")
     categoria_id: Optional[int] = None
     autor: Optional[str] = None
     min_paginas: Optional[int] = Field(None, ge=0)
@@ -127,9 +158,24 @@ class LivrosBaseQuery(Schema):
         "titulo","-titulo",
         "autor","-autor",
         "paginas","-paginas",
-        "publicado","-publicado",
+        "avaliacao","-avaliacao",
         "atualizado","-atualizado",
-    ] = "-atualizado"
+        "relevancia",
+    ] | None = Field(None, description="Padrão: 'relevancia' quando há 'q', senão '-atualizado'.")
+
+class BuscaLivrosQuery(Schema):
+    q: str = Field(..., min_length=2, max_length=200)
+    limite: int = Field(8, ge=1, le=20)
+
+class LivroSugestaoOut(Schema):
+    titulo: str
+    autor: str
+    total_paginas: Optional[int] = None
+    isbn: Optional[str] = None
+    capa_url: Optional[str] = None
+    google_id: Optional[str] = None
+    livro_id: Optional[int] = None   # preenchido quando o livro já está no catálogo
+    origem: Literal["local", "cache", "externo", "erro"]
 
 class LivrosUserQuery(LivrosBaseQuery):
     status: Literal["todos","em_andamento","concluidos"] = "todos"  # só para /user/livros
@@ -173,4 +219,110 @@ class ProgressoMensalOut(Schema):
     lidas: int
     restante: int
     pct: int
-    diario: Dict[str, int]  # {"2025-09-01": 12, "2025-09-02": 0, ...}
\ No newline at end of file
+    diario: Dict[str, int]  # {"2025-09-01": 12, "2025-09-02": 0, ...}
+
+class ProgressoPeriodoQuery(Schema):
+    de: str = Field(description="Mês inicial, 'YYYY-MM'.")
+    ate: Optional[str] = Field(default=None, description="Mês final (inclusivo), 'YYYY-MM'. Default = 'de'.")
+    meta: Optional[int] = Field(default=None, ge=0, description="Override da meta mensal para o cálculo.")
+    diario: bool = Field(default=False, description="Inclui a série diária densa do período.")
+
+class ExportacaoQuery(Schema):
+    dados: Literal["leituras", "progresso"] = "leituras"
+    formato: Literal["csv", "ndjson"] = "csv"
+    de: Optional[date] = Field(default=None, description="Dia inicial (inclusivo).")
+    ate: Optional[date] = Field(default=None, description="Dia final (inclusivo).")
+
+    @model_validator(mode="after")
+    def _periodo_valido(self):
+        if self.de and self.ate and self.ate < self.de:
+            raise ValueError("'ate' deve ser igual ou posterior a 'de'.")
+        return self
+
+class ImportacaoErroOut(Schema):
+    linha: int
+    erro: str
+
+class ImportacaoOut(Schema):
+    linhas: int
+    importadas: int
+    ignoradas: int      # (livro, dia) já registrados antes da importação
+    invalidas: int
+    livros_criados: int
+    erros: list[ImportacaoErroOut]   # até 100 erros detalhados
+
+class CatalogoUpsertIn(Schema):
+    livros: list[LivroCreateSchema] = Field(..., min_length=1, max_length=1000)
+
+class CatalogoUpsertOut(Schema):
+    linhas: int
+    criados: int
+    atualizados: int
+    ignorados: int      # iguais ao catálogo ou repetidos no envio
+    invalidas: int
+    erros: list[ImportacaoErroOut]   # até 100 erros detalhados
+
+class ProgressoMesOut(Schema):
+    mes: date
+    meta: int
+    lidas: int
+    restante: int
+    pct: int
+
+class ProgressoPeriodoOut(Schema):
+    de: date
+    ate: date
+    meta: int            # soma das metas mensais do período
+    lidas: int
+    pct: int
+    meses: list[ProgressoMesOut]
+    diario: Optional[Dict[str, int]] = None
+
+class ProgressoAnualOut(Schema):
+    ano: int
+    meta: int            # Usuario.meta_anual_paginas
+    lidas: int
+    restante: int
+    pct: int
+    meses: list[ProgressoMesOut]
+    livros_concluidos: int
+    media_diaria: float  # páginas/dia nos dias já decorridos do ano
+    projecao_ano: int    # total do ano mantido o ritmo atual
+    previsao_meta: Optional[date] = None  # dia previsto para bater a meta (só ano corrente)
+
+class HeatmapOut(Schema):
+    inicio: date                    # dia do primeiro valor
+    dias: int                       # quantidade de valores
+    codificacao: Literal["lista", "varint", "delta"]
+    total: int
+    maximo: int                     # maior valor (escala de cores)
+    dias_lidos: int
+    valores: Optional[list[int]] = None   # codificacao == "lista"
+    dados: Optional[str] = None           # base64url em "varint"/"delta"
+
+class StreakOut(Schema):
+    atual: int           # sequência que termina em 'ultimo_dia'
+    vivo: int            # 0 se a sequência já foi quebrada (não leu hoje nem ontem)
+    maior: int
+    ultimo_dia: Optional[date] = None
+
+
+class ContadoresOut(Schema):
+    livros_ativos: int
+    livros_concluidos: int
+    paginas_lidas: int      # desde sempre, todos os livros
+
+
+class MetricaEndpointOut(Schema):
+    endpoint: str
+    requisicoes: int
+    tempo_medio_ms: float
+    p95_ms: float
+    tempo_db_medio_ms: float
+    queries_media: float
+    queries_max: int
+    duplicadas_media: float
+
+class MetricasOut(Schema):
+    processo: int
+    endpoints: list[MetricaEndpointOut]
@@ -0,0 +1,252 @@
+# api/services/busca_livros.py
+"""
+Busca de livros para o autocomplete do cadastro (substitui a chamada direta
+do navegador ao Google Books).
+
+Ordem de resolução de uma consulta:
+
+1. livros já cadastrados (índice de busca local, livros/busca.py);
+2. ConsultaLivroCache (resposta do provedor guardada com TTL; consultas sem
+   resultado ficam em cache negativo com TTL menor);
+3. o provedor externo configurado em settings.LIVROS_BUSCA["PROVEDOR"],
+   sempre com MAX_RESULTADOS (o 'limite' do pedido só corta a resposta).
+
+Resultados externos que já existem no catálogo (mesmo google_id ou isbn)
+voltam com livro_id preenchido, então o cadastro reaproveita o Livro.
+"""
+import json
+import logging
+import urllib.parse
+import urllib.request
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from livros import busca
+from livros.models import Livro, ConsultaLivroCache
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PADRAO = {
+    "PROVEDOR": "api.services.busca_livros.GoogleBooksProvider",
+    "OPCOES": {},              # kwargs do provedor (ex.: api_key, timeout, caminho)
+    "TTL": 7 * 24 * 3600,      # segundos; respostas com resultado
+    "TTL_VAZIO": 3600,         # segundos; cache negativo
+    "LIMITE": 8,
+    "TAXA": "30/m",            # por usuário/chave (ninja AuthRateThrottle)
+}
+
+MAX_CONSULTA = 200
+# o provedor é sempre chamado com o máximo aceito pela API (BuscaLivrosQuery):
+# a resposta em cache serve qualquer 'limite' da mesma consulta
+MAX_RESULTADOS = 20
+
+
+def config() -> dict:
+    return {**CONFIG_PADRAO, **getattr(settings, "LIVROS_BUSCA", {})}
+
+
+def normalizar_consulta(q: str) -> str:
+    """Chave do cache: termos em minúsculas, sem acentos nem pontuação."""
+    return " ".join(busca.termos(q))[:MAX_CONSULTA]
+
+
+def capa_padrao(titulo: str, isbn: str | None) -> str:
+    if isbn:
+        return f"https://covers.openlibrary.org/b/isbn/{urllib.parse.quote(isbn)}-M.jpg"
+    return f"https://api.dicebear.com/7.x/initials/svg?seed={urllib.parse.quote(titulo or '')}"
+
+
+# ---------------------------------------------------------------------------
+# Provedores
+# ---------------------------------------------------------------------------
+
+class ProvedorLivros(ABC):
+    """
+    Interface dos provedores externos. buscar() devolve uma lista de dicts
+    com titulo, autor, total_paginas, isbn, capa_url e google_id.
+    Erros de rede/formato devem subir como exceção (não são cacheados).
+    """
+
+    @abstractmethod
+    def buscar(self, q: str, limite: int) -> list[dict]:
+        ...
+
+
+class GoogleBooksProvider(ProvedorLivros):
+    url = "https://www.googleapis.com/books/v1/volumes"
+    campos = (
+        "items(id,volumeInfo/title,volumeInfo/authors,volumeInfo/pageCount,"
+        "volumeInfo/imageLinks,volumeInfo/industryIdentifiers)"
+    )
+
+    def __init__(self, api_key: str | None = None, timeout: float = 4.0):
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def buscar(self, q: str, limite: int) -> list[dict]:
+        params = {"q": q, "printType": "books", "maxResults": limite, "fields": self.campos}
+        if self.api_key:
+            params["key"] = self.api_key
+        with urllib.request.urlopen(f"{self.url}?{urllib.parse.urlencode(params)}", timeout=self.timeout) as resp:
+            dados = json.loads(resp.read())
+        return [self.converter(item) for item in dados.get("items", [])]
+
+    @staticmethod
+    def converter(item: dict) -> dict:
+        """Mesmo mapeamento que o pesquisarLivro.js fazia no navegador."""
+        v = item.get("volumeInfo", {})
+        imagens = v.get("imageLinks", {})
+        ids = {i.get("type"): i.get("identifier") for i in v.get("industryIdentifiers", [])}
+        isbn = ids.get("ISBN_13") or ids.get("ISBN_10")
+        titulo = v.get("title", "")
+        capa = (imagens.get("thumbnail") or imagens.get("smallThumbnail") or "").replace("http:", "https:", 1)
+        return {
+            "titulo": titulo,
+            "autor": ", ".join(v.get("authors", [])),
+            "total_paginas": v.get("pageCount"),
+            "isbn": isbn,
+            "capa_url": capa or capa_padrao(titulo, isbn),
+            "google_id": item.get("id"),
+        }
+
+
+class ArquivoProvider(ProvedorLivros):
+    """
+    Provedor local para testes e desenvolvimento offline: lê volumes no formato
+    da API do Google Books de um arquivo JSON e filtra por todos os termos.
+    """
+
+    caminho_padrao = Path(__file__).resolve().parent.parent / "fixtures" / "busca_livros.json"
+
+    def __init__(self, caminho: str | None = None):
+        self.caminho = Path(caminho) if caminho else self.caminho_padrao
+        self.chamadas = 0
+
+    @property
+    def volumes(self) -> list[dict]:
+        if not hasattr(self, "_volumes"):
+            self._volumes = json.loads(self.caminho.read_text(encoding="utf-8")).get("items", [])
+        return self._volumes
+
+    def buscar(self, q: str, limite: int) -> list[dict]:
+        self.chamadas += 1
+        termos = busca.termos(q)
+        encontrados = []
+        for item in self.volumes:
+            livro = GoogleBooksProvider.converter(item)
+            texto = busca.normalizar(f"{livro['titulo']} {livro['autor']} {livro['isbn'] or ''}")
+            if all(t in texto for t in termos):
+                encontrados.append(livro)
+        return encontrados[:limite]
+
+
+@lru_cache(maxsize=None)
+def get_provedor() -> ProvedorLivros:
+    cfg = config()
+    return import_string(cfg["PROVEDOR"])(**cfg["OPCOES"])
+
+
+# ---------------------------------------------------------------------------
+# Busca
+# ---------------------------------------------------------------------------
+
+def _de_livro(livro: Livro) -> dict:
+    return {
+        "titulo": livro.titulo,
+        "autor": livro.autor,
+        "total_paginas": livro.total_paginas,
+        "isbn": livro.isbn,
+        "capa_url": livro.capa_url or capa_padrao(livro.titulo, livro.isbn),
+        "google_id": livro.google_id,
+        "livro_id": livro.id,
+        "origem": "local",
+    }
+
+
+def _buscar_locais(q: str, limite: int) -> list[dict]:
+    qs = Livro.objects.only("id", "titulo", "autor", "total_paginas", "isbn", "capa_url", "google_id")
+    qs = busca.filtrar(qs, q)
+    if "relevancia" in qs.query.annotations:
+        qs = qs.order_by("relevancia", "id")
+    return [_de_livro(l) for l in qs[:limite]]
+
+
+def _consultar_provedor(chave: str, q: str) -> tuple[list[dict], str]:
+    """
+    Lê do cache persistente ou chama o provedor e grava a resposta. Cada
+    gravação também apaga as consultas já expiradas (índice em expira_em).
+    """
+    agora = timezone.now()
+    cache = ConsultaLivroCache.objects.filter(consulta=chave, expira_em__gt=agora).first()
+    if cache is not None:
+        return cache.resultados, "cache"
+
+    try:
+        resultados = get_provedor().buscar(q, MAX_RESULTADOS)
+    except Exception:
+        logger.warning("Falha no provedor de busca de livros (q=%r)", q, exc_info=True)
+        return [], "erro"
+
+    cfg = config()
+    ttl = cfg["TTL"] if resultados else cfg["TTL_VAZIO"]
+    ConsultaLivroCache.objects.filter(expira_em__lte=agora).delete()
+    ConsultaLivroCache.objects.update_or_create(
+        consulta=chave,
+        defaults={
+            "resultados": resultados,
+            "vazio": not resultados,
+            "expira_em": agora + timedelta(seconds=ttl),
+        },
+    )
+    return resultados, "externo"
+
+
+def _vincular_existentes(resultados: list[dict]) -> None:
+    """Preenche livro_id dos resultados externos que já estão no catálogo (1 query)."""
+    google_ids = {r["google_id"] for r in resultados if r.get("google_id")}
+    isbns = {r["isbn"] for r in resultados if r.get("isbn")}
+    if not google_ids and not isbns:
+        return
+    por_google, por_isbn = {}, {}
+    for livro_id, google_id, isbn in Livro.objects.filter(
+        Q(google_id__in=google_ids) | Q(isbn__in=isbns)
+    ).values_list("id", "google_id", "isbn"):
+        if google_id:
+            por_google[google_id] = livro_id
+        if isbn:
+            por_isbn[isbn] = livro_id
+    for r in resultados:
+        r["livro_id"] = por_google.get(r.get("google_id")) or por_isbn.get(r.get("isbn"))
+
+
+def buscar_livros(q: str, limite: int | None = None) -> list[dict]:
+    """
+    Sugestões para o autocomplete: livros locais primeiro e, se não bastarem,
+    completa com o provedor externo (via cache), sem repetir livros locais.
+    """
+    limite = limite or config()["LIMITE"]
+    chave = normalizar_consulta(q)
+    if not chave:
+        return []
+
+    locais = _buscar_locais(q, limite)
+    if len(locais) >= limite:
+        return locais
+
+    externos, origem = _consultar_provedor(chave, q)
+    vistos_google = {l["google_id"] for l in locais if l["google_id"]}
+    vistos_isbn = {l["isbn"] for l in locais if l["isbn"]}
+    novos = [
+        {**r, "origem": origem}
+        for r in externos
+        if r.get("google_id") not in vistos_google and (not r.get("isbn") or r["isbn"] not in vistos_isbn)
+    ]
+    _vincular_existentes(novos)
+    return (locais + novos)[:limite]
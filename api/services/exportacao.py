@@ -0,0 +1,85 @@
+# api/services/exportacao.py
+"""
+Exportação do histórico do usuário em CSV ou NDJSON, em streaming.
+
+As linhas saem de values_list(...).iterator(chunk_size=...), com título e
+autor via JOIN (sem instanciar Livro/LeituraDiaria), e cada linha é
+serializada e entregue ao StreamingHttpResponse na hora: a memória do
+processo não cresce com o tamanho do histórico.
+"""
+import csv
+
+import orjson
+
+from contas.models import UserBook
+from livros.models import LeituraDiaria
+
+CHUNK_SIZE = 2000
+
+COLUNAS = {
+    "leituras": ("dia", "livro_id", "titulo", "autor", "paginas_lidas"),
+    "progresso": (
+        "livro_id", "titulo", "autor", "total_paginas", "pagina_atual",
+        "iniciado_em", "concluido_em", "atualizado_em",
+    ),
+}
+
+
+def _linhas_leituras(usuario, de=None, ate=None):
+    qs = LeituraDiaria.objects.filter(usuario=usuario)
+    if de:
+        qs = qs.filter(dia__gte=de)
+    if ate:
+        qs = qs.filter(dia__lte=ate)
+    return (
+        qs.order_by("dia", "livro_id")
+        .values_list("dia", "livro_id", "livro__titulo", "livro__autor", "paginas_lidas")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _linhas_progresso(usuario, de=None, ate=None):
+    qs = UserBook.objects.filter(usuario=usuario)
+    # no progresso o período filtra pela última atualização do vínculo
+    if de:
+        qs = qs.filter(atualizado_em__date__gte=de)
+    if ate:
+        qs = qs.filter(atualizado_em__date__lte=ate)
+    return (
+        qs.order_by("livro_id")
+        .values_list(
+            "livro_id", "livro__titulo", "livro__autor", "livro__total_paginas",
+            "pagina_atual", "iniciado_em", "concluido_em", "atualizado_em",
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+LINHAS = {"leituras": _linhas_leituras, "progresso": _linhas_progresso}
+
+
+class _Eco:
+    """Buffer 'write' que só devolve o texto (padrão de CSV em streaming do Django)."""
+
+    def write(self, valor):
+        return valor
+
+
+def _csv(colunas, linhas):
+    writer = csv.writer(_Eco())
+    yield "﻿"  # BOM: Excel abre UTF-8 com acentos corretos
+    yield writer.writerow(colunas)
+    for linha in linhas:
+        yield writer.writerow(["" if v is None else (v.isoformat() if hasattr(v, "isoformat") else v) for v in linha])
+
+
+def _ndjson(colunas, linhas):
+    for linha in linhas:
+        yield orjson.dumps(dict(zip(colunas, linha))) + b"\n"
+
+
+def exportar(usuario, dados: str = "leituras", formato: str = "csv", de=None, ate=None):
+    """Gerador com o conteúdo do arquivo ('dados': leituras|progresso)."""
+    linhas = LINHAS[dados](usuario, de, ate)
+    serializar = _csv if formato == "csv" else _ndjson
+    return serializar(COLUNAS[dados], linhas)
@@ -0,0 +1,138 @@
+# api/services/heatmap.py
+"""
+Mapa de calor de leitura (calendário estilo GitHub).
+
+A série é densa (um inteiro por dia a partir de 'inicio'), lida do
+ResumoDiario numa única consulta, e pode sair em três codificações:
+
+- "lista":  array JSON de inteiros;
+- "varint": base64url dos valores em varint LEB128 (0-127 páginas = 1 byte);
+- "delta":  como "varint", mas sobre a diferença para o dia anterior em
+            zigzag (-1 -> 1, 1 -> 2, ...), melhor para ritmos constantes.
+
+Decodificação: base64url -> bytes; cada valor ocupa bytes enquanto o bit
+0x80 estiver ligado (7 bits por byte, menos significativos primeiro); no
+"delta", desfaz o zigzag ((n >> 1) ^ -(n & 1)) e acumula.
+
+A versão (ETag) vem de Max(atualizado_em) + Count dos resumos do período,
+uma consulta barata que permite responder 304 sem montar a série; o payload
+pronto fica no cache do Django sob essa versão.
+"""
+import base64
+import hashlib
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from livros.models import ResumoDiario
+
+CACHE_TTL = 24 * 3600
+CODIFICACOES = ("lista", "varint", "delta")
+
+
+def codificar_varint(valores) -> str:
+    saida = bytearray()
+    for n in valores:
+        while True:
+            byte = n & 0x7F
+            n >>= 7
+            if n:
+                saida.append(byte | 0x80)
+            else:
+                saida.append(byte)
+                break
+    return base64.urlsafe_b64encode(bytes(saida)).decode().rstrip("=")
+
+
+def decodificar_varint(texto: str) -> list[int]:
+    dados = base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+    valores, n, deslocamento = [], 0, 0
+    for byte in dados:
+        n |= (byte & 0x7F) << deslocamento
+        if byte & 0x80:
+            deslocamento += 7
+        else:
+            valores.append(n)
+            n, deslocamento = 0, 0
+    return valores
+
+
+def _zigzag(n: int) -> int:
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+
+def codificar_delta(valores) -> str:
+    anterior, deltas = 0, []
+    for v in valores:
+        deltas.append(_zigzag(v - anterior))
+        anterior = v
+    return codificar_varint(deltas)
+
+
+def decodificar_delta(texto: str) -> list[int]:
+    valores, atual = [], 0
+    for n in decodificar_varint(texto):
+        atual += (n >> 1) ^ -(n & 1)
+        valores.append(atual)
+    return valores
+
+
+def periodo(ano: int, anos: int) -> tuple[date, date]:
+    """[1º de janeiro de 'ano' - (anos - 1), 1º de janeiro de 'ano' + 1)."""
+    return date(ano - anos + 1, 1, 1), date(ano + 1, 1, 1)
+
+
+def versao(usuario, inicio: date, fim: date, codificacao: str) -> str:
+    info = ResumoDiario.objects.filter(usuario=usuario, dia__gte=inicio, dia__lt=fim).aggregate(
+        ultima=Max("atualizado_em"), n=Count("id")
+    )
+    ultima = info["ultima"].isoformat() if info["ultima"] else ""
+    bruto = f"{usuario.pk}:{inicio}:{fim}:{codificacao}:{info['n']}:{ultima}"
+    return hashlib.sha1(bruto.encode()).hexdigest()[:20]
+
+
+def montar(usuario, inicio: date, fim: date, codificacao: str) -> dict:
+    por_dia = dict(
+        ResumoDiario.objects
+        .filter(usuario=usuario, dia__gte=inicio, dia__lt=fim, paginas__gt=0)
+        .values_list("dia", "paginas")
+    )
+    total_dias = (fim - inicio).days
+    valores = [por_dia.get(inicio + timedelta(days=i), 0) for i in range(total_dias)]
+
+    payload = {
+        "inicio": inicio,
+        "dias": total_dias,
+        "codificacao": codificacao,
+        "total": sum(valores),
+        "maximo": max(valores, default=0),
+        "dias_lidos": len(por_dia),
+        "valores": None,
+        "dados": None,
+    }
+    if codificacao == "lista":
+        payload["valores"] = valores
+    elif codificacao == "varint":
+        payload["dados"] = codificar_varint(valores)
+    else:
+        payload["dados"] = codificar_delta(valores)
+    return payload
+
+
+def heatmap(usuario, ano: int, anos: int = 1, codificacao: str = "lista", etag: str | None = None):
+    """
+    Devolve (etag, payload). payload é None quando 'etag' (If-None-Match do
+    cliente) ainda vale: a view responde 304 sem montar a série.
+    """
+    inicio, fim = periodo(ano, anos)
+    atual = versao(usuario, inicio, fim, codificacao)
+    if etag == atual:
+        return atual, None
+
+    chave = f"heatmap:{atual}"
+    payload = cache.get(chave)
+    if payload is None:
+        payload = montar(usuario, inicio, fim, codificacao)
+        cache.set(chave, payload, CACHE_TTL)
+    return atual, payload
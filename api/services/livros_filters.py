@@ -1,5 +1,6 @@
 # api/services/livros_filters.py
 from django.db.models import Q
+from livros import busca
 from livros.models import Livro  # ajuste o caminho
 
 ORDER_MAP = {
@@ -9,20 +10,18 @@ ORDER_MAP = {
     "-autor": "-autor",
     "paginas": "total_paginas",
     "-paginas": "-total_paginas",
-    "publicado": "publicado_em",      # ajuste pro nome real
-    "-publicado": "-publicado_em",
+    "avaliacao": "avaliacao",         # anulável: NULLs por último no modo cursor
+    "-avaliacao": "-avaliacao",
     "atualizado": "atualizado_em",    # ajuste pro nome real
     "-atualizado": "-atualizado_em",
+    "relevancia": "relevancia",       # só com 'q' (bm25: menor = mais relevante)
 }
 
 def apply_livro_filters(qs, f) -> "Livro.objects.none().__class__":
     """Aplica filtros comuns de LivrosBaseQuery a um QS de Livro."""
     if f.q:
-        qs = qs.filter(
-            Q(titulo__icontains=f.q) |
-            Q(autor__icontains=f.q) |
-            Q(editora__icontains=f.q)
-        )
+        # índice FTS5 (titulo/autor/isbn, sem acentos, por prefixo) com ranking
+        qs = busca.filtrar(qs, f.q)
     if f.categoria_id is not None:
         qs = qs.filter(categoria_id=f.categoria_id)
     if f.autor:
@@ -35,5 +34,19 @@ def apply_livro_filters(qs, f) -> "Livro.objects.none().__class__":
         qs = qs.filter(id__in=f.ids)
     return qs
 
-def apply_ordering(qs, ordering: str):
-    return qs.order_by(ORDER_MAP.get(ordering, "-atualizado_em"))
+async def aapply_livro_filters(qs, f):
+    """apply_livro_filters() para views async (detecta o FTS fora do event loop)."""
+    if f.q:
+        await busca.afts_disponivel()
+    return apply_livro_filters(qs, f)
+
+def apply_ordering(qs, ordering: str | None):
+    tem_relevancia = "relevancia" in qs.query.annotations
+    if ordering is None:
+        # sem ordenação explícita: resultados de busca vêm por relevância
+        ordering = "relevancia" if tem_relevancia else "-atualizado"
+    elif ordering == "relevancia" and not tem_relevancia:
+        ordering = "-atualizado"
+    campo = ORDER_MAP.get(ordering, "-atualizado_em")
+    # 'id' no mesmo sentido desempata a ordem (necessário para a paginação por cursor)
+    return qs.order_by(campo, "-id" if campo.startswith("-") else "id")
@@ -0,0 +1,192 @@
+# api/services/paginas_lote.py
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from contas.models import ContadoresUsuario, UserBook
+from livros import eventos
+from livros.models import Livro, LeituraDiaria, ResumoDiario, StreakLeitura
+
+
+def _resultado(indice, entrada, dia=None, status="ok", erro=None, delta=0, leitura=None, ub=None):
+    return {
+        "indice": indice,
+        "livro_id": entrada.livro_id,
+        "dia": dia,
+        "status": status,
+        "erro": erro,
+        "delta_aplicado": delta,
+        "paginas_no_dia": leitura.paginas_lidas if leitura is not None else (None if status == "erro" else 0),
+        "pagina_atual": ub.pagina_atual if ub is not None else None,
+    }
+
+
+def aplicar_lote_paginas(usuario, entradas) -> dict:
+    """
+    Aplica várias entradas (livro_id, dia, delta_paginas|pagina_atual) de uma vez.
+
+    Mesmas regras do add_pagina, na ordem recebida, mas numa única transação:
+    trava os UserBooks e as LeituraDiaria envolvidos, grava com bulk_create /
+    bulk_update e atualiza progresso, resumos e streak uma vez por lote.
+    Erros de uma entrada não impedem as demais (resultado por entrada); só
+    livros com alguma entrada aceita ganham UserBook novo.
+    """
+    hoje = timezone.localdate()
+    livros = Livro.objects.only("id", "total_paginas").in_bulk({e.livro_id for e in entradas})
+    dias = {e.data_de_leitura or hoje for e in entradas}
+    resultados = []
+
+    with transaction.atomic():
+        # trava os UserBooks dos livros do lote; os que faltarem ficam em
+        # memória (sem pk) até se saber se alguma entrada do livro foi aceita
+        vinculos = UserBook.objects.select_for_update().filter(usuario=usuario)
+        ubs = {ub.livro_id: ub for ub in vinculos.filter(livro_id__in=list(livros))}
+        faltando = [livro_id for livro_id in livros if livro_id not in ubs]
+        ubs.update((livro_id, UserBook(usuario=usuario, livro_id=livro_id, pagina_atual=0)) for livro_id in faltando)
+        for ub in ubs.values():
+            ub.livro = livros[ub.livro_id]
+        pagina_inicial = {livro_id: ub.pagina_atual for livro_id, ub in ubs.items()}
+
+        # soma real dos logs por livro: pagina_atual = min(soma, total), então só
+        # nos vínculos que estão no teto a soma pode ser maior (uma consulta)
+        soma = dict(pagina_inicial)
+        no_teto = [livro_id for livro_id, ub in ubs.items() if ub.pk and ub.pagina_atual >= livros[livro_id].total_paginas]
+        if no_teto:
+            soma.update(
+                LeituraDiaria.objects.filter(usuario=usuario, livro_id__in=no_teto)
+                .order_by().values("livro_id").annotate(total=Sum("paginas_lidas"))
+                .values_list("livro_id", "total")
+            )
+        aceitos = set()
+
+        # registros do dia já existentes (unique: usuario+livro+dia)
+        leituras = {
+            (l.livro_id, l.dia): l
+            for l in LeituraDiaria.objects.select_for_update().filter(
+                usuario=usuario, livro_id__in=list(livros), dia__in=dias
+            )
+        }
+        originais = {chave: l.paginas_lidas for chave, l in leituras.items()}
+        dias_ja_lidos = set(
+            LeituraDiaria.objects.filter(usuario=usuario, dia__in=dias)
+            .values_list("dia", flat=True).distinct()
+        )
+
+        for indice, entrada in enumerate(entradas):
+            livro = livros.get(entrada.livro_id)
+            if livro is None:
+                resultados.append(_resultado(indice, entrada, status="erro", erro="Livro não encontrado."))
+                continue
+
+            ub = ubs[livro.id]
+            dia = entrada.data_de_leitura or hoje
+            atual_anterior = ub.pagina_atual or 0
+
+            if entrada.delta_paginas is not None:
+                delta = int(entrada.delta_paginas)
+            else:
+                delta = max(0, int(entrada.pagina_atual)) - atual_anterior
+
+            # clamp para não ultrapassar o total do livro (apenas se positivo)
+            if delta > 0 and livro.total_paginas is not None:
+                delta = min(delta, max(0, livro.total_paginas - atual_anterior))
+
+            chave = (livro.id, dia)
+            leitura = leituras.get(chave)
+            registrado = leitura.paginas_lidas if leitura is not None else 0
+
+            if delta < 0 and registrado == 0:
+                resultados.append(_resultado(
+                    indice, entrada, dia, "erro",
+                    "Não há páginas registradas neste dia para reduzir.", ub=ub,
+                ))
+                continue
+            if registrado + delta < 0:
+                resultados.append(_resultado(
+                    indice, entrada, dia, "erro",
+                    "Redução maior que o registrado para o dia.", leitura=leitura, ub=ub,
+                ))
+                continue
+            if delta == 0:
+                resultados.append(_resultado(indice, entrada, dia, "ignorado", leitura=leitura, ub=ub))
+                continue
+
+            if leitura is None:
+                leitura = LeituraDiaria(usuario=usuario, livro=livro, dia=dia, paginas_lidas=0)
+                leituras[chave] = leitura
+            leitura.paginas_lidas = registrado + delta
+            # mesmo clamp do add_pagina (LeituraDiaria._aplicar_delta_progresso)
+            soma[livro.id] += delta
+            ub.pagina_atual = min(max(0, soma[livro.id]), livro.total_paginas)
+            aceitos.add(livro.id)
+            resultados.append(_resultado(indice, entrada, dia, delta=delta, leitura=leitura, ub=ub))
+
+        # --- persistência em lote ---
+        agora = timezone.now()
+        criar, atualizar, remover = [], [], []
+        deltas_dia = defaultdict(int)
+        for chave, leitura in leituras.items():
+            original = originais.get(chave, 0)
+            if leitura.paginas_lidas == original:
+                continue
+            deltas_dia[chave[1]] += leitura.paginas_lidas - original
+            if leitura.pk is None:
+                criar.append(leitura)
+            elif leitura.paginas_lidas == 0:
+                remover.append(leitura.pk)  # CHECK/sem páginas: remove o registro do dia
+            else:
+                leitura.atualizado_em = agora
+                atualizar.append(leitura)
+
+        LeituraDiaria.objects.bulk_create(criar)
+        LeituraDiaria.objects.bulk_update(atualizar, ["paginas_lidas", "atualizado_em"])
+        if remover:
+            LeituraDiaria.objects.filter(pk__in=remover).delete()
+
+        # vínculos novos: só dos livros com entrada aceita
+        novos = [livro_id for livro_id in faltando if livro_id in aceitos]
+        if novos:
+            UserBook.objects.bulk_create(
+                [UserBook(usuario=usuario, livro_id=livro_id) for livro_id in novos],
+                ignore_conflicts=True,
+            )
+            for criado in vinculos.filter(livro_id__in=novos):
+                criado.livro = livros[criado.livro_id]
+                pagina_inicial[criado.livro_id] = criado.pagina_atual
+                criado.pagina_atual = ubs[criado.livro_id].pagina_atual
+                ubs[criado.livro_id] = criado
+            # bulk_create pula o save(): os vínculos novos entram nos contadores aqui
+            ContadoresUsuario.somar(usuario.pk, livros_ativos=len(novos))
+        for livro_id in set(faltando) - aceitos:
+            del ubs[livro_id]
+
+        # progresso: cada UserBook afetado é gravado uma vez
+        alterados = []
+        for livro_id, ub in ubs.items():
+            if ub.pagina_atual != pagina_inicial[livro_id]:
+                ub._clamp_and_flag_conclusao()
+                ub.atualizado_em = agora
+                alterados.append(ub)
+        UserBook.objects.bulk_update(alterados, ["pagina_atual", "concluido_em", "atualizado_em"])
+        UserBook.aplicar_nos_contadores(alterados)
+
+        ResumoDiario.aplicar_deltas(usuario.pk, deltas_dia)
+
+        # streak: só dias que ganharam a primeira leitura ou perderam a última
+        adicionados = {l.dia for l in criar} - dias_ja_lidos
+        removidos = set()
+        if remover:
+            dias_removidos = {leituras[k].dia for k in leituras if leituras[k].pk in remover}
+            ainda_lidos = set(
+                LeituraDiaria.objects.filter(usuario=usuario, dia__in=dias_removidos)
+                .values_list("dia", flat=True).distinct()
+            )
+            removidos = dias_removidos - ainda_lidos
+        StreakLeitura.aplicar_dias(usuario.pk, adicionados=adicionados, removidos=removidos)
+
+        # os hooks de LeituraDiaria.save() não rodam no lote: um aviso só para o SSE
+        eventos.publicar(usuario.pk, "lote", livro_ids=sorted(ubs))
+
+    return {"resultados": resultados, "userbooks": list(ubs.values())}
@@ -0,0 +1,85 @@
+# api/services/progresso_ao_vivo.py
+"""
+Feed SSE (text/event-stream) do progresso do usuário: GET /api/user/eventos.
+
+Ao conectar, o cliente recebe um evento "estado" (total do mês contra a
+meta e streak); depois, a cada aviso de livros/eventos.py, um evento
+"progresso" com o mesmo resumo mais os UserBooks dos livros alterados.
+Avisos que chegam em rajada (ex.: um lote) viram um único evento.
+
+O estado é relido com o ORM async só para quem está conectado, então as
+escritas não pagam pelo feed. Sem eventos, um comentário ': ping' a cada
+HEARTBEAT segundos mantém a conexão viva através de proxies; após
+DURACAO_MAX o servidor encerra e o EventSource reconecta sozinho (e recebe
+um "estado" novo, cobrindo o que tiver mudado no intervalo).
+"""
+import asyncio
+import time
+
+import orjson
+from django.db.models import F
+from django.utils import timezone
+
+from contas.models import UserBook
+from livros import eventos
+from livros.models import ResumoMensal, StreakLeitura
+
+RECONEXAO_MS = 5000
+
+
+def _sse(nome: str, dados) -> bytes:
+    return b"event: " + nome.encode() + b"\ndata: " + orjson.dumps(dados) + b"\n\n"
+
+
+def _livros_do_evento(evento: dict) -> set:
+    if "livro_ids" in evento:
+        return set(evento["livro_ids"])
+    return {evento["livro_id"]} if evento.get("livro_id") else set()
+
+
+async def estado(usuario, livro_ids=()) -> dict:
+    """Resumo do mês, streak e os UserBooks de 'livro_ids' (3 consultas no máximo)."""
+    hoje = timezone.localdate()
+    lidas = await ResumoMensal.atotal(usuario, hoje)
+    streak = await StreakLeitura.objects.filter(usuario=usuario).afirst()
+
+    livros = []
+    if livro_ids:
+        livros = [
+            ub async for ub in (
+                UserBook.objects
+                .filter(usuario=usuario, livro_id__in=livro_ids)
+                .values("livro_id", "pagina_atual", "concluido_em", total_paginas=F("livro__total_paginas"))
+            )
+        ]
+
+    return {
+        "mes": usuario.progresso_meta_mensal(mes=hoje, lidas=lidas),
+        "streak": {
+            "vivo": streak.vivo(hoje) if streak else 0,
+            "maior": streak.maior if streak else 0,
+        },
+        "livros": livros,
+    }
+
+
+async def fluxo(usuario):
+    """Gerador async com os bytes do stream SSE do usuário."""
+    cfg = eventos.config()
+    fim = time.monotonic() + cfg["DURACAO_MAX"]
+
+    # assina antes de montar o estado inicial: nada que mude entre os dois se perde
+    async with eventos.get_backend().assinar(eventos.canal_usuario(usuario.pk)) as fila:
+        yield f"retry: {RECONEXAO_MS}\n".encode() + _sse("estado", await estado(usuario))
+
+        while (restante := fim - time.monotonic()) > 0:
+            try:
+                evento = await asyncio.wait_for(fila.get(), timeout=min(cfg["HEARTBEAT"], restante))
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+
+            livro_ids = _livros_do_evento(evento)
+            while not fila.empty():
+                livro_ids |= _livros_do_evento(fila.get_nowait())
+            yield _sse("progresso", await estado(usuario, livro_ids))
@@ -1,3 +1,547 @@
-from django.test import TestCase
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.services import busca_livros
+from contas.models import Usuario
+from livros.models import Categoria, ConsultaLivroCache, Livro
+
+PROVEDOR_ARQUIVO = {"PROVEDOR": "api.services.busca_livros.ArquivoProvider", "OPCOES": {}}
+
+
+@override_settings(LIVROS_BUSCA=PROVEDOR_ARQUIVO)
+class BuscaLivrosTests(TestCase):
+    """
+    Ordem de resolução da busca do cadastro com o provedor de arquivo
+    (api/fixtures/busca_livros.json): catálogo local, cache, provedor.
+    """
+
+    def setUp(self):
+        busca_livros.get_provedor.cache_clear()
+        self.addCleanup(busca_livros.get_provedor.cache_clear)
+        self.provedor = busca_livros.get_provedor()
+
+    def test_livros_locais_vem_primeiro_e_nao_se_repetem(self):
+        categoria = Categoria.objects.create(nome="Romance")
+        local = Livro.objects.create(
+            titulo="Dom Casmurro", autor="Machado de Assis", total_paginas=256,
+            categoria=categoria, google_id="fake-dom-casmurro",
+        )
+        resultados = busca_livros.buscar_livros("machado", limite=5)
+
+        self.assertEqual(resultados[0]["livro_id"], local.pk)
+        self.assertEqual(resultados[0]["origem"], "local")
+        self.assertEqual([r["google_id"] for r in resultados].count("fake-dom-casmurro"), 1)
+        self.assertEqual({r["origem"] for r in resultados[1:]}, {"externo"})
+
+    def test_locais_suficientes_nao_chamam_o_provedor(self):
+        categoria = Categoria.objects.create(nome="Romance")
+        Livro.objects.create(titulo="Dom Casmurro", autor="Machado de Assis", total_paginas=256, categoria=categoria)
+        self.assertEqual(len(busca_livros.buscar_livros("casmurro", limite=1)), 1)
+        self.assertEqual(self.provedor.chamadas, 0)
+
+    def test_cache_serve_qualquer_limite_da_mesma_consulta(self):
+        self.assertEqual(len(busca_livros.buscar_livros("Machado", limite=1)), 1)
+        resultados = busca_livros.buscar_livros("machado!", limite=3)
+
+        self.assertEqual(len(resultados), 3)
+        self.assertEqual({r["origem"] for r in resultados}, {"cache"})
+        self.assertEqual(self.provedor.chamadas, 1)
+
+    def test_cache_expirado_chama_o_provedor_de_novo(self):
+        busca_livros.buscar_livros("vidas secas")
+        ConsultaLivroCache.objects.update(expira_em=timezone.now() - timedelta(seconds=1))
+
+        resultados = busca_livros.buscar_livros("vidas secas")
+        self.assertEqual(resultados[0]["origem"], "externo")
+        self.assertEqual(self.provedor.chamadas, 2)
+
+    def test_cache_negativo(self):
+        self.assertEqual(busca_livros.buscar_livros("livro inexistente"), [])
+        self.assertEqual(busca_livros.buscar_livros("livro inexistente"), [])
+
+        consulta = ConsultaLivroCache.objects.get()
+        self.assertTrue(consulta.vazio)
+        self.assertEqual(self.provedor.chamadas, 1)
+        # TTL menor que o das respostas com resultado
+        self.assertLessEqual(consulta.expira_em, timezone.now() + timedelta(seconds=3600))
+
+    def test_gravacao_apaga_consultas_expiradas(self):
+        ConsultaLivroCache.objects.create(consulta="antiga", expira_em=timezone.now() - timedelta(days=1))
+        busca_livros.buscar_livros("quincas")
+        self.assertEqual(list(ConsultaLivroCache.objects.values_list("consulta", flat=True)), ["quincas"])
+
+    def test_falha_do_provedor_nao_e_cacheada(self):
+        self.provedor.caminho = self.provedor.caminho.with_name("nao-existe.json")
+        with self.assertLogs("api.services.busca_livros", "WARNING"):
+            self.assertEqual(busca_livros.buscar_livros("machado"), [])
+        self.assertFalse(ConsultaLivroCache.objects.exists())
+
+    def test_provedor_sem_buscar_falha_ao_construir(self):
+        class Incompleto(busca_livros.ProvedorLivros):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incompleto()
+
+
+@override_settings(LIVROS_BUSCA=PROVEDOR_ARQUIVO)
+class BuscaLivrosEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()  # histórico do limite de taxa
+        busca_livros.get_provedor.cache_clear()
+        self.addCleanup(busca_livros.get_provedor.cache_clear)
+
+    def test_exige_autenticacao(self):
+        resposta = self.client.get("/api/livros/buscar", {"q": "machado"})
+        self.assertEqual(resposta.status_code, 403)
+        self.assertFalse(ConsultaLivroCache.objects.exists())
+
+    def test_sessao_e_limite_de_taxa(self):
+        usuario = Usuario.objects.create_user("busca@exemplo.com", "x", name="Busca")
+        self.client.force_login(usuario)
+        limite = int(busca_livros.CONFIG_PADRAO["TAXA"].split("/")[0])
+
+        for _ in range(limite):
+            self.assertEqual(self.client.get("/api/livros/buscar", {"q": "machado"}).status_code, 200)
+        self.assertEqual(self.client.get("/api/livros/buscar", {"q": "machado"}).status_code, 429)
+
+
+class InstrumentacaoTests(TestCase):
+    """Server-Timing/X-Query-Count só vão para clientes comuns com CABECALHOS ligado."""
+
+    def setUp(self):
+        categoria = Categoria.objects.create(nome="Instrumentação")
+        self.url = f"/api/livro/{Livro.objects.create(titulo='L', autor='A', total_paginas=1, categoria=categoria).pk}"
+
+    @override_settings(INSTRUMENTACAO={"ATIVA": True, "CABECALHOS": False})
+    def test_cabecalhos_so_para_staff(self):
+        self.assertNotIn("X-Query-Count", self.client.get(self.url))
+
+        staff = Usuario.objects.create_user("staff@exemplo.com", "x", name="Staff", is_staff=True)
+        self.client.force_login(staff)
+        resposta = self.client.get(self.url)
+        self.assertIn("X-Query-Count", resposta)
+        self.assertIn("Server-Timing", resposta)
+
+    @override_settings(DEBUG=False, INSTRUMENTACAO={})
+    def test_desligada_fora_do_debug(self):
+        from core.middleware import config
+
+        self.assertFalse(config()["ATIVA"])
+        self.assertNotIn("Server-Timing", self.client.get(self.url))
+
+    @override_settings(INSTRUMENTACAO={"ATIVA": True, "CABECALHOS": True})
+    async def test_requisicoes_simultaneas_contam_separado(self):
+        import asyncio
+
+        from django.http import HttpResponse
+        from django.test import AsyncRequestFactory
+
+        from core.middleware import InstrumentacaoMiddleware
+
+        async def view(request):
+            for _ in range(int(request.GET["n"])):
+                await Livro.objects.acount()
+                await asyncio.sleep(0)  # intercala com a outra requisição
+            return HttpResponse()
+
+        middleware = InstrumentacaoMiddleware(view)
+        fabrica = AsyncRequestFactory()
+        duas, cinco = await asyncio.gather(
+            middleware(fabrica.get("/", {"n": 2})), middleware(fabrica.get("/", {"n": 5}))
+        )
+        self.assertEqual((duas["X-Query-Count"], cinco["X-Query-Count"]), ("2", "5"))
+
+
+class PaginasLoteTests(TestCase):
+    """POST /api/user/livro/add_paginas segue as regras do add_pagina, entrada a entrada."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Lote")
+        cls.usuario = Usuario.objects.create_user("lote@exemplo.com", "x", name="Lote")
+        cls.livro = Livro.objects.create(titulo="Cem", autor="Autor", total_paginas=100, categoria=categoria)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def lote(self, *entradas):
+        resposta = self.client.post(
+            "/api/user/livro/add_paginas", {"entradas": list(entradas)}, content_type="application/json"
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.content)
+        return resposta.json()
+
+    def test_progresso_por_entrada_fica_no_total_e_bate_com_os_logs(self):
+        from contas.models import UserBook
+        from livros.models import LeituraDiaria
+
+        # logs acima do total (ex.: importação): 140 páginas num livro de 100
+        LeituraDiaria.objects.create(usuario=self.usuario, livro=self.livro, dia=date(2025, 6, 1), paginas_lidas=80)
+        LeituraDiaria.objects.create(usuario=self.usuario, livro=self.livro, dia=date(2025, 6, 2), paginas_lidas=60)
+
+        dados = self.lote(
+            {"livro_id": self.livro.pk, "pagina_atual": 70, "data_de_leitura": "2025-06-02"},   # 140 -> 110
+            {"livro_id": self.livro.pk, "pagina_atual": 80, "data_de_leitura": "2025-06-02"},   # 110 -> 90
+            {"livro_id": self.livro.pk, "delta_paginas": 50, "data_de_leitura": "2025-06-03"},  # só faltam 10
+        )
+        self.assertEqual([r["pagina_atual"] for r in dados["resultados"]], [100, 90, 100])
+        self.assertEqual([r["delta_aplicado"] for r in dados["resultados"]], [-30, -20, 10])
+
+        ub = UserBook.objects.get(usuario=self.usuario, livro=self.livro)
+        soma = sum(LeituraDiaria.objects.filter(usuario=self.usuario).values_list("paginas_lidas", flat=True))
+        self.assertEqual(ub.pagina_atual, min(soma, self.livro.total_paginas))
+        self.assertIsNotNone(ub.concluido_em)
+
+    def test_so_livros_com_entrada_aceita_ganham_userbook(self):
+        from contas.models import ContadoresUsuario, UserBook
+
+        outro = Livro.objects.create(titulo="Outro", autor="Autor", total_paginas=50, categoria=self.livro.categoria)
+        dados = self.lote(
+            {"livro_id": self.livro.pk, "pagina_atual": 0},     # nada muda: ignorado
+            {"livro_id": outro.pk, "delta_paginas": 10},
+            {"livro_id": 999999, "delta_paginas": 1},
+        )
+        self.assertEqual([r["status"] for r in dados["resultados"]], ["ignorado", "ok", "erro"])
+        self.assertEqual([ub["livro_id"] for ub in dados["userbooks"]], [outro.pk])
+        self.assertEqual(list(UserBook.objects.filter(usuario=self.usuario).values_list("livro_id", flat=True)), [outro.pk])
+        self.assertEqual(ContadoresUsuario.verificar(self.usuario, corrigir=False), 0)
+
+
+class PaginacaoPorCursorTests(TestCase):
+    """Modo cursor de /api/livros/: percorre tudo, sem repetir, inclusive com NULLs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Cursor")
+        for i, avaliacao in enumerate([3, None, 5, 3, None, 1, None, 4]):
+            Livro.objects.create(
+                titulo=f"Livro {i}", autor="Autor", total_paginas=10 + i, avaliacao=avaliacao, categoria=categoria
+            )
+
+    def percorrer(self, ordering):
+        ids, cursor = [], None
+        while True:
+            params = {"ordering": ordering, "paginacao": "cursor", "limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            resposta = self.client.get("/api/livros/", params)
+            self.assertEqual(resposta.status_code, 200, resposta.content)
+            dados = resposta.json()
+            ids += [livro["id"] for livro in dados["items"]]
+            cursor = dados["next_cursor"]
+            if not cursor:
+                return ids
+
+    def test_ordenacao_anulavel_nulls_por_ultimo(self):
+        for ordering in ("avaliacao", "-avaliacao"):
+            with self.subTest(ordering=ordering):
+                desc = ordering.startswith("-")
+                livros = sorted(
+                    Livro.objects.values("id", "avaliacao"),
+                    key=lambda l: (l["avaliacao"] is None, -(l["avaliacao"] or 0) if desc else (l["avaliacao"] or 0),
+                                   -l["id"] if desc else l["id"]),
+                )
+                self.assertEqual(self.percorrer(ordering), [l["id"] for l in livros])
+
+    def test_todas_as_ordenacoes_do_schema(self):
+        from typing import get_args
+
+        from api.schemas import LivrosBaseQuery
+
+        literal = get_args(LivrosBaseQuery.model_fields["ordering"].annotation)[0]
+        total = Livro.objects.count()
+        for ordering in get_args(literal):
+            with self.subTest(ordering=ordering):
+                ids = self.percorrer(ordering)
+                self.assertEqual((len(ids), len(set(ids))), (total, total))
+
+
+class EventosAoVivoTests(TestCase):
+    """Pub/sub de livros/eventos.py e o feed SSE em /api/user/eventos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user("eventos@exemplo.com", "x", name="Eventos")
+        categoria = Categoria.objects.create(nome="Eventos")
+        cls.livro = Livro.objects.create(titulo="Ao vivo", autor="Autor", total_paginas=100, categoria=categoria)
+
+    async def test_backend_memoria_entrega_a_todos_do_canal(self):
+        import asyncio
+
+        from livros.eventos import BackendMemoria
+
+        backend = BackendMemoria(tamanho_fila=2)
+        async with backend.assinar("a") as primeiro, backend.assinar("a") as segundo, backend.assinar("b") as outro:
+            for n in range(3):
+                backend.publicar("a", {"n": n})
+            await asyncio.sleep(0)  # entregas agendadas com call_soon_threadsafe
+
+            # fila cheia descarta o mais antigo
+            self.assertEqual([primeiro.get_nowait(), primeiro.get_nowait()], [{"n": 1}, {"n": 2}])
+            self.assertEqual(segundo.qsize(), 2)
+            self.assertTrue(outro.empty())
+        self.assertEqual(backend._assinantes, {})
+
+    def test_publicar_so_depois_do_commit(self):
+        from unittest import mock
+
+        from livros import eventos
+
+        with mock.patch.object(eventos, "_enviar") as enviar:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                eventos.publicar(self.usuario.pk, "leitura", livro_id=self.livro.pk)
+                enviar.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        enviar.assert_called_once_with(
+            eventos.canal_usuario(self.usuario.pk), {"tipo": "leitura", "livro_id": self.livro.pk}
+        )
+
+    def test_sob_wsgi_responde_503_e_o_dashboard_nao_inclui_o_script(self):
+        from django.urls import reverse
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get("/api/user/eventos").status_code, 503)
+        self.assertNotContains(self.client.get(reverse("livros:dashboard")), "progressoAoVivo.js")
+
+    async def test_feed_sse_envia_estado_e_progresso(self):
+        from contas.models import UserBook
+        from livros import eventos
+
+        await UserBook.objects.acreate(usuario=self.usuario, livro=self.livro, pagina_atual=30)
+        await self.async_client.aforce_login(self.usuario)
+        resposta = await self.async_client.get("/api/user/eventos")
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta["Content-Type"], "text/event-stream")
+
+        fluxo = aiter(resposta.streaming_content)
+        self.assertIn(b"event: estado", await anext(fluxo))
+
+        eventos.get_backend().publicar(eventos.canal_usuario(self.usuario.pk), {"tipo": "leitura", "livro_id": self.livro.pk})
+        progresso = await anext(fluxo)
+        self.assertIn(b"event: progresso", progresso)
+        self.assertIn(b'"pagina_atual":30', progresso)
+        await fluxo.aclose()
+
+
+class RequisicoesCondicionaisTests(TestCase):
+    """ETag/If-None-Match (api/condicional.py): 304 sem mudança, validador novo após escrita."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = Categoria.objects.create(nome="Condicional")
+        cls.livro = Livro.objects.create(titulo="Versão 1", autor="Autor", total_paginas=10, categoria=cls.categoria)
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidar(self, url, **extras):
+        primeira = self.client.get(url, **extras)
+        self.assertEqual(primeira.status_code, 200)
+        self.assertIn("ETag", primeira)
+
+        repetida = self.client.get(url, HTTP_IF_NONE_MATCH=primeira["ETag"], **extras)
+        self.assertEqual(repetida.status_code, 304)
+        self.assertEqual(repetida["ETag"], primeira["ETag"])
+        self.assertEqual(repetida.content, b"")
+        return primeira["ETag"]
+
+    def test_categorias(self):
+        etag = self.revalidar("/api/categorias/")
+
+        resposta = self.client.put(
+            f"/api/categoria/{self.categoria.pk}", {"nome": "Renomeada"}, content_type="application/json"
+        )
+        self.assertEqual(resposta.status_code, 200)
+
+        depois = self.client.get("/api/categorias/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(depois.status_code, 200)
+        self.assertNotEqual(depois["ETag"], etag)
+        self.assertEqual([c["nome"] for c in depois.json()], ["Renomeada"])
+
+    def test_detalhe_do_livro(self):
+        url = f"/api/livro/{self.livro.pk}"
+        etag = self.revalidar(url)
+
+        self.livro.titulo = "Versão 2"
+        self.livro.save()
+        depois = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(depois.status_code, 200)
+        self.assertEqual(depois.json()["titulo"], "Versão 2")
+
+    def test_livros_do_usuario_sao_privados_e_por_usuario(self):
+        from contas.models import UserBook
+
+        usuarios = [Usuario.objects.create_user(f"cond{i}@exemplo.com", "x", name=f"C{i}") for i in range(2)]
+        for usuario in usuarios:
+            UserBook.objects.create(usuario=usuario, livro=self.livro)
+
+        etags = []
+        for usuario in usuarios:
+            self.client.force_login(usuario)
+            etags.append(self.revalidar("/api/user/livros"))
+            self.assertEqual(self.client.get("/api/user/livros")["Cache-Control"], "private, no-cache")
+        self.assertNotEqual(*etags)
+
+        UserBook.objects.filter(usuario=usuarios[1]).update(pagina_atual=5, atualizado_em=timezone.now())
+        self.assertEqual(self.client.get("/api/user/livros", HTTP_IF_NONE_MATCH=etags[1]).status_code, 200)
+
+
+class HeatmapTests(TestCase):
+    """GET /api/user/leituras/heatmap: codificações equivalentes e 304 pelo ETag."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from livros.models import LeituraDiaria
+
+        cls.usuario = Usuario.objects.create_user("heatmap@exemplo.com", "x", name="Heatmap")
+        cls.livro = Livro.objects.create(
+            titulo="Calor", autor="Autor", total_paginas=1000, categoria=Categoria.objects.create(nome="Heatmap")
+        )
+        for dia, paginas in ((date(2025, 1, 1), 5), (date(2025, 1, 2), 200), (date(2025, 3, 10), 1)):
+            LeituraDiaria.objects.create(usuario=cls.usuario, livro=cls.livro, dia=dia, paginas_lidas=paginas)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+
+    def get(self, **params):
+        return self.client.get("/api/user/leituras/heatmap", {"ano": 2025, **params})
+
+    def test_codificacoes_devolvem_a_mesma_serie(self):
+        from api.services.heatmap import decodificar_delta, decodificar_varint
+
+        lista = self.get().json()
+        self.assertEqual((lista["dias"], lista["total"], lista["maximo"], lista["dias_lidos"]), (365, 206, 200, 3))
+        self.assertEqual(lista["valores"][:3], [5, 200, 0])
+        self.assertEqual(lista["valores"][31 + 28 + 9], 1)
+
+        self.assertEqual(decodificar_varint(self.get(codificacao="varint").json()["dados"]), lista["valores"])
+        self.assertEqual(decodificar_delta(self.get(codificacao="delta").json()["dados"]), lista["valores"])
+
+    def test_304_ate_uma_leitura_nova(self):
+        from livros.models import LeituraDiaria
+
+        primeira = self.get(codificacao="delta")
+        etag = primeira["ETag"]
+        self.assertEqual(self.client.get(
+            "/api/user/leituras/heatmap", {"ano": 2025, "codificacao": "delta"}, HTTP_IF_NONE_MATCH=etag
+        ).status_code, 304)
+        # cada codificação tem o seu validador
+        self.assertNotEqual(self.get()["ETag"], etag)
+
+        LeituraDiaria.objects.create(usuario=self.usuario, livro=self.livro, dia=date(2025, 6, 1), paginas_lidas=7)
+        depois = self.client.get(
+            "/api/user/leituras/heatmap", {"ano": 2025, "codificacao": "delta"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(depois.status_code, 200)
+        self.assertEqual(depois.json()["total"], 213)
+
+
+class ExportacaoTests(TestCase):
+    """GET /api/user/leituras/export: conteúdo de cada formato e filtro de período."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from contas.models import UserBook
+        from livros.models import LeituraDiaria
+
+        cls.usuario = Usuario.objects.create_user("export@exemplo.com", "x", name="Export")
+        outro = Usuario.objects.create_user("outro-export@exemplo.com", "x", name="Outro")
+        categoria = Categoria.objects.create(nome="Export")
+        cls.livro = Livro.objects.create(titulo="Coração, ação", autor="Autor", total_paginas=100, categoria=categoria)
+        UserBook.objects.create(usuario=cls.usuario, livro=cls.livro)
+        for dia, paginas in ((date(2025, 1, 2), 10), (date(2025, 1, 1), 5), (date(2025, 2, 1), 7)):
+            LeituraDiaria.objects.create(usuario=cls.usuario, livro=cls.livro, dia=dia, paginas_lidas=paginas)
+        LeituraDiaria.objects.create(usuario=outro, livro=cls.livro, dia=date(2025, 1, 1), paginas_lidas=99)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def exportar(self, **params):
+        resposta = self.client.get("/api/user/leituras/export", params)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta, b"".join(resposta.streaming_content)
+
+    def test_csv_de_leituras(self):
+        import csv
+        import io
+
+        resposta, corpo = self.exportar(de="2025-01-01", ate="2025-01-31")
+        self.assertEqual(resposta["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="leituras-', resposta["Content-Disposition"])
+        self.assertTrue(corpo.startswith("﻿".encode()))
+
+        linhas = list(csv.reader(io.StringIO(corpo.decode("utf-8-sig"))))
+        self.assertEqual(linhas, [
+            ["dia", "livro_id", "titulo", "autor", "paginas_lidas"],
+            ["2025-01-01", str(self.livro.pk), "Coração, ação", "Autor", "5"],
+            ["2025-01-02", str(self.livro.pk), "Coração, ação", "Autor", "10"],
+        ])
+
+    def test_ndjson_de_progresso(self):
+        import orjson
+
+        resposta, corpo = self.exportar(dados="progresso", formato="ndjson")
+        self.assertEqual(resposta["Content-Type"], "application/x-ndjson")
+        registros = [orjson.loads(linha) for linha in corpo.splitlines()]
+        self.assertEqual(len(registros), 1)
+        self.assertEqual(
+            {k: registros[0][k] for k in ("livro_id", "total_paginas", "pagina_atual", "concluido_em")},
+            {"livro_id": self.livro.pk, "total_paginas": 100, "pagina_atual": 22, "concluido_em": None},
+        )
+
+    def test_periodo_invertido_e_422(self):
+        resposta = self.client.get("/api/user/leituras/export", {"de": "2025-02-01", "ate": "2025-01-01"})
+        self.assertEqual(resposta.status_code, 422)
+
+
+class ProgressoAnualTests(TestCase):
+    """GET /api/user/leituras/progresso-anual: meta do ano, meses, concluídos e projeção."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from datetime import datetime
+
+        from contas.models import UserBook
+        from livros.models import LeituraDiaria
+
+        cls.usuario = Usuario.objects.create_user("anual@exemplo.com", "x", name="Anual", meta_anual_paginas=1000)
+        categoria = Categoria.objects.create(nome="Anual")
+        livros = [
+            Livro.objects.create(titulo=f"Livro {i}", autor="Autor", total_paginas=500, categoria=categoria)
+            for i in range(2)
+        ]
+        LeituraDiaria.objects.create(usuario=cls.usuario, livro=livros[0], dia=date(2025, 1, 10), paginas_lidas=100)
+        LeituraDiaria.objects.create(usuario=cls.usuario, livro=livros[0], dia=date(2025, 3, 5), paginas_lidas=50)
+        LeituraDiaria.objects.create(usuario=cls.usuario, livro=livros[1], dia=date(2024, 12, 31), paginas_lidas=80)
+
+        tz = timezone.get_current_timezone()
+        # os vínculos já vêm das leituras
+        UserBook.objects.filter(livro=livros[0]).update(concluido_em=datetime(2025, 6, 1, tzinfo=tz))
+        UserBook.objects.filter(livro=livros[1]).update(concluido_em=datetime(2024, 12, 31, 23, tzinfo=tz))
+
+    def test_ano_encerrado(self):
+        self.client.force_login(self.usuario)
+        resposta = self.client.get("/api/user/leituras/progresso-anual", {"ano": 2025})
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+
+        self.assertEqual(
+            {k: dados[k] for k in ("ano", "meta", "lidas", "restante", "pct", "livros_concluidos", "projecao_ano")},
+            {"ano": 2025, "meta": 1000, "lidas": 150, "restante": 850, "pct": 15, "livros_concluidos": 1, "projecao_ano": 150},
+        )
+        self.assertEqual([m["lidas"] for m in dados["meses"]], [100, 0, 50] + [0] * 9)
+        self.assertIsNone(dados["previsao_meta"])
+
+    def test_ano_corrente_projeta_o_ritmo(self):
+        from datetime import timedelta
+
+        progresso = self.usuario.progresso_meta_anual(ano=2025, hoje=date(2025, 3, 31))
+        # 150 páginas em 90 dias
+        self.assertEqual(progresso["media_diaria"], 1.7)
+        self.assertEqual(progresso["projecao_ano"], 608)
+        self.assertEqual(progresso["previsao_meta"], date(2025, 3, 31) + timedelta(days=510))
@@ -1,8 +1,17 @@
+from contas.chaves import aresolver_chave, resolver_chave
 from contas.models import Usuario
 from ninja.errors import HttpError
+from ninja.security import APIKeyHeader
+
+ERRO_SEM_CHAVE = "Acesso negado: nenhuma chave de acesso foi fornecida no cabeçalho Authorization."
+ERRO_CHAVE_INVALIDA = "Usuário não encontrado: a chave de acesso fornecida é inválida ou não está associada a nenhum usuário."
 
 
 def get_access_key(request):
+    key = request.headers.get("X-Access-Key")
+    if key:
+        return key
+
     try:
         auth_header = request.headers.get("authorization")
         access_key = auth_header.split(" ")[1] if auth_header else None
@@ -13,16 +22,87 @@ def get_access_key(request):
 
 
 def get_user(request) -> Usuario:
-    if request.user.is_authenticated:
-        return request.user
+    # já autenticado pelo auth= do ninja (AccessKeyAuth)
+    auth = getattr(request, "auth", None)
+    if isinstance(auth, Usuario):
+        return auth
+
+    access_key = get_access_key(request)
+
+    if not access_key:
+        if request.user.is_authenticated:
+            return request.user
+        raise HttpError(403, ERRO_SEM_CHAVE)
+
+    user = resolver_chave(access_key)
+    if not user:
+        raise HttpError(404, ERRO_CHAVE_INVALIDA)
+
+    return user
+
+
+async def aget_user(request) -> Usuario:
+    """get_user() para views async (sessão via request.auser())."""
+    auth = getattr(request, "auth", None)
+    if isinstance(auth, Usuario):
+        return auth
 
     access_key = get_access_key(request)
 
     if not access_key:
-        raise HttpError(403, "Acesso negado: nenhuma chave de acesso foi fornecida no cabeçalho Authorization.")
+        user = await request.auser()
+        if user.is_authenticated:
+            return user
+        raise HttpError(403, ERRO_SEM_CHAVE)
 
-    user = Usuario.objects.filter(access_key=access_key).first()
+    user = await aresolver_chave(access_key)
     if not user:
-        raise HttpError(404, "Usuário não encontrado: a chave de acesso fornecida é inválida ou não está associada a nenhum usuário.")
+        raise HttpError(404, ERRO_CHAVE_INVALIDA)
+
+    return user
+
+
+class AccessKeyAuth(APIKeyHeader):
+    """
+    Autenticação ninja para os endpoints de usuário.
+
+    Aceita 'Authorization: <Key|Bearer> <chave>' ou 'X-Access-Key: <chave>' e,
+    sem chave, a sessão do Django. A chave é resolvida pelo cache de
+    contas.chaves, então o caminho quente não consulta a tabela de usuários.
+    """
+    param_name = "Authorization"
+
+    def _get_key(self, request):
+        return get_access_key(request)
+
+    def authenticate(self, request, key):
+        if not key:
+            if request.user.is_authenticated:
+                return request.user
+            raise HttpError(403, ERRO_SEM_CHAVE)
+
+        user = resolver_chave(key)
+        if not user:
+            raise HttpError(404, ERRO_CHAVE_INVALIDA)
+        return user
+
+
+class AsyncAccessKeyAuth(AccessKeyAuth):
+    """AccessKeyAuth para endpoints async: o ninja aguarda authenticate()."""
+    is_async = True
+
+    async def authenticate(self, request, key):
+        if not key:
+            user = await request.auser()
+            if user.is_authenticated:
+                return user
+            raise HttpError(403, ERRO_SEM_CHAVE)
+
+        user = await aresolver_chave(key)
+        if not user:
+            raise HttpError(404, ERRO_CHAVE_INVALIDA)
+        return user
+
 
-    return user
\ No newline at end of file
+access_key_auth = AccessKeyAuth()
+async_access_key_auth = AsyncAccessKeyAuth()
@@ -1,6 +1,6 @@
 from rest_framework.authentication import BaseAuthentication, get_authorization_header
 from rest_framework.exceptions import AuthenticationFailed
-from contas.models import Usuario
+from contas.chaves import resolver_chave
 
 class AccessKeyAuthentication(BaseAuthentication):
     """
@@ -27,8 +27,7 @@ class AccessKeyAuthentication(BaseAuthentication):
     def _authenticate_with_key(self, token: str):
         if not token or len(token) != 32:
             raise AuthenticationFailed("Chave de acesso inválida.")
-        try:
-            user = Usuario.objects.get(access_key=token)
-        except Usuario.DoesNotExist:
+        user = resolver_chave(token)
+        if user is None:
             raise AuthenticationFailed("Chave de acesso não reconhecida.")
         return (user, None)
@@ -0,0 +1,167 @@
+# contas/chaves.py
+"""
+Resolução de chave de acesso -> Usuario com cache em dois níveis:
+
+1. LRU em memória do processo (TTL curto, sem ida à rede);
+2. opcionalmente, o cache do Django (ex.: Redis), compartilhado entre processos.
+
+O cache guarda só os valores das colunas (nunca a senha), e o Usuario é
+reconstruído com Usuario.from_db() a cada acerto, então as requisições não
+compartilham instâncias. Usuario.save()/delete() e a rotação de chave chamam
+invalidar().
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+CONFIG_PADRAO = {
+    "LRU_TAMANHO": 1024,   # chaves mantidas em memória por processo
+    "LRU_TTL": 30,         # segundos; limita a defasagem entre processos
+    "CACHE_ALIAS": None,   # alias em settings.CACHES para o 2º nível (None = desligado)
+    "CACHE_TTL": 300,
+}
+
+# colunas fora do cache: carregadas sob demanda (deferred) se alguém acessar
+CAMPOS_EXCLUIDOS = {"password", "last_login"}
+
+
+class _CacheLRU:
+    """LRU com TTL, seguro para threads."""
+
+    def __init__(self, tamanho: int, ttl: float):
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            expira_em, valor = item
+            if expira_em < time.monotonic():
+                del self._dados[chave]
+                return None
+            self._dados.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + self.ttl, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho:
+                self._dados.popitem(last=False)
+
+    def delete(self, chave):
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+
+
+class ResolvedorChaveAcesso:
+    prefixo = "contas:chave:"
+
+    def __init__(self, config: dict | None = None):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self.lru = _CacheLRU(self.config["LRU_TAMANHO"], self.config["LRU_TTL"])
+
+    @property
+    def cache_compartilhado(self):
+        alias = self.config["CACHE_ALIAS"]
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def _modelo():
+        from contas.models import Usuario
+        return Usuario
+
+    def _campos(self) -> list[str]:
+        return [
+            f.attname for f in self._modelo()._meta.concrete_fields
+            if f.attname not in CAMPOS_EXCLUIDOS
+        ]
+
+    def _montar(self, valores):
+        return self._modelo().from_db(DEFAULT_DB_ALIAS, self._campos(), valores)
+
+    def _valores_em_cache(self, chave):
+        valores = self.lru.get(chave)
+        if valores is None and self.cache_compartilhado is not None:
+            valores = self.cache_compartilhado.get(self.prefixo + chave)
+            if valores is not None:
+                self.lru.set(chave, valores)
+        return valores
+
+    def _guardar(self, chave, valores):
+        self.lru.set(chave, valores)
+        if self.cache_compartilhado is not None:
+            self.cache_compartilhado.set(self.prefixo + chave, valores, self.config["CACHE_TTL"])
+
+    def resolver(self, chave: str | None):
+        """Usuario dono da chave, ou None."""
+        if not chave:
+            return None
+
+        valores = self._valores_em_cache(chave)
+        if valores is None:
+            valores = (
+                self._modelo().objects
+                .filter(access_key=chave)
+                .values_list(*self._campos())
+                .first()
+            )
+            if valores is None:
+                return None
+            self._guardar(chave, tuple(valores))
+        return self._montar(valores)
+
+    async def aresolver(self, chave: str | None):
+        """resolver() para views async: acertos no LRU não saem do event loop."""
+        if not chave:
+            return None
+        valores = self.lru.get(chave)
+        if valores is not None:
+            return self._montar(valores)
+        return await sync_to_async(self.resolver)(chave)
+
+    def invalidar(self, *chaves):
+        for chave in chaves:
+            if not chave:
+                continue
+            self.lru.delete(chave)
+            if self.cache_compartilhado is not None:
+                self.cache_compartilhado.delete(self.prefixo + chave)
+
+
+_resolvedor = None
+_resolvedor_lock = threading.Lock()
+
+
+def get_resolvedor() -> ResolvedorChaveAcesso:
+    global _resolvedor
+    if _resolvedor is None:
+        with _resolvedor_lock:
+            if _resolvedor is None:
+                _resolvedor = ResolvedorChaveAcesso(getattr(settings, "ACCESS_KEY_CACHE", None))
+    return _resolvedor
+
+
+def resolver_chave(chave: str | None):
+    return get_resolvedor().resolver(chave)
+
+
+async def aresolver_chave(chave: str | None):
+    return await get_resolvedor().aresolver(chave)
+
+
+def invalidar_chave(*chaves):
+    get_resolvedor().invalidar(*chaves)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from contas.models import Usuario, UserBook
+from livros.models import ResumoDiario
+
+
+class Command(BaseCommand):
+    help = "Reconcilia UserBook.pagina_atual com a soma das LeituraDiaria (corrige drift)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuario", help="E-mail de um usuário específico (default: todos).")
+        parser.add_argument("--lote", type=int, default=500, help="Tamanho do lote (default: 500).")
+        parser.add_argument(
+            "--resumos", action="store_true",
+            help="Também reconstrói os resumos diário/mensal a partir das LeituraDiaria.",
+        )
+
+    def handle(self, *args, **options):
+        usuario = None
+        if options["usuario"]:
+            usuario = Usuario.objects.filter(email__iexact=options["usuario"]).first()
+            if usuario is None:
+                raise CommandError(f"Usuário '{options['usuario']}' não encontrado.")
+
+        corrigidos = UserBook.recomputar_de_logs_em_lote(usuario=usuario, batch_size=options["lote"])
+        self.stdout.write(self.style.SUCCESS(f"{corrigidos} UserBook(s) corrigido(s)."))
+
+        if options["resumos"]:
+            usuarios = Usuario.objects.filter(pk=usuario.pk) if usuario else Usuario.objects.all()
+            total = 0
+            for usuario_id in usuarios.values_list("pk", flat=True).iterator():
+                ResumoDiario.reconstruir(usuario_id)
+                total += 1
+            self.stdout.write(self.style.SUCCESS(f"Resumos reconstruídos para {total} usuário(s)."))
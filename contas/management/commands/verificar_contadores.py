@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from contas.models import ContadoresUsuario, Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Confere os contadores desnormalizados (livros ativos/concluídos, páginas) "
+        "com COUNT/SUM reais e recalcula os que divergirem."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuario", help="E-mail de um usuário específico (default: todos).")
+        parser.add_argument("--lote", type=int, default=500, help="Usuários por lote (default: 500).")
+        parser.add_argument(
+            "--apenas-verificar", action="store_true",
+            help="Só relata as divergências, sem corrigir.",
+        )
+
+    def handle(self, *args, **options):
+        usuario = None
+        if options["usuario"]:
+            usuario = Usuario.objects.filter(email__iexact=options["usuario"]).first()
+            if usuario is None:
+                raise CommandError(f"Usuário '{options['usuario']}' não encontrado.")
+
+        corrigir = not options["apenas_verificar"]
+        divergentes = ContadoresUsuario.verificar(
+            usuario=usuario, batch_size=options["lote"], corrigir=corrigir
+        )
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS("Contadores em dia."))
+        elif corrigir:
+            self.stdout.write(self.style.SUCCESS(f"{divergentes} usuário(s) com contadores corrigidos."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{divergentes} usuário(s) com contadores divergentes."))
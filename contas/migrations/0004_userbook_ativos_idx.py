@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contas", "0003_usuario_meta_mensal_paginas_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="userbook",
+            name="contas_user_usuario_8b6c71_idx",
+        ),
+        migrations.AddIndex(
+            model_name="userbook",
+            index=models.Index(
+                condition=models.Q(("concluido_em__isnull", True)),
+                fields=["usuario"],
+                name="userbook_ativos_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def preencher_contadores(apps, schema_editor):
+    Usuario = apps.get_model("contas", "Usuario")
+    UserBook = apps.get_model("contas", "UserBook")
+    LeituraDiaria = apps.get_model("livros", "LeituraDiaria")
+    ContadoresUsuario = apps.get_model("contas", "ContadoresUsuario")
+
+    livros = {
+        row["usuario_id"]: row
+        for row in UserBook.objects.order_by().values("usuario_id").annotate(
+            ativos=Count("id", filter=Q(concluido_em__isnull=True)),
+            concluidos=Count("id", filter=Q(concluido_em__isnull=False)),
+        )
+    }
+    paginas = dict(
+        LeituraDiaria.objects.order_by().values("usuario_id")
+        .annotate(total=Sum("paginas_lidas")).values_list("usuario_id", "total")
+    )
+    ContadoresUsuario.objects.bulk_create(
+        (
+            ContadoresUsuario(
+                usuario_id=usuario_id,
+                livros_ativos=livros.get(usuario_id, {}).get("ativos", 0),
+                livros_concluidos=livros.get(usuario_id, {}).get("concluidos", 0),
+                paginas_lidas=paginas.get(usuario_id) or 0,
+            )
+            for usuario_id in Usuario.objects.values_list("pk", flat=True).iterator()
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contas", "0004_userbook_ativos_idx"),
+        ("livros", "0010_indices_cobrindo"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContadoresUsuario",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("livros_ativos", models.IntegerField(default=0)),
+                ("livros_concluidos", models.IntegerField(default=0)),
+                ("paginas_lidas", models.IntegerField(default=0)),
+                ("atualizado_em", models.DateTimeField(auto_now=True)),
+                (
+                    "usuario",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contadores",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Contadores do usuário",
+                "verbose_name_plural": "Contadores dos usuários",
+            },
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contas", "0005_contadoresusuario"),
+        ("livros", "0010_indices_cobrindo"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userbook",
+            index=models.Index(
+                condition=models.Q(("concluido_em__isnull", False)),
+                fields=["usuario", "-concluido_em", "-id"],
+                name="userbook_concluidos_idx",
+            ),
+        ),
+    ]
@@ -1,12 +1,16 @@
 from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.conf import settings
 from django.contrib.auth.models import (
     AbstractBaseUser, PermissionsMixin, BaseUserManager
 )
 
-from datetime import date
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
 from typing import Optional
+import math
 import secrets
 
 def generate_access_key() -> str:
@@ -75,13 +79,31 @@ class Usuario(AbstractBaseUser, PermissionsMixin):  # <— inclui permissões/gr
     REQUIRED_FIELDS = []  # sem campos extras obrigatórios no createsuperuser
 
     def save(self, *args, **kwargs):
+        criando = self._state.adding
         update_fields = kwargs.get("update_fields")
         if self.pk:
             if not update_fields or "access_key" not in update_fields:
                 original = type(self).objects.filter(pk=self.pk).values_list("access_key", flat=True).first()
                 if original and self.access_key != original:
                     self.access_key = original
-        return super().save(*args, **kwargs)
+        resultado = super().save(*args, **kwargs)
+        if criando:
+            # usuário novo começa com os contadores zerados (sem recálculo depois)
+            ContadoresUsuario.objects.get_or_create(usuario=self)
+        self._invalidar_cache_chave()
+        return resultado
+
+    def delete(self, *args, **kwargs):
+        self._invalidar_cache_chave()
+        return super().delete(*args, **kwargs)
+
+    def _invalidar_cache_chave(self):
+        # o resolvedor guarda os dados do usuário por chave: descarta após o commit
+        from contas.chaves import invalidar_chave
+
+        chave = self.access_key
+        invalidar_chave(chave)
+        transaction.on_commit(lambda: invalidar_chave(chave))
 
     def __str__(self):
         return self.email
@@ -107,29 +129,76 @@ class Usuario(AbstractBaseUser, PermissionsMixin):  # <— inclui permissões/gr
         return start, end
 
     def paginas_lidas_no_mes(self, mes=None) -> int:
-        from django.db.models import Sum
-        from django.db.models.functions import Coalesce
-        # importe seu model real:
-        from livros.models import LeituraDiaria  # ajuste o caminho
+        # lê o resumo mensal mantido pelos hooks de LeituraDiaria (sem SUM)
+        from livros.models import ResumoMensal
 
-        start, end = self._month_bounds(mes)
-        return (
-            LeituraDiaria.objects
-            .filter(usuario=self, dia__gte=start, dia__lt=end)
-            .aggregate(total=Coalesce(Sum("paginas_lidas"), 0))
-            ["total"]
-        )
+        start, _ = self._month_bounds(mes)
+        return ResumoMensal.total(self, start)
 
-    def progresso_meta_mensal(self, mes=None, override_meta: int | None = None) -> dict:
-        """Retorna dict: {'mes', 'meta', 'lidas', 'restante', 'pct'}."""
+    def progresso_meta_mensal(self, mes=None, override_meta: int | None = None,
+                              lidas: int | None = None) -> dict:
+        """
+        Retorna dict: {'mes', 'meta', 'lidas', 'restante', 'pct'}.
+        'lidas' permite reaproveitar um total do mês já calculado pelo chamador.
+        """
         start, _ = self._month_bounds(mes)
-        lidas = self.paginas_lidas_no_mes(start)
+        if lidas is None:
+            lidas = self.paginas_lidas_no_mes(start)
         meta = override_meta if override_meta is not None else self.meta_mensal_efetiva
         restante = max(0, meta - lidas)
         pct = int(round((lidas / meta) * 100)) if meta else 0
         return {"mes": start, "meta": int(meta), "lidas": int(lidas),
                 "restante": int(restante), "pct": pct}
 
+    def progresso_meta_anual(self, ano: int | None = None, hoje=None) -> dict:
+        """
+        Progresso do ano contra meta_anual_paginas, lido do ResumoMensal e do
+        UserBook.concluido_em: duas consultas, qualquer que seja o histórico.
+        Retorna {'ano', 'meta', 'lidas', 'restante', 'pct', 'meses',
+        'livros_concluidos', 'media_diaria', 'projecao_ano', 'previsao_meta'}.
+        """
+        from livros.models import ResumoMensal
+
+        hoje = hoje or timezone.localdate()
+        ano = ano or hoje.year
+        inicio, fim = date(ano, 1, 1), date(ano + 1, 1, 1)
+        dias_no_ano = (fim - inicio).days
+
+        meses = [
+            self.progresso_meta_mensal(mes=mes, lidas=lidas)
+            for mes, lidas in ResumoMensal.serie(self, inicio, date(ano, 12, 1))
+        ]
+        lidas = sum(m["lidas"] for m in meses)
+        meta = int(self.meta_anual_paginas or 0)
+        restante = max(0, meta - lidas)
+
+        tz = timezone.get_current_timezone()
+        livros_concluidos = self.user_books.filter(
+            concluido_em__gte=datetime.combine(inicio, datetime.min.time(), tzinfo=tz),
+            concluido_em__lt=datetime.combine(fim, datetime.min.time(), tzinfo=tz),
+        ).count()
+
+        # dias já decorridos do ano (ano passado conta inteiro; futuro, zero)
+        dias = min(max((hoje - inicio).days + 1, 0), dias_no_ano)
+        media = lidas / dias if dias else 0.0
+
+        previsao = None
+        if restante and media and inicio <= hoje < fim:
+            previsao = hoje + timedelta(days=math.ceil(restante / media))
+
+        return {
+            "ano": ano,
+            "meta": meta,
+            "lidas": lidas,
+            "restante": restante,
+            "pct": int(round((lidas / meta) * 100)) if meta else 0,
+            "meses": meses,
+            "livros_concluidos": livros_concluidos,
+            "media_diaria": round(media, 1),
+            "projecao_ano": int(round(media * dias_no_ano)),
+            "previsao_meta": previsao,
+        }
+
 class UserBook(models.Model):
     """
     Liga Usuario <-> Livro, guardando o progresso *do usuário* nesse livro.
@@ -149,12 +218,112 @@ class UserBook(models.Model):
     class Meta:
         unique_together = (("usuario", "livro"),)
         indexes = [
-            models.Index(fields=["usuario", "livro"]),
+            # parciais: só os livros em andamento (dashboard), bem menor que a tabela
+            models.Index(
+                fields=["usuario"], condition=Q(concluido_em__isnull=True), name="userbook_ativos_idx"
+            ),
+            # ... e os concluídos na ordem da lista (keyset por -concluido_em, -id)
+            models.Index(
+                fields=["usuario", "-concluido_em", "-id"], condition=Q(concluido_em__isnull=False),
+                name="userbook_concluidos_idx",
+            ),
         ]
 
     def __str__(self):
         return f"{self.usuario} ↔ {self.livro}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # conclusão persistida: o save() só mexe nos contadores quando ela muda
+        if "concluido_em" in instance.__dict__:
+            instance._concluido_db = instance.concluido_em is not None
+            instance._concluido_em_db = instance.concluido_em
+        return instance
+
+    def save(self, *args, **kwargs):
+        concluido = self.concluido_em is not None
+        anterior = None if self._state.adding else getattr(self, "_concluido_db", None)
+        update_fields = kwargs.get("update_fields")
+        if self._state.adding or (
+            anterior is not None and anterior != concluido
+            and (update_fields is None or "concluido_em" in update_fields)
+        ):
+            deltas = self._deltas_contadores(anterior, concluido)
+        else:
+            deltas = None  # caminho quente: progresso sem mudar a conclusão
+
+        # concluído em outra data: a faixa de recentes e a lista mudam de ordem
+        nova_data = (
+            concluido and anterior and self.concluido_em != getattr(self, "_concluido_em_db", self.concluido_em)
+            and (update_fields is None or "concluido_em" in update_fields)
+        )
+
+        if deltas is None:
+            resultado = super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                resultado = super().save(*args, **kwargs)
+                ContadoresUsuario.somar(self.usuario_id, **deltas)
+        if nova_data or (deltas and deltas["livros_concluidos"]):
+            self._invalidar_concluidos(self.usuario_id)
+        if "concluido_em" in self.__dict__:
+            self._concluido_db = concluido
+            self._concluido_em_db = self.concluido_em
+        return resultado
+
+    def delete(self, *args, **kwargs):
+        anterior = getattr(self, "_concluido_db", self.concluido_em is not None)
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            ContadoresUsuario.somar(self.usuario_id, **self._deltas_contadores(anterior, None))
+        if anterior:
+            self._invalidar_concluidos(self.usuario_id)
+        return resultado
+
+    @staticmethod
+    def _invalidar_concluidos(usuario_id):
+        # faixa "concluídos recentemente" e totais da lista de concluídos (cache);
+        # só após o commit: antes dele um leitor remontaria o cache com o estado
+        # velho sob a geração nova
+        from livros.services import concluidos
+
+        transaction.on_commit(lambda: concluidos.invalidar(usuario_id))
+
+    @staticmethod
+    def _deltas_contadores(antes, depois) -> dict:
+        """
+        Variação de livros_ativos/livros_concluidos quando o vínculo passa do
+        estado 'antes' para 'depois' (None = não existe; True/False = concluído).
+        """
+        deltas = {"livros_ativos": 0, "livros_concluidos": 0}
+        for estado, sinal in ((antes, -1), (depois, 1)):
+            if estado is not None:
+                deltas["livros_concluidos" if estado else "livros_ativos"] += sinal
+        return deltas
+
+    @classmethod
+    def aplicar_nos_contadores(cls, userbooks):
+        """
+        Para escritas em lote (bulk_update), que pulam o save(): soma nos
+        contadores de cada usuário as conclusões que mudaram em 'userbooks'.
+        """
+        por_usuario = defaultdict(Counter)
+        nova_data = set()
+        for ub in userbooks:
+            anterior = getattr(ub, "_concluido_db", None)
+            concluido = ub.concluido_em is not None
+            if anterior is not None and anterior != concluido:
+                por_usuario[ub.usuario_id].update(cls._deltas_contadores(anterior, concluido))
+            elif concluido and ub.concluido_em != getattr(ub, "_concluido_em_db", ub.concluido_em):
+                nova_data.add(ub.usuario_id)
+            ub._concluido_db = concluido
+            ub._concluido_em_db = ub.concluido_em
+        for usuario_id, deltas in por_usuario.items():
+            ContadoresUsuario.somar(usuario_id, **deltas)
+        for usuario_id in nova_data | por_usuario.keys():
+            cls._invalidar_concluidos(usuario_id)
+
     # --- Utilitários de progresso por usuário ---
     @property
     def progresso_pct(self) -> float:
@@ -195,7 +364,7 @@ class UserBook(models.Model):
         """
         from django.db.models import Sum
         total_user = (
-            self.livro.leituras.filter(usuario=self.usuario)
+            self.livro.leituras.filter(usuario_id=self.usuario_id)
             .aggregate(Sum("paginas_lidas"))["paginas_lidas__sum"]
             or 0
         )
@@ -203,3 +372,182 @@ class UserBook(models.Model):
         self._clamp_and_flag_conclusao()
         self.save(update_fields=["pagina_atual", "concluido_em", "atualizado_em"])
 
+    @classmethod
+    def recomputar_de_logs_em_lote(cls, usuario=None, batch_size: int = 500, livros=None) -> int:
+        """
+        Job de reconciliação: compara 'pagina_atual' com a soma das LeituraDiaria
+        e corrige divergências (drift) do progresso incremental.
+        Percorre os UserBooks por id, em lotes, e retorna quantos foram corrigidos.
+        'livros' (ids) restringe aos vínculos desses livros (ex.: após importação).
+        """
+        from livros.models import LeituraDiaria
+
+        soma_logs = (
+            LeituraDiaria.objects
+            .filter(usuario_id=OuterRef("usuario_id"), livro_id=OuterRef("livro_id"))
+            .order_by()
+            .values("usuario_id", "livro_id")
+            .annotate(total=Sum("paginas_lidas"))
+            .values("total")
+        )
+        base = (
+            cls.objects
+            .select_related("livro")
+            .only("id", "pagina_atual", "concluido_em", "usuario_id", "livro__total_paginas")
+            .annotate(total_logs=Coalesce(Subquery(soma_logs), 0))
+            .order_by("id")
+        )
+        if usuario is not None:
+            base = base.filter(usuario=usuario)
+        if livros is not None:
+            base = base.filter(livro_id__in=list(livros))
+
+        corrigidos = 0
+        ultimo_id = 0
+        while True:
+            with transaction.atomic():
+                lote = list(
+                    base.select_for_update(of=("self",)).filter(id__gt=ultimo_id)[:batch_size]
+                )
+                if not lote:
+                    break
+                ultimo_id = lote[-1].id
+
+                alterados = []
+                agora = timezone.now()
+                for ub in lote:
+                    antes = (ub.pagina_atual, ub.concluido_em)
+                    ub.pagina_atual = ub.total_logs
+                    ub._clamp_and_flag_conclusao()
+                    if (ub.pagina_atual, ub.concluido_em) != antes:
+                        ub.atualizado_em = agora
+                        alterados.append(ub)
+
+                if alterados:
+                    cls.objects.bulk_update(
+                        alterados, ["pagina_atual", "concluido_em", "atualizado_em"]
+                    )
+                    cls.aplicar_nos_contadores(alterados)
+                    corrigidos += len(alterados)
+        return corrigidos
+
+
+class ContadoresUsuario(models.Model):
+    """
+    Contadores desnormalizados por usuário: livros em andamento, concluídos e
+    páginas lidas desde sempre. Lidos pelo dashboard e pela API sem COUNT/SUM.
+
+    Mantidos com UPDATE ... SET campo = campo + delta (F()) na mesma transação
+    da escrita que os altera: UserBook.save()/delete() e aplicar_nos_contadores()
+    para a conclusão, ResumoDiario.aplicar_deltas() para as páginas. Escritas
+    que pulam esses caminhos (importação, deleções em cascata) se corrigem com
+    recalcular() ou com o verificador (manage.py verificar_contadores).
+    """
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="contadores"
+    )
+    livros_ativos = models.IntegerField(default=0)
+    livros_concluidos = models.IntegerField(default=0)
+    paginas_lidas = models.IntegerField(default=0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    CAMPOS = ("livros_ativos", "livros_concluidos", "paginas_lidas")
+
+    class Meta:
+        verbose_name = "Contadores do usuário"
+        verbose_name_plural = "Contadores dos usuários"
+
+    def __str__(self):
+        return (
+            f"{self.usuario_id} | {self.livros_ativos} ativos, "
+            f"{self.livros_concluidos} concluídos, {self.paginas_lidas} págs"
+        )
+
+    @classmethod
+    def para(cls, usuario) -> "ContadoresUsuario":
+        """Retorna os contadores do usuário, criando-os a partir do histórico se faltarem."""
+        usuario_id = getattr(usuario, "pk", usuario)
+        contadores = cls.objects.filter(usuario_id=usuario_id).first()
+        if contadores is None:
+            contadores, criado = cls.objects.get_or_create(usuario_id=usuario_id)
+            if criado:
+                contadores.recalcular()
+        return contadores
+
+    @classmethod
+    def somar(cls, usuario_id, **deltas):
+        """
+        Soma {campo: delta} na linha do usuário direto no banco (sem ler antes:
+        escritas concorrentes não se perdem). Chamar depois da escrita que o
+        motivou: se a linha faltar, ela é criada já contando essa escrita.
+        """
+        deltas = {campo: n for campo, n in deltas.items() if n}
+        if not deltas:
+            return
+        atualizados = cls.objects.filter(usuario_id=usuario_id).update(
+            atualizado_em=timezone.now(), **{campo: F(campo) + n for campo, n in deltas.items()}
+        )
+        if not atualizados:
+            cls.para(usuario_id)
+
+    @classmethod
+    def _com_valores_reais(cls, usuarios):
+        """Anota em 'usuarios' (queryset de Usuario) os valores reais de cada contador."""
+        from livros.models import LeituraDiaria
+
+        def contagem(qs, expressao):
+            return Coalesce(
+                Subquery(
+                    qs.filter(usuario_id=OuterRef("pk")).order_by()
+                    .values("usuario_id").annotate(n=expressao).values("n")
+                ),
+                0,
+            )
+
+        return usuarios.annotate(
+            real_livros_ativos=contagem(UserBook.objects.filter(concluido_em__isnull=True), Count("id")),
+            real_livros_concluidos=contagem(UserBook.objects.filter(concluido_em__isnull=False), Count("id")),
+            real_paginas_lidas=contagem(LeituraDiaria.objects.all(), Sum("paginas_lidas")),
+        )
+
+    def recalcular(self):
+        """Recalcula a partir dos UserBooks e das LeituraDiaria (O(histórico); uso raro)."""
+        reais = self._com_valores_reais(Usuario.objects.filter(pk=self.usuario_id)).values(
+            *(f"real_{campo}" for campo in self.CAMPOS)
+        ).get()
+        for campo in self.CAMPOS:
+            setattr(self, campo, reais[f"real_{campo}"])
+        self.save()
+        UserBook._invalidar_concluidos(self.usuario_id)
+
+    @classmethod
+    def verificar(cls, usuario=None, batch_size: int = 500, corrigir: bool = True) -> int:
+        """
+        Verificador periódico: compara os contadores com COUNT/SUM reais, em
+        lotes de usuários, e recalcula (com a linha travada) os divergentes ou
+        ausentes. Retorna quantos usuários divergiam.
+        """
+        base = cls._com_valores_reais(Usuario.objects.order_by("pk")).annotate(
+            **{f"atual_{campo}": F(f"contadores__{campo}") for campo in cls.CAMPOS}
+        )
+        if usuario is not None:
+            base = base.filter(pk=getattr(usuario, "pk", usuario))
+        valores = ["pk"] + [f"{p}_{campo}" for p in ("real", "atual") for campo in cls.CAMPOS]
+
+        divergentes = 0
+        ultimo_id = 0
+        while True:
+            lote = list(base.filter(pk__gt=ultimo_id).values(*valores)[:batch_size])
+            if not lote:
+                break
+            ultimo_id = lote[-1]["pk"]
+            for linha in lote:
+                if all(linha[f"real_{c}"] == linha[f"atual_{c}"] for c in cls.CAMPOS):
+                    continue
+                divergentes += 1
+                if corrigir:
+                    with transaction.atomic():
+                        cls.objects.get_or_create(usuario_id=linha["pk"])
+                        # a trava segura os somar() concorrentes até o recálculo
+                        cls.objects.select_for_update().get(usuario_id=linha["pk"]).recalcular()
+        return divergentes
@@ -1,3 +1,129 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from contas import chaves
+from contas.models import ContadoresUsuario, UserBook, Usuario
+from livros.models import Categoria, LeituraDiaria, Livro
+
+
+class ChaveAcessoCacheTests(TestCase):
+    """Cache chave -> usuário (contas/chaves.py) com o 2º nível no cache do Django."""
+
+    def setUp(self):
+        cache.clear()
+        self.resolvedor = chaves.ResolvedorChaveAcesso({"CACHE_ALIAS": "default"})
+        patcher = mock.patch.object(chaves, "_resolvedor", self.resolvedor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.usuario = Usuario.objects.create_user("chave@exemplo.com", "senha-secreta", name="Chave")
+
+    def rotacionar(self, senha="senha-secreta"):
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        from contas.views.access_token import RotateAccessKeyView
+
+        request = APIRequestFactory().post("/", {"password": senha}, format="json")
+        force_authenticate(request, user=self.usuario)
+        with self.captureOnCommitCallbacks(execute=True):
+            return RotateAccessKeyView.as_view()(request)
+
+    def test_rotacao_derruba_a_chave_antiga_nos_dois_niveis(self):
+        antiga = self.usuario.access_key
+        self.assertEqual(self.client.get("/api/user/", HTTP_X_ACCESS_KEY=antiga).status_code, 200)
+        self.assertIsNotNone(cache.get(self.resolvedor.prefixo + antiga))
+
+        resposta = self.rotacionar()
+        self.assertEqual(resposta.status_code, 200)
+        nova = resposta.data["access_key"]
+        self.assertNotEqual(nova, antiga)
+
+        self.assertIsNone(cache.get(self.resolvedor.prefixo + antiga))
+        # outro processo (LRU vazio, mesmo cache compartilhado) também não aceita
+        self.assertIsNone(chaves.ResolvedorChaveAcesso({"CACHE_ALIAS": "default"}).resolver(antiga))
+        self.assertEqual(self.client.get("/api/user/", HTTP_X_ACCESS_KEY=antiga).status_code, 404)
+        self.assertEqual(self.client.get("/api/user/", HTTP_X_ACCESS_KEY=nova).status_code, 200)
+
+    def test_senha_errada_nao_rotaciona(self):
+        antiga = self.usuario.access_key
+        self.assertEqual(self.rotacionar("errada").status_code, 403)
+        self.assertEqual(Usuario.objects.get(pk=self.usuario.pk).access_key, antiga)
+
+    def test_senha_fica_fora_do_cache(self):
+        usuario = chaves.resolver_chave(self.usuario.access_key)
+        self.assertEqual(usuario.pk, self.usuario.pk)
+
+        guardados = [self.resolvedor.lru.get(usuario.access_key), cache.get(self.resolvedor.prefixo + usuario.access_key)]
+        for valores in guardados:
+            self.assertEqual(len(valores), len(self.resolvedor._campos()))
+            self.assertNotIn(self.usuario.password, valores)
+
+        # o usuário montado do cache só lê a senha do banco se alguém pedir
+        self.assertIn("password", usuario.get_deferred_fields())
+        self.assertEqual(usuario.password, self.usuario.password)
+
+
+class ContadoresUsuarioTests(TestCase):
+    """ContadoresUsuario acompanha as escritas de UserBook/LeituraDiaria e o verificador corrige desvios."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user("contadores@exemplo.com", "x", name="Contadores")
+        categoria = Categoria.objects.create(nome="Contadores")
+        cls.livros = [
+            Livro.objects.create(titulo=f"Livro {i}", autor="Autor", total_paginas=100, categoria=categoria)
+            for i in range(2)
+        ]
+
+    def contadores(self):
+        c = ContadoresUsuario.para(self.usuario)
+        return c.livros_ativos, c.livros_concluidos, c.paginas_lidas
+
+    def test_acompanha_criar_concluir_reabrir_e_apagar(self):
+        ub = UserBook.objects.create(usuario=self.usuario, livro=self.livros[0])
+        outro = UserBook.objects.create(usuario=self.usuario, livro=self.livros[1])
+        self.assertEqual(self.contadores(), (2, 0, 0))
+
+        ub = UserBook.objects.get(pk=ub.pk)
+        ub.concluido_em = timezone.now()
+        ub.save()
+        self.assertEqual(self.contadores(), (1, 1, 0))
+
+        ub.concluido_em = None
+        ub.save(update_fields=["concluido_em"])
+        self.assertEqual(self.contadores(), (2, 0, 0))
+
+        LeituraDiaria.objects.create(usuario=self.usuario, livro=self.livros[1], dia=date(2025, 1, 1), paginas_lidas=40)
+        UserBook.objects.get(pk=outro.pk).delete()
+        self.assertEqual(self.contadores()[:2], (1, 0))
+        self.assertEqual(self.contadores()[2], 40)
+        self.assertEqual(ContadoresUsuario.verificar(self.usuario, corrigir=False), 0)
+
+    def test_verificar_detecta_e_corrige_desvio(self):
+        UserBook.objects.create(usuario=self.usuario, livro=self.livros[0])
+        ContadoresUsuario.objects.filter(usuario=self.usuario).update(livros_ativos=9, paginas_lidas=-3)
+
+        self.assertEqual(ContadoresUsuario.verificar(self.usuario, corrigir=False), 1)
+        self.assertEqual(self.contadores(), (9, 0, -3))
+        self.assertEqual(ContadoresUsuario.verificar(self.usuario), 1)
+        self.assertEqual(self.contadores(), (1, 0, 0))
+        self.assertEqual(ContadoresUsuario.verificar(self.usuario), 0)
+
+    def test_comando_verificar_contadores(self):
+        def rodar(*args):
+            saida = StringIO()
+            call_command("verificar_contadores", *args, stdout=saida)
+            return saida.getvalue()
 
-# Create your tests here.
+        ContadoresUsuario.objects.filter(usuario=self.usuario).update(livros_concluidos=5)
+        self.assertIn("1 usuário(s) com contadores divergentes", rodar("--apenas-verificar"))
+        self.assertEqual(self.contadores()[1], 5)
+        self.assertIn("1 usuário(s) com contadores corrigidos", rodar("--usuario", "CONTADORES@exemplo.com"))
+        self.assertIn("Contadores em dia", rodar())
+        with self.assertRaises(CommandError):
+            rodar("--usuario", "ninguem@exemplo.com")
@@ -1,5 +1,6 @@
 # contas/views/access_key.py (continuação)
 from django.contrib.auth.hashers import check_password
+from contas.chaves import invalidar_chave
 from contas.models import generate_access_key
 from rest_framework import status
 from rest_framework.exceptions import AuthenticationFailed
@@ -14,6 +15,8 @@ class RotateAccessKeyView(APIView):
         password = request.data.get("password")
         if not check_password(password or "", request.user.password):
             raise AuthenticationFailed("Senha inválida.")
+        chave_antiga = request.user.access_key
         request.user.access_key = generate_access_key()
         request.user.save(update_fields=["access_key"])
+        invalidar_chave(chave_antiga)  # a chave antiga deixa de valer já
         return Response({"access_key": request.user.access_key}, status=status.HTTP_200_OK)
@@ -0,0 +1,157 @@
+# core/carga.py
+"""
+Teste de carga HTTP (usado por `manage.py carga`).
+
+Abre N conexões keep-alive contra um servidor já rodando (gunicorn/WSGI ou
+uvicorn/ASGI) e, durante 'duracao' segundos, cada conexão faz GETs em
+sequência, alternando entre as URLs dadas. Mede vazão e latência
+(p50/p95/p99) por processo servidor, o que permite comparar quantas
+requisições simultâneas cada pilha sustenta com os mesmos recursos.
+
+O cliente é asyncio puro, sem dependências, para que o gerador não seja o
+gargalo: HTTP/1.1 com Content-Length, chunked (com trailers) ou corpo até o
+fechamento, respostas sem corpo (1xx/204/304) e um timeout por requisição
+(conexão, cabeçalhos e corpo) que conta como erro e descarta a conexão.
+Resultados de referência: docs/carga.md.
+"""
+import asyncio
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from livros.services.benchmark import percentil
+
+TIMEOUT = 10.0
+SEM_CORPO = (204, 304)
+
+
+class ErroHttp(Exception):
+    pass
+
+
+async def _ler_corpo(reader, status: int, cabecalhos: dict) -> bool:
+    """
+    Consome o corpo da resposta (descartado: só o tempo interessa). Devolve
+    False quando o corpo só termina com o fechamento da conexão.
+    """
+    if status in SEM_CORPO or 100 <= status < 200:
+        return True
+    if "chunked" in cabecalhos.get("transfer-encoding", "").lower():
+        while True:
+            linha = await reader.readline()
+            try:
+                tamanho = int(linha.split(b";")[0].strip(), 16)
+            except ValueError:
+                raise ErroHttp(f"tamanho de chunk inválido: {linha[:40]!r}")
+            if tamanho == 0:
+                break
+            await reader.readexactly(tamanho)
+            if await reader.readline() not in (b"\r\n", b"\n"):
+                raise ErroHttp("chunk sem CRLF no final")
+        # trailers opcionais até a linha em branco
+        while await reader.readline() not in (b"\r\n", b"\n", b""):
+            pass
+        return True
+    if "content-length" in cabecalhos:
+        try:
+            tamanho = int(cabecalhos["content-length"])
+        except ValueError:
+            raise ErroHttp(f"Content-Length inválido: {cabecalhos['content-length']!r}")
+        await reader.readexactly(tamanho)
+        return True
+    await reader.read()
+    return False
+
+
+async def _get(reader, writer, host: str, caminho: str, extras: dict) -> tuple[int, bool]:
+    """Um GET na conexão aberta: (status, a conexão pode ser reaproveitada?)."""
+    linhas = [f"GET {caminho} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+    linhas += [f"{nome}: {valor}" for nome, valor in extras.items()]
+    writer.write(("\r\n".join(linhas) + "\r\n\r\n").encode())
+    await writer.drain()
+
+    status_linha = await reader.readline()
+    if not status_linha:
+        raise ErroHttp("conexão fechada pelo servidor")
+    partes = status_linha.split()
+    if len(partes) < 2 or not partes[0].startswith(b"HTTP/1.") or not partes[1].isdigit():
+        raise ErroHttp(f"linha de status inválida: {status_linha[:60]!r}")
+    status = int(partes[1])
+
+    cabecalhos = {}
+    while True:
+        linha = await reader.readline()
+        if linha in (b"\r\n", b"\n"):
+            break
+        if not linha:
+            raise ErroHttp("conexão fechada nos cabeçalhos")
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    reutilizavel = await _ler_corpo(reader, status, cabecalhos)
+    return status, reutilizavel and cabecalhos.get("connection", "").lower() != "close"
+
+
+async def _cliente(urls, fim: float, extras: dict, timeout: float, latencias: list, status: Counter, erros: Counter):
+    conexao = None
+    i = 0
+    while time.perf_counter() < fim:
+        url = urls[i % len(urls)]
+        i += 1
+        try:
+            if conexao is None:
+                conexao = await asyncio.wait_for(asyncio.open_connection(url.hostname, url.port or 80), timeout)
+            reader, writer = conexao
+            caminho = url.path + (f"?{url.query}" if url.query else "")
+            inicio = time.perf_counter()
+            codigo, manter = await asyncio.wait_for(_get(reader, writer, url.netloc, caminho, extras), timeout)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            status[codigo] += 1
+            if not manter:
+                writer.close()
+                conexao = None
+        except (OSError, TimeoutError, ErroHttp, asyncio.IncompleteReadError, ValueError) as exc:
+            # TimeoutError: a resposta pode chegar depois, então a conexão não serve mais
+            erros[type(exc).__name__] += 1
+            if conexao is not None:
+                conexao[1].close()
+            conexao = None
+            await asyncio.sleep(0.01)
+    if conexao is not None:
+        conexao[1].close()
+
+
+async def _executar(urls, concorrencia: int, duracao: float, extras: dict, timeout: float) -> dict:
+    latencias, status, erros = [], Counter(), Counter()
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    await asyncio.gather(*[
+        _cliente(urls, fim, extras, timeout, latencias, status, erros) for _ in range(concorrencia)
+    ])
+    decorrido = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "concorrencia": concorrencia,
+        "duracao_s": round(decorrido, 2),
+        "requisicoes": len(latencias),
+        "req_s": round(len(latencias) / decorrido, 1),
+        "p50_ms": round(percentil(latencias, 50), 2),
+        "p95_ms": round(percentil(latencias, 95), 2),
+        "p99_ms": round(percentil(latencias, 99), 2),
+        "max_ms": round(latencias[-1], 2) if latencias else 0.0,
+        "status": {str(k): v for k, v in sorted(status.items())},
+        "erros": dict(erros),
+    }
+
+
+def executar(
+    urls: list[str], concorrencia: int = 50, duracao: float = 10.0,
+    cabecalhos: dict | None = None, timeout: float = TIMEOUT,
+) -> dict:
+    """Roda a carga e devolve vazão, latências (ms), status e erros."""
+    alvos = [urlsplit(u) for u in urls]
+    for alvo in alvos:
+        if alvo.scheme != "http":
+            raise ValueError(f"Só http:// é suportado: {alvo.geturl()}")
+    return asyncio.run(_executar(alvos, concorrencia, duracao, cabecalhos or {}, timeout))
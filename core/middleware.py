@@ -0,0 +1,252 @@
+# core/middleware.py
+"""
+Instrumentação de SQL por requisição.
+
+Cada conexão ganha um execute_wrapper permanente que entrega as queries ao
+ColetorQueries da requisição corrente, guardado num ContextVar pelo
+InstrumentacaoMiddleware: sob ASGI as requisições simultâneas dividem as
+threads do sync_to_async, mas cada uma enxerga só o próprio coletor (o
+contexto é copiado para a thread). Mede-se tempo total, número de queries,
+tempo no banco e queries repetidas. Repetida = mesmo SQL com os mesmos parâmetros; "similar" = mesmo
+SQL com parâmetros diferentes, o padrão N+1 (ex.: uma query por livro numa
+template tag).
+
+A resposta ganha os cabeçalhos Server-Timing (visível no DevTools) e
+X-Query-Count quando CABECALHOS está ligado ou o usuário é staff: eles
+revelam detalhes internos e não vão para clientes comuns. Os números são
+agregados por endpoint (método + rota do URLconf, que também identifica as
+operações do ninja) em memória do processo. GET /api/admin/metricas os
+expõe para usuários staff.
+
+ATIVA e CABECALHOS seguem settings.DEBUG quando não configurados: em
+produção a instrumentação (e o custo por query) é opt-in.
+"""
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PADRAO = {
+    "ATIVA": None,             # None = settings.DEBUG
+    "CABECALHOS": None,        # cabeçalhos para todos (senão só staff); None = settings.DEBUG
+    "LIMITE_SIMILARES": 5,     # mesmo SQL N vezes na requisição -> aviso de N+1 no log
+    "AMOSTRAS": 500,           # latências guardadas por endpoint (percentis)
+    "IGNORAR": ("/static/", "/media/", "/favicon.ico"),
+}
+
+# BEGIN/SAVEPOINT/... se repetem em escritas em lote sem indicar N+1
+CONTROLE_TRANSACAO = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK", "COMMIT")
+
+
+def config() -> dict:
+    cfg = {**CONFIG_PADRAO, **getattr(settings, "INSTRUMENTACAO", {})}
+    for chave in ("ATIVA", "CABECALHOS"):
+        if cfg[chave] is None:
+            cfg[chave] = settings.DEBUG
+    return cfg
+
+
+class ColetorQueries:
+    """execute_wrapper que conta e cronometra as queries de uma requisição."""
+
+    def __init__(self):
+        self.total = 0
+        self.tempo_db = 0.0
+        self.por_sql = Counter()
+        self.por_sql_params = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo_db += time.perf_counter() - inicio
+            self.total += 1
+            self.por_sql[sql] += 1
+            try:
+                self.por_sql_params[(sql, tuple(params) if isinstance(params, list) else params)] += 1
+            except TypeError:  # parâmetros não hasheáveis (ex.: listas em executemany)
+                pass
+
+    @property
+    def duplicadas(self) -> int:
+        """Execuções extras de queries idênticas (SQL + parâmetros)."""
+        return sum(n - 1 for n in self.por_sql_params.values() if n > 1)
+
+    def similares(self, limite: int) -> list[tuple[str, int]]:
+        return [
+            (sql, n) for sql, n in self.por_sql.most_common()
+            if n >= limite and not sql.lstrip().upper().startswith(CONTROLE_TRANSACAO)
+        ]
+
+
+class EstatisticasEndpoints:
+    """Agregados por endpoint, em memória do processo (seguro para threads)."""
+
+    def __init__(self, amostras: int = 500):
+        self.amostras = amostras
+        self._dados = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, endpoint: str, tempo_ms: float, tempo_db_ms: float, queries: int, duplicadas: int):
+        with self._lock:
+            e = self._dados.get(endpoint)
+            if e is None:
+                e = self._dados[endpoint] = {
+                    "requisicoes": 0, "tempo_ms": 0.0, "tempo_db_ms": 0.0,
+                    "queries": 0, "queries_max": 0, "duplicadas": 0,
+                    "latencias": deque(maxlen=self.amostras),
+                }
+            e["requisicoes"] += 1
+            e["tempo_ms"] += tempo_ms
+            e["tempo_db_ms"] += tempo_db_ms
+            e["queries"] += queries
+            e["queries_max"] = max(e["queries_max"], queries)
+            e["duplicadas"] += duplicadas
+            e["latencias"].append(tempo_ms)
+
+    def resumo(self) -> list[dict]:
+        with self._lock:
+            copia = {k: {**v, "latencias": sorted(v["latencias"])} for k, v in self._dados.items()}
+
+        linhas = []
+        for endpoint, e in copia.items():
+            n = e["requisicoes"]
+            lat = e["latencias"]
+            linhas.append({
+                "endpoint": endpoint,
+                "requisicoes": n,
+                "tempo_medio_ms": round(e["tempo_ms"] / n, 2),
+                "p95_ms": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 2),
+                "tempo_db_medio_ms": round(e["tempo_db_ms"] / n, 2),
+                "queries_media": round(e["queries"] / n, 2),
+                "queries_max": e["queries_max"],
+                "duplicadas_media": round(e["duplicadas"] / n, 2),
+            })
+        return sorted(linhas, key=lambda l: l["tempo_medio_ms"] * l["requisicoes"], reverse=True)
+
+    def zerar(self):
+        with self._lock:
+            self._dados.clear()
+
+
+estatisticas = EstatisticasEndpoints(config()["AMOSTRAS"])
+
+_coletor: ContextVar["ColetorQueries | None"] = ContextVar("coletor_queries", default=None)
+
+
+def _executar(execute, sql, params, many, context):
+    """execute_wrapper das conexões: repassa ao coletor da requisição corrente, se houver."""
+    coletor = _coletor.get()
+    if coletor is None:
+        return execute(sql, params, many, context)
+    return coletor(execute, sql, params, many, context)
+
+
+def _instalar(connection, **kwargs):
+    if _executar not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_executar)
+
+
+def _instalar_nas_conexoes():
+    # as novas chegam pelo connection_created; estas já existiam
+    for conexao in connections.all(initialized_only=True):
+        _instalar(conexao)
+
+
+def nome_endpoint(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    rota = match.route if match is not None else "<sem rota>"
+    return f"{request.method} /{rota}"
+
+
+class InstrumentacaoMiddleware:
+    # funciona nas duas pilhas: sob ASGI não força as views async para uma thread
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = config()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        if self.config["ATIVA"]:
+            connection_created.connect(_instalar, dispatch_uid="instrumentacao_sql")
+
+    def _ignorar(self, request) -> bool:
+        return not self.config["ATIVA"] or request.path.startswith(tuple(self.config["IGNORAR"]))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self._ignorar(request):
+            return self.get_response(request)
+
+        _instalar_nas_conexoes()
+        coletor = ColetorQueries()
+        token = _coletor.set(coletor)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _coletor.reset(token)
+        tempo_ms = self._registrar(request, coletor, inicio)
+        if self.config["CABECALHOS"] or self._staff(getattr(request, "auth", None) or request.user):
+            self._cabecalhos(response, coletor, tempo_ms)
+        return response
+
+    async def __acall__(self, request):
+        if self._ignorar(request):
+            return await self.get_response(request)
+
+        # as conexões são por thread: as do ORM async ficam na thread do
+        # sync_to_async (thread_sensitive), e o ContextVar chega até ela
+        await sync_to_async(_instalar_nas_conexoes)()
+        coletor = ColetorQueries()
+        token = _coletor.set(coletor)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _coletor.reset(token)
+        tempo_ms = self._registrar(request, coletor, inicio)
+        if self.config["CABECALHOS"] or self._staff(getattr(request, "auth", None) or await request.auser()):
+            self._cabecalhos(response, coletor, tempo_ms)
+        return response
+
+    @staticmethod
+    def _staff(usuario) -> bool:
+        return bool(getattr(usuario, "is_staff", False))
+
+    def _registrar(self, request, coletor, inicio) -> float:
+        """Agrega a requisição nas estatísticas e devolve o tempo total (ms)."""
+        tempo_ms = (time.perf_counter() - inicio) * 1000
+        tempo_db_ms = coletor.tempo_db * 1000
+
+        endpoint = nome_endpoint(request)
+        estatisticas.registrar(endpoint, tempo_ms, tempo_db_ms, coletor.total, coletor.duplicadas)
+
+        similares = coletor.similares(self.config["LIMITE_SIMILARES"])
+        if similares:
+            sql, n = similares[0]
+            logger.warning("Possível N+1 em %s: query executada %d vezes: %s", endpoint, n, sql[:300])
+        return tempo_ms
+
+    @staticmethod
+    def _cabecalhos(response, coletor, tempo_ms):
+        tempo_db_ms = coletor.tempo_db * 1000
+        response["Server-Timing"] = (
+            f'db;dur={tempo_db_ms:.1f};desc="{coletor.total} queries", '
+            f"app;dur={tempo_ms - tempo_db_ms:.1f}, total;dur={tempo_ms:.1f}"
+        )
+        response["X-Query-Count"] = str(coletor.total)
+        if coletor.duplicadas:
+            response["X-Query-Duplicadas"] = str(coletor.duplicadas)
@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -59,6 +62,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.InstrumentacaoMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -87,13 +91,66 @@ CORS_ALLOW_ALL_ORIGINS = True
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+# Perfil escolhido por DB_PERFIL: "sqlite" (padrão) ou "postgres".
+#
+# sqlite: WAL (leitores não bloqueiam o escritor), transações IMMEDIATE (a
+# trava de escrita é pega no BEGIN; com DEFERRED, duas transações que leram
+# e depois tentam escrever falham na hora com "database is locked", sem
+# esperar o busy_timeout) e pragmas aplicados a cada conexão nova.
+#
+# postgres: pool de conexões do psycopg 3 (Django 5.1+, pacote psycopg[pool]);
+# com um pooler externo (PgBouncer) use POSTGRES_POOL=0, que troca o pool
+# por conexões persistentes (CONN_MAX_AGE) com health check.
+DB_PERFIL = os.environ.get("DB_PERFIL", "sqlite")
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",        # seguro com WAL; fsync só nos checkpoints
+    "busy_timeout": 20000,          # ms esperando a trava de escrita
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -32000,           # KiB (negativo = tamanho, não páginas)
+    "temp_store": "MEMORY",
 }
 
+if DB_PERFIL == "postgres":
+    _pool = os.environ.get("POSTGRES_POOL", "1") != "0"
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "leitura"),
+            "USER": os.environ.get("POSTGRES_USER", "leitura"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            # o pool já reaproveita as conexões: Django exige CONN_MAX_AGE=0 com ele
+            "CONN_MAX_AGE": 0 if _pool else int(os.environ.get("POSTGRES_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": not _pool,
+            "OPTIONS": (
+                {
+                    "pool": {
+                        "min_size": int(os.environ.get("POSTGRES_POOL_MIN", "2")),
+                        "max_size": int(os.environ.get("POSTGRES_POOL_MAX", "10")),
+                        "timeout": 10,
+                    }
+                }
+                if _pool else {}
+            ),
+        }
+    }
+elif DB_PERFIL == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            "OPTIONS": {
+                "transaction_mode": "IMMEDIATE",
+                "init_command": ";".join(f"PRAGMA {nome}={valor}" for nome, valor in SQLITE_PRAGMAS.items()),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"DB_PERFIL desconhecido: {DB_PERFIL!r} (use 'sqlite' ou 'postgres').")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -145,8 +202,55 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "contas.authentication.AccessKeyAuthentication",  # chave fixa de 32 chars
+        "contas.auth.AccessKeyAuthentication",  # chave fixa de 32 chars
     )
 }
 
+# Cache de chave de acesso -> usuário (contas/chaves.py).
+# CACHE_ALIAS aponta para um alias de CACHES (ex.: Redis) para compartilhar entre processos.
+ACCESS_KEY_CACHE = {
+    "LRU_TAMANHO": 1024,
+    "LRU_TTL": 30,
+    "CACHE_ALIAS": None,
+    "CACHE_TTL": 300,
+}
+
+# Busca de livros do cadastro (api/services/busca_livros.py).
+# Para testes/offline: PROVEDOR "api.services.busca_livros.ArquivoProvider".
+LIVROS_BUSCA = {
+    "PROVEDOR": "api.services.busca_livros.GoogleBooksProvider",
+    "OPCOES": {"api_key": os.environ.get("GOOGLE_BOOKS_API_KEY"), "timeout": 4.0},
+    "TTL": 7 * 24 * 3600,
+    "TTL_VAZIO": 3600,
+    "TAXA": "30/m",
+}
+
+# Métricas de SQL por requisição (core/middleware.py): Server-Timing,
+# X-Query-Count e agregados em GET /api/admin/metricas (staff).
+# Ligada em DEBUG; os cabeçalhos vão só para staff quando CABECALHOS=False.
+INSTRUMENTACAO = {
+    "ATIVA": DEBUG or os.environ.get("INSTRUMENTACAO") == "1",
+    "CABECALHOS": DEBUG,
+    "LIMITE_SIMILARES": 5,
+    "AMOSTRAS": 500,
+}
+
+# Cache do catálogo (livros/cache.py): categorias, detalhe de livro e opções do
+# formulário. ALIAS aponta para um alias de CACHES (locmem por padrão; Redis em produção).
+CACHE_CATALOGO = {
+    "ALIAS": "default",
+    "TTL": 3600,
+}
+
+# Eventos de leitura ao vivo (livros/eventos.py -> SSE em GET /api/user/eventos, só ASGI).
+# BackendMemoria entrega no próprio processo; com vários processos use um backend
+# sobre um broker com o mesmo contrato (publicar/assinar).
+EVENTOS = {
+    "ATIVO": True,
+    "BACKEND": "livros.eventos.BackendMemoria",
+    "OPCOES": {"tamanho_fila": 100},
+    "HEARTBEAT": 15,
+    "DURACAO_MAX": 1800,
+}
+
 LOGIN_REDIRECT_URL = 'livros:dashboard'   # ou '/app/'
\ No newline at end of file
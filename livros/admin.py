@@ -1,5 +1,5 @@
 from django.contrib import admin
-from livros.models import Livro, LeituraDiaria, Categoria
+from livros.models import Livro, LeituraDiaria, Categoria, StreakLeitura, ConsultaLivroCache
 
 
 @admin.register(Livro)
@@ -35,3 +35,18 @@ class CategoriaAdmin(admin.ModelAdmin):
         # Reverse default: Livro.categoria -> obj.livro_set
         return obj.livro_set.count()
     qtd_livros.short_description = "Livros"
+
+
+@admin.register(StreakLeitura)
+class StreakLeituraAdmin(admin.ModelAdmin):
+    list_display = ("usuario", "atual", "maior", "ultimo_dia", "atualizado_em")
+    search_fields = ("usuario__email",)
+    readonly_fields = ("atual", "maior", "ultimo_dia")
+
+
+@admin.register(ConsultaLivroCache)
+class ConsultaLivroCacheAdmin(admin.ModelAdmin):
+    list_display = ("consulta", "vazio", "expira_em", "atualizado_em")
+    list_filter = ("vazio",)
+    search_fields = ("consulta",)
+    ordering = ("-atualizado_em",)
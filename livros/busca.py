@@ -0,0 +1,146 @@
+# livros/busca.py
+"""
+Busca textual de livros (titulo/autor/isbn).
+
+No SQLite usa uma tabela FTS5 (livros_livro_fts) de conteúdo externo,
+com tokenizer unicode61 e remoção de acentos. Triggers em livros_livro
+a mantêm sincronizada em qualquer escrita (save, bulk_create, update).
+O ranking usa bm25 com peso maior para título. Em outros bancos, ou se a
+tabela não existir, cai para icontains por termo.
+"""
+import re
+import unicodedata
+
+from asgiref.sync import sync_to_async
+from django.db import connections, models
+from django.db.models import F, Q
+
+FTS_TABLE = "livros_livro_fts"
+MAX_TERMOS = 8
+
+SQL_INSTALAR = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        titulo, autor, isbn,
+        content='livros_livro', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON livros_livro BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, titulo, autor, isbn)
+        VALUES (new.id, new.titulo, new.autor, new.isbn);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON livros_livro BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, titulo, autor, isbn)
+        VALUES ('delete', old.id, old.titulo, old.autor, old.isbn);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF titulo, autor, isbn ON livros_livro BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, titulo, autor, isbn)
+        VALUES ('delete', old.id, old.titulo, old.autor, old.isbn);
+        INSERT INTO {FTS_TABLE}(rowid, titulo, autor, isbn)
+        VALUES (new.id, new.titulo, new.autor, new.isbn);
+    END
+    """,
+    # ranking padrão da coluna oculta 'rank': bm25 com pesos titulo > autor > isbn
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQL_REMOVER = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+_disponivel = {}
+
+
+class Match(models.Lookup):
+    """'coluna MATCH expressão' do FTS5 (campo__match=...)."""
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class DocumentoFTS(models.TextField):
+    """Coluna oculta com o nome da tabela FTS5, alvo do MATCH (LivroBusca.documento)."""
+
+
+DocumentoFTS.register_lookup(Match)
+
+
+def instalar(connection):
+    """Cria (ou recria) a tabela FTS5 e os triggers, reindexando o catálogo."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for sql in SQL_INSTALAR:
+            cursor.execute(sql)
+    _disponivel.pop(connection.alias, None)
+
+
+def remover(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for sql in SQL_REMOVER:
+            cursor.execute(sql)
+    _disponivel.pop(connection.alias, None)
+
+
+def fts_disponivel(alias: str = "default") -> bool:
+    if alias not in _disponivel:
+        connection = connections[alias]
+        _disponivel[alias] = (
+            connection.vendor == "sqlite"
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _disponivel[alias]
+
+
+async def afts_disponivel(alias: str = "default") -> bool:
+    """fts_disponivel() para views async (a introspecção roda fora do event loop)."""
+    if alias in _disponivel:
+        return _disponivel[alias]
+    return await sync_to_async(fts_disponivel)(alias)
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos ('Ação' -> 'acao')."""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def termos(q: str) -> list[str]:
+    return re.findall(r"\w+", normalizar(q))[:MAX_TERMOS]
+
+
+def filtrar(qs, q: str):
+    """
+    Filtra um queryset de Livro pela busca 'q'. Com FTS5, anota 'relevancia'
+    (bm25: menor = melhor) e cada termo casa por prefixo (typeahead).
+    """
+    tokens = termos(q)
+    if not tokens:
+        return qs
+
+    if not fts_disponivel(qs.db):
+        filtro = Q()
+        for token in tokens:
+            filtro &= Q(titulo__icontains=token) | Q(autor__icontains=token) | Q(isbn__icontains=token)
+        return qs.filter(filtro)
+
+    expressao = " ".join(f'"{token}"*' for token in tokens)
+    # JOIN com a tabela FTS (LivroBusca): o MATCH dirige a consulta e 'rank'
+    # sai do próprio índice (sem reavaliar o MATCH por linha); a anotação
+    # permite ORDER BY e filtros de cursor sobre a relevância
+    return qs.filter(fts__documento__match=expressao).annotate(relevancia=F("fts__rank"))
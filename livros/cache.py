@@ -0,0 +1,95 @@
+# livros/cache.py
+"""
+Cache-aside do catálogo (categorias e livros) com invalidação por geração.
+
+Cada namespace ("categorias", "livros") tem um número de geração guardado
+no próprio cache; as chaves de conteúdo embutem a geração atual. Invalidar
+é só trocar a geração (as entradas antigas expiram pelo TTL), então não é
+preciso conhecer nem apagar as chaves já gravadas.
+
+Categoria.save()/delete() e Livro.save()/delete() chamam invalidar(). O
+backend é o alias de settings.CACHE_CATALOGO["ALIAS"] (locmem por padrão,
+Redis/Memcached em produção para compartilhar entre processos). ageracao()
+e aobter() são as versões para views async (API async do cache).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+CONFIG_PADRAO = {
+    "ALIAS": "default",
+    "TTL": 3600,
+}
+PREFIXO = "catalogo"
+
+
+def config() -> dict:
+    return {**CONFIG_PADRAO, **getattr(settings, "CACHE_CATALOGO", {})}
+
+
+def _cache():
+    return caches[config()["ALIAS"]]
+
+
+def _chave_geracao(namespace: str) -> str:
+    return f"{PREFIXO}:geracao:{namespace}"
+
+
+def geracao(namespace: str) -> int:
+    cache = _cache()
+    chave = _chave_geracao(namespace)
+    valor = cache.get(chave)
+    if valor is None:
+        # começa num valor único: se a chave for despejada, não reaproveita gerações antigas
+        cache.add(chave, time.time_ns(), None)
+        valor = cache.get(chave) or time.time_ns()
+    return valor
+
+
+def _avancar(namespaces):
+    cache = _cache()
+    for namespace in namespaces:
+        try:
+            cache.incr(_chave_geracao(namespace))
+        except ValueError:  # chave ausente/despejada
+            cache.set(_chave_geracao(namespace), time.time_ns(), None)
+
+
+def invalidar(*namespaces: str):
+    """Avança a geração já e de novo após o commit (leitores concorrentes)."""
+    _avancar(namespaces)
+    transaction.on_commit(lambda: _avancar(namespaces))
+
+
+def obter(namespace: str, chave, construir, ttl: int | None = None):
+    """Valor em cache para (namespace, chave) na geração atual, ou construir()."""
+    cache = _cache()
+    chave_completa = f"{PREFIXO}:{namespace}:{geracao(namespace)}:{chave}"
+    valor = cache.get(chave_completa)
+    if valor is None:
+        valor = construir()
+        cache.set(chave_completa, valor, ttl or config()["TTL"])
+    return valor
+
+
+async def ageracao(namespace: str) -> int:
+    cache = _cache()
+    chave = _chave_geracao(namespace)
+    valor = await cache.aget(chave)
+    if valor is None:
+        await cache.aadd(chave, time.time_ns(), None)
+        valor = await cache.aget(chave) or time.time_ns()
+    return valor
+
+
+async def aobter(namespace: str, chave, construir, ttl: int | None = None):
+    """obter() para views async: 'construir' é uma função async."""
+    cache = _cache()
+    chave_completa = f"{PREFIXO}:{namespace}:{await ageracao(namespace)}:{chave}"
+    valor = await cache.aget(chave_completa)
+    if valor is None:
+        valor = await construir()
+        await cache.aset(chave_completa, valor, ttl or config()["TTL"])
+    return valor
@@ -0,0 +1,149 @@
+# livros/eventos.py
+"""
+Pub/sub de eventos de leitura por usuário (alimenta o SSE de
+GET /api/user/eventos).
+
+LeituraDiaria.save()/delete() chamam publicar() com o livro e o dia
+alterados; o evento só sai depois do commit (transaction.on_commit), então
+quem o recebe já enxerga o UserBook, o streak e os resumos atualizados. O
+evento é só um aviso ("o livro X mudou"): o assinante relê o estado que
+interessa, e o caminho de escrita não paga nada quando ninguém está ouvindo.
+
+O feed só existe sob ASGI e com settings.EVENTOS["ATIVO"]; disponivel()
+diz se a requisição atual pode assiná-lo (a view do dashboard só inclui o
+script nesse caso). O backend vem de settings.EVENTOS["BACKEND"] (caminho
+de classe). O padrão,
+BackendMemoria, entrega só aos assinantes do mesmo processo; com vários
+processos/servidores, troque por um backend com o mesmo contrato sobre um
+broker (ex.: Redis pub/sub):
+
+- publicar(canal, evento): chamável de qualquer thread, não bloqueia;
+- assinar(canal): gerenciador de contexto async que entrega uma asyncio.Queue
+  com os eventos do canal enquanto estiver aberto.
+"""
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PADRAO = {
+    "ATIVO": True,
+    "BACKEND": "livros.eventos.BackendMemoria",
+    "OPCOES": {},
+    "HEARTBEAT": 15,       # segundos entre comentários ': ping' no SSE
+    "DURACAO_MAX": 1800,   # o servidor encerra a conexão e o EventSource reconecta
+}
+
+
+def config() -> dict:
+    return {**CONFIG_PADRAO, **getattr(settings, "EVENTOS", {})}
+
+
+def disponivel(request) -> bool:
+    """O feed SSE atende esta requisição? (ligado e servido por ASGI)"""
+    # sob WSGI o stream prenderia uma thread por cliente até o fim da conexão
+    return bool(config()["ATIVO"]) and isinstance(request, ASGIRequest)
+
+
+class BackendEventos(ABC):
+    @abstractmethod
+    def publicar(self, canal: str, evento: dict):
+        ...
+
+    @abstractmethod
+    def assinar(self, canal: str):
+        ...
+
+
+class BackendMemoria(BackendEventos):
+    """Filas asyncio por assinante, no processo atual."""
+
+    def __init__(self, tamanho_fila: int = 100):
+        self.tamanho_fila = tamanho_fila
+        self._assinantes: dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def publicar(self, canal: str, evento: dict):
+        with self._lock:
+            alvos = list(self._assinantes.get(canal, ()))
+        for loop, fila in alvos:
+            try:
+                loop.call_soon_threadsafe(self._entregar, fila, evento)
+            except RuntimeError:  # loop já encerrado; a assinatura sai no finally
+                pass
+
+    @staticmethod
+    def _entregar(fila: asyncio.Queue, evento: dict):
+        if fila.full():
+            fila.get_nowait()  # cliente lento: descarta o mais antigo
+        fila.put_nowait(evento)
+
+    def assinar(self, canal: str):
+        return _AssinaturaMemoria(self, canal)
+
+    def _adicionar(self, canal: str, item):
+        with self._lock:
+            self._assinantes.setdefault(canal, set()).add(item)
+
+    def _remover(self, canal: str, item):
+        with self._lock:
+            restantes = self._assinantes.get(canal)
+            if restantes is not None:
+                restantes.discard(item)
+                if not restantes:
+                    del self._assinantes[canal]
+
+
+class _AssinaturaMemoria:
+    """
+    Gerenciador de contexto de BackendMemoria.assinar(). É uma classe, não um
+    @asynccontextmanager: quando o cliente do SSE cai, o gerador do fluxo é
+    finalizado pelo loop, e um gerador interno finalizado à parte quebraria
+    o __aexit__ ("generator didn't stop after athrow()").
+    """
+
+    def __init__(self, backend: BackendMemoria, canal: str):
+        self.backend = backend
+        self.canal = canal
+        self.item = None
+
+    async def __aenter__(self) -> asyncio.Queue:
+        self.item = (asyncio.get_running_loop(), asyncio.Queue(self.backend.tamanho_fila))
+        self.backend._adicionar(self.canal, self.item)
+        return self.item[1]
+
+    async def __aexit__(self, *exc):
+        self.backend._remover(self.canal, self.item)
+
+
+@lru_cache(maxsize=None)
+def get_backend() -> BackendEventos:
+    cfg = config()
+    return import_string(cfg["BACKEND"])(**cfg["OPCOES"])
+
+
+def canal_usuario(usuario_id) -> str:
+    return f"usuario:{usuario_id}"
+
+
+def _enviar(canal: str, evento: dict):
+    try:
+        get_backend().publicar(canal, evento)
+    except Exception:
+        # falha no pub/sub nunca desfaz nem quebra a escrita
+        logger.exception("Falha ao publicar evento em %s", canal)
+
+
+def publicar(usuario_id, tipo: str, **dados):
+    """Publica {'tipo', **dados} no canal do usuário após o commit."""
+    canal = canal_usuario(usuario_id)
+    evento = {"tipo": tipo, **dados}
+    transaction.on_commit(lambda: _enviar(canal, evento))
@@ -1,12 +1,35 @@
 # app/forms.py
 from django import forms
 from django.core.exceptions import ValidationError
+from livros.cache import obter as obter_do_cache
 from livros.models import Livro, Categoria
 
 
+class _IteradorCategoriasEmCache(forms.models.ModelChoiceIterator):
+    """Opções (id, nome) do cache do catálogo: o modal não consulta o banco a cada render."""
+
+    def _opcoes(self):
+        return obter_do_cache(
+            "categorias", "opcoes",
+            lambda: list(self.queryset.values_list("pk", "nome")),
+        )
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from self._opcoes()
+
+    def __len__(self):
+        return len(self._opcoes()) + (1 if self.field.empty_label is not None else 0)
+
+
+class CategoriaChoiceField(forms.ModelChoiceField):
+    iterator = _IteradorCategoriasEmCache
+
+
 BASE_INPUT = "w-full px-3 py-2 border border-slate-300 rounded-xl focus:ring-2 focus:ring-[var(--great-green)] focus:border-[var(--great-green)] outline-none transition-colors"
 class LivroForm(forms.ModelForm):
-    categoria = forms.ModelChoiceField(
+    categoria = CategoriaChoiceField(
         queryset=Categoria.objects.order_by("nome"),
         required=True,                       # torne obrigatório (recomendado)
         label="Categoria",
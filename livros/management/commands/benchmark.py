@@ -0,0 +1,125 @@
+import json
+import subprocess
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from livros.services import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera massa sintética num banco de teste, mede os caminhos quentes "
+        "(latência p50/p95/p99 e queries) e grava o resultado em JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuarios", type=int, default=20)
+        parser.add_argument("--livros", type=int, default=2000)
+        parser.add_argument("--livros-por-usuario", type=int, default=30)
+        parser.add_argument("--anos", type=int, default=3, help="Anos de histórico de leitura por usuário.")
+        parser.add_argument("--repeticoes", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--cenario", action="append", dest="cenarios",
+            help="Mede só este cenário (pode repetir). Default: todos.",
+        )
+        parser.add_argument("--saida", default="benchmark.json", help="Arquivo JSON de saída.")
+        parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar.")
+        parser.add_argument(
+            "--keepdb", action="store_true",
+            help="Mantém o banco de teste (útil com Postgres/MySQL entre execuções).",
+        )
+
+    def handle(self, *args, **options):
+        anterior = None
+        if options["comparar"]:
+            try:
+                anterior = json.loads(Path(options["comparar"]).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Não foi possível ler {options['comparar']}: {exc}")
+
+        # nunca roda sobre o banco real: cria o banco de teste como o test runner
+        setup_test_environment()
+        nome_original = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            resultado = self._executar(options)
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        Path(options["saida"]).write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}."))
+
+        if anterior:
+            self._comparar(anterior, resultado)
+
+    def _executar(self, options) -> dict:
+        escala = {
+            "usuarios": options["usuarios"],
+            "livros": options["livros"],
+            "livros_por_usuario": options["livros_por_usuario"],
+            "anos": options["anos"],
+            "seed": options["seed"],
+        }
+        self.stdout.write("Gerando dados sintéticos...")
+        t0 = time.perf_counter()
+        dados = benchmark.gerar_dados(**escala)
+        geracao_s = round(time.perf_counter() - t0, 2)
+        self.stdout.write(f"  {dados} em {geracao_s}s")
+
+        cenarios = benchmark.cenarios(seed=options["seed"])
+        selecionados = options["cenarios"] or list(cenarios)
+        desconhecidos = set(selecionados) - set(cenarios)
+        if desconhecidos:
+            raise CommandError(f"Cenário(s) desconhecido(s): {', '.join(sorted(desconhecidos))}")
+
+        medidas = {}
+        for nome in selecionados:
+            medidas[nome] = benchmark.medir(cenarios[nome], repeticoes=options["repeticoes"])
+            m = medidas[nome]
+            self.stdout.write(
+                f"  {nome:<26} p50 {m['p50_ms']:>8.2f}ms  p95 {m['p95_ms']:>8.2f}ms  "
+                f"p99 {m['p99_ms']:>8.2f}ms  queries {m['queries_min']}-{m['queries_max']}"
+            )
+
+        return {
+            "gerado_em": timezone.now().isoformat(),
+            "commit": self._commit_atual(),
+            "banco": connection.vendor,
+            "escala": escala,
+            "dados": dados,
+            "geracao_s": geracao_s,
+            "cenarios": medidas,
+        }
+
+    @staticmethod
+    def _commit_atual():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _comparar(self, anterior: dict, atual: dict):
+        self.stdout.write(f"\nComparação com {anterior.get('commit') or 'execução anterior'}:")
+        if anterior.get("escala") != atual["escala"]:
+            self.stdout.write(self.style.WARNING("  Atenção: escalas diferentes, comparação aproximada."))
+        for nome, m in atual["cenarios"].items():
+            antes = anterior.get("cenarios", {}).get(nome)
+            if not antes:
+                self.stdout.write(f"  {nome:<26} (novo)")
+                continue
+            variacao = (m["p95_ms"] - antes["p95_ms"]) / antes["p95_ms"] * 100 if antes["p95_ms"] else 0.0
+            linha = (
+                f"  {nome:<26} p95 {antes['p95_ms']:.2f} -> {m['p95_ms']:.2f}ms ({variacao:+.1f}%)  "
+                f"queries {antes['queries_max']} -> {m['queries_max']}"
+            )
+            piorou = variacao > 20 or m["queries_max"] > antes["queries_max"]
+            self.stdout.write(self.style.WARNING(linha) if piorou else linha)
@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import carga
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga HTTP contra um servidor já rodando (WSGI ou ASGI): "
+        "vazão e latência p50/p95/p99 para cada nível de concorrência."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="URLs http:// (alternadas entre as requisições).")
+        parser.add_argument(
+            "--concorrencia", type=int, action="append", dest="concorrencias",
+            help="Conexões simultâneas (pode repetir para uma série). Default: 10 e 50.",
+        )
+        parser.add_argument("--duracao", type=float, default=10.0, help="Segundos por nível.")
+        parser.add_argument(
+            "--timeout", type=float, default=carga.TIMEOUT,
+            help=f"Segundos por requisição antes de contar erro (default: {carga.TIMEOUT:g}).",
+        )
+        parser.add_argument("--chave", help="Chave de acesso enviada em 'Authorization: Key <chave>'.")
+        parser.add_argument("--rotulo", default="", help="Nome da pilha no resultado (ex.: wsgi, asgi).")
+        parser.add_argument("--saida", help="Arquivo JSON de saída.")
+        parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar.")
+
+    def handle(self, *args, **options):
+        anterior = None
+        if options["comparar"]:
+            try:
+                anterior = json.loads(Path(options["comparar"]).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Não foi possível ler {options['comparar']}: {exc}")
+
+        cabecalhos = {"Authorization": f"Key {options['chave']}"} if options["chave"] else {}
+        niveis = []
+        for concorrencia in options["concorrencias"] or [10, 50]:
+            try:
+                r = carga.executar(
+                    options["urls"], concorrencia, options["duracao"], cabecalhos, timeout=options["timeout"]
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            niveis.append(r)
+            self.stdout.write(
+                f"c={r['concorrencia']:<4} {r['req_s']:>8.1f} req/s   p50 {r['p50_ms']:>8.2f}   "
+                f"p95 {r['p95_ms']:>8.2f}   p99 {r['p99_ms']:>8.2f} ms   status {r['status']}"
+                + (f"   erros {r['erros']}" if r["erros"] else "")
+            )
+
+        resultado = {"rotulo": options["rotulo"], "urls": options["urls"], "niveis": niveis}
+        if options["saida"]:
+            Path(options["saida"]).write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}."))
+
+        if anterior:
+            self._comparar(anterior, resultado)
+
+    def _comparar(self, anterior: dict, atual: dict):
+        self.stdout.write(f"\nComparação ({anterior.get('rotulo') or 'anterior'} -> {atual['rotulo'] or 'atual'}):")
+        por_nivel = {n["concorrencia"]: n for n in anterior.get("niveis", [])}
+        for nivel in atual["niveis"]:
+            antes = por_nivel.get(nivel["concorrencia"])
+            if not antes:
+                continue
+            ganho = nivel["req_s"] / antes["req_s"] if antes["req_s"] else 0
+            self.stdout.write(
+                f"  c={nivel['concorrencia']:<4} req/s {antes['req_s']:>8.1f} -> {nivel['req_s']:>8.1f} "
+                f"({ganho:.2f}x)   p95 {antes['p95_ms']:.2f} -> {nivel['p95_ms']:.2f} ms"
+            )
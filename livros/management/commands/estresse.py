@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from livros.services import estresse
+
+
+class Command(BaseCommand):
+    help = (
+        "Registra páginas a partir de várias threads num banco de teste e "
+        "relata vazão, latência, erros de trava e a consistência dos totais."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads", type=int, action="append", dest="series",
+            help="Threads simultâneas (pode repetir para uma série). Default: 4, 16 e 32.",
+        )
+        parser.add_argument("--operacoes", type=int, default=100, help="Registros por thread.")
+        parser.add_argument("--usuarios", type=int, default=4)
+        parser.add_argument("--livros-por-usuario", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--sqlite-padrao", action="store_true",
+            help="SQLite sem o perfil ajustado (DEFERRED, sem WAL/pragmas), para comparar.",
+        )
+        parser.add_argument("--saida", help="Arquivo JSON de saída.")
+
+    def handle(self, *args, **options):
+        config = connection.settings_dict
+        sqlite = connection.vendor == "sqlite"
+        temporario = None
+        if sqlite:
+            # arquivo de verdade: o banco em memória compartilhada não tem WAL
+            # nem o mesmo modelo de travas
+            temporario = tempfile.mkdtemp(prefix="estresse-")
+            config["TEST"]["NAME"] = os.path.join(temporario, "estresse.sqlite3")
+            if options["sqlite_padrao"]:
+                config["OPTIONS"] = {}
+        perfil = "padrão" if options["sqlite_padrao"] else "ajustado"
+        self.stdout.write(f"Banco: {connection.vendor}" + (f" (perfil {perfil})" if sqlite else ""))
+
+        # os erros de trava são contados no relatório; sem um traceback por requisição
+        logging.getLogger("django").setLevel(logging.CRITICAL)
+
+        setup_test_environment()
+        nome_original = config["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            alvos = estresse.preparar(options["usuarios"], options["livros_por_usuario"])
+            resultados = []
+            for threads in options["series"] or [4, 16, 32]:
+                r = estresse.executar(alvos, threads, options["operacoes"], options["seed"])
+                resultados.append(r)
+                self.stdout.write(
+                    f"threads={r['threads']:<4} {r['ops_s']:>8.1f} ops/s   p50 {r['p50_ms']:>8.2f}   "
+                    f"p95 {r['p95_ms']:>8.2f}   p99 {r['p99_ms']:>8.2f} ms   "
+                    f"sucesso {r['sucesso']}/{r['operacoes']}   consistente {r['consistente']}"
+                )
+                falhas = {codigo: n for codigo, n in r["status"].items() if not codigo.startswith("2")}
+                if falhas:
+                    self.stdout.write(self.style.WARNING(f"    respostas de erro: {falhas}"))
+                for erro, n in r["erros"].items():
+                    self.stdout.write(self.style.WARNING(f"    {n}x {erro}"))
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+            teardown_test_environment()
+            if temporario:
+                for arquivo in Path(temporario).glob("*"):
+                    arquivo.unlink()
+                os.rmdir(temporario)
+
+        if options["saida"]:
+            resultado = {"banco": connection.vendor, "perfil": perfil if sqlite else None, "series": resultados}
+            Path(options["saida"]).write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from contas.models import Usuario
+from livros.services.importacao import importar_leituras, formato_do_nome, TAMANHO_LOTE
+
+
+class Command(BaseCommand):
+    help = "Importa histórico de leituras (CSV ou NDJSON) para um usuário."
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do arquivo (.csv, .ndjson ou .jsonl).")
+        parser.add_argument("--usuario", required=True, help="E-mail do usuário de destino.")
+        parser.add_argument("--formato", choices=("csv", "ndjson"), help="Default: pela extensão do arquivo.")
+        parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help=f"Linhas por lote (default: {TAMANHO_LOTE}).")
+
+    def handle(self, *args, **options):
+        usuario = Usuario.objects.filter(email__iexact=options["usuario"]).first()
+        if usuario is None:
+            raise CommandError(f"Usuário '{options['usuario']}' não encontrado.")
+
+        formato = options["formato"] or formato_do_nome(options["arquivo"])
+        try:
+            with open(options["arquivo"], "rb") as arquivo:
+                relatorio = importar_leituras(usuario, arquivo, formato, tamanho_lote=options["lote"])
+        except OSError as exc:
+            raise CommandError(f"Não foi possível ler o arquivo: {exc}")
+
+        for erro in relatorio.erros:
+            self.stderr.write(f"linha {erro['linha']}: {erro['erro']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{relatorio.linhas} linha(s): {relatorio.importadas} importada(s), "
+            f"{relatorio.ignoradas} já existente(s), {relatorio.invalidas} inválida(s); "
+            f"{relatorio.livros_criados} livro(s) criado(s)."
+        ))
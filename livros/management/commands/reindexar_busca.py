@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from livros import busca
+
+
+class Command(BaseCommand):
+    help = "Recria a tabela FTS5 de busca de livros e seus triggers, reindexando o catálogo."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite":
+            self.stdout.write("Banco sem FTS5: a busca usa icontains, nada a reindexar.")
+            return
+        # ALTERs do SQLite recriam livros_livro e descartam os triggers: reinstala tudo
+        busca.remover(connection)
+        busca.instalar(connection)
+        self.stdout.write(self.style.SUCCESS("Índice de busca reconstruído."))
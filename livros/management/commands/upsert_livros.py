@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from livros.services.catalogo import upsert_de_arquivo, TAMANHO_LOTE
+from livros.services.importacao import formato_do_nome
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria ou atualiza livros do catálogo a partir de um CSV/NDJSON "
+        "(campos do LivroCreateSchema; chave: google_id, isbn ou titulo + autor + total_paginas)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do arquivo (.csv, .ndjson ou .jsonl).")
+        parser.add_argument("--formato", choices=("csv", "ndjson"), help="Default: pela extensão do arquivo.")
+        parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help=f"Livros por lote (default: {TAMANHO_LOTE}).")
+
+    def handle(self, *args, **options):
+        formato = options["formato"] or formato_do_nome(options["arquivo"])
+        try:
+            with open(options["arquivo"], "rb") as arquivo:
+                relatorio = upsert_de_arquivo(arquivo, formato, tamanho_lote=options["lote"])
+        except OSError as exc:
+            raise CommandError(f"Não foi possível ler o arquivo: {exc}")
+
+        for erro in relatorio.erros:
+            self.stderr.write(f"linha {erro['linha']}: {erro['erro']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{relatorio.linhas} linha(s): {relatorio.criados} criado(s), "
+            f"{relatorio.atualizados} atualizado(s), {relatorio.ignorados} ignorado(s), "
+            f"{relatorio.invalidas} inválida(s)."
+        ))
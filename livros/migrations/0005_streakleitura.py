@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("livros", "0004_alter_livro_categoria"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StreakLeitura",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("atual", models.PositiveIntegerField(default=0)),
+                ("maior", models.PositiveIntegerField(default=0)),
+                ("ultimo_dia", models.DateField(blank=True, null=True)),
+                ("atualizado_em", models.DateTimeField(auto_now=True)),
+                (
+                    "usuario",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="streak",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Streak de leitura",
+                "verbose_name_plural": "Streaks de leitura",
+            },
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+
+def preencher_resumos(apps, schema_editor):
+    LeituraDiaria = apps.get_model("livros", "LeituraDiaria")
+    ResumoDiario = apps.get_model("livros", "ResumoDiario")
+    ResumoMensal = apps.get_model("livros", "ResumoMensal")
+
+    diarios = (
+        LeituraDiaria.objects.order_by()
+        .values("usuario_id", "dia")
+        .annotate(total=Sum("paginas_lidas"))
+        .iterator(chunk_size=2000)
+    )
+    ResumoDiario.objects.bulk_create(
+        (
+            ResumoDiario(usuario_id=row["usuario_id"], dia=row["dia"], paginas=row["total"])
+            for row in diarios
+        ),
+        batch_size=2000,
+    )
+
+    mensais = (
+        ResumoDiario.objects.order_by()
+        .annotate(mes=TruncMonth("dia"))
+        .values("usuario_id", "mes")
+        .annotate(total=Sum("paginas"))
+    )
+    ResumoMensal.objects.bulk_create(
+        [
+            ResumoMensal(usuario_id=row["usuario_id"], mes=row["mes"], paginas=row["total"])
+            for row in mensais
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("livros", "0005_streakleitura"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumoDiario",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("paginas", models.IntegerField(default=0)),
+                ("atualizado_em", models.DateTimeField(auto_now=True)),
+                ("dia", models.DateField()),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumos_diarios",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["dia"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("usuario", "dia"),
+                        name="unique_resumo_diario_usuario_dia",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ResumoMensal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("paginas", models.IntegerField(default=0)),
+                ("atualizado_em", models.DateTimeField(auto_now=True)),
+                ("mes", models.DateField()),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumos_mensais",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["mes"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("usuario", "mes"),
+                        name="unique_resumo_mensal_usuario_mes",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
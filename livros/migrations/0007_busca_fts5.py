@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:02
+
+from django.db import migrations
+
+from livros import busca
+
+
+def instalar_fts(apps, schema_editor):
+    busca.instalar(schema_editor.connection)
+
+
+def remover_fts(apps, schema_editor):
+    busca.remover(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("livros", "0006_resumodiario_resumomensal"),
+    ]
+
+    operations = [
+        migrations.RunPython(instalar_fts, remover_fts),
+    ]
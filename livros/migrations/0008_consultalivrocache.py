@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("livros", "0007_busca_fts5"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConsultaLivroCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("consulta", models.CharField(max_length=200, unique=True)),
+                ("resultados", models.JSONField(blank=True, default=list)),
+                ("vazio", models.BooleanField(default=False)),
+                ("expira_em", models.DateTimeField(db_index=True)),
+                ("criado_em", models.DateTimeField(auto_now_add=True)),
+                ("atualizado_em", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Consulta de livros (cache)",
+                "verbose_name_plural": "Consultas de livros (cache)",
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("livros", "0008_consultalivrocache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="categoria",
+            name="atualizado_em",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="livro",
+            index=models.Index(
+                fields=["atualizado_em"], name="livro_atualizado_em_idx"
+            ),
+        ),
+    ]
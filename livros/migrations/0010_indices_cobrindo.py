@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("livros", "0009_versao_api"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="leituradiaria",
+            name="livros_leit_usuario_dce240_idx",
+        ),
+        migrations.AddIndex(
+            model_name="leituradiaria",
+            index=models.Index(
+                fields=["usuario", "dia", "paginas_lidas"],
+                name="leitura_usuario_dia_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leituradiaria",
+            index=models.Index(
+                fields=["usuario", "livro", "paginas_lidas"],
+                name="leitura_usuario_livro_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:37
+
+import django.db.models.deletion
+import livros.busca
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("livros", "0010_indices_cobrindo"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LivroBusca",
+            fields=[
+                (
+                    "livro",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="fts",
+                        serialize=False,
+                        to="livros.livro",
+                    ),
+                ),
+                ("documento", livros.busca.DocumentoFTS(db_column="livros_livro_fts")),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "livros_livro_fts",
+                "managed": False,
+            },
+        ),
+    ]
@@ -3,11 +3,16 @@ from django.db.models import Sum, Q
 from django.utils import timezone
 from django.conf import settings
 
+from collections import defaultdict
 from datetime import timedelta
 
+from livros import busca, eventos
+from livros.cache import invalidar as invalidar_cache
+
 
 class Categoria(models.Model):
     nome = models.CharField("Nome", max_length=100, unique=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Categoria"
@@ -16,6 +21,17 @@ class Categoria(models.Model):
     def __str__(self):
         return self.nome
 
+    def save(self, *args, **kwargs):
+        resultado = super().save(*args, **kwargs)
+        # o nome da categoria também sai aninhado no detalhe dos livros
+        invalidar_cache("categorias", "livros")
+        return resultado
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        invalidar_cache("categorias", "livros")
+        return resultado
+
 
 class Livro(models.Model):
     class Avaliacao(models.IntegerChoices):
@@ -38,14 +54,37 @@ class Livro(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # MAX(atualizado_em) das versões de ETag da API e ordenação padrão
+        indexes = [models.Index(fields=["atualizado_em"], name="livro_atualizado_em_idx")]
 
     def __str__(self):
         return f"{self.titulo} - {self.autor}"
 
+    def save(self, *args, **kwargs):
+        resultado = super().save(*args, **kwargs)
+        invalidar_cache("livros")
+        return resultado
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        invalidar_cache("livros")
+        return resultado
+
     # --- conveniências dependentes do usuário (usando o through UserBook) ---
     def userbook(self, usuario):
-        """Retorna o vínculo Usuario<->Livro (UserBook) ou None."""
-        return self.user_books.filter(usuario=usuario).first()
+        """Retorna o vínculo Usuario<->Livro (UserBook) ou None (memorizado na instância)."""
+        cache = self.__dict__.setdefault("_userbooks_por_usuario", {})
+        if usuario.pk not in cache:
+            ub = self.user_books.filter(usuario=usuario).first()
+            if ub is not None:
+                ub.livro = self
+            cache[usuario.pk] = ub
+        return cache[usuario.pk]
+
+    def lembrar_userbook(self, usuario, ub):
+        """Registra um UserBook já carregado para evitar nova consulta em userbook()."""
+        self.__dict__.setdefault("_userbooks_por_usuario", {})[usuario.pk] = ub
 
     def progresso_pct_para(self, usuario) -> float:
         """% lido por um usuário específico (0–100)."""
@@ -66,6 +105,46 @@ class Livro(models.Model):
         return int(100 - pct)
 
 
+class LivroBusca(models.Model):
+    """
+    Tabela FTS5 da busca (livros/busca.py), criada na migração 0007 e mantida
+    por triggers: só leitura, para o ORM fazer o JOIN do MATCH com Livro.
+    """
+    livro = models.OneToOneField(
+        Livro, on_delete=models.DO_NOTHING, primary_key=True, db_column="rowid", related_name="fts",
+    )
+    documento = busca.DocumentoFTS(db_column=busca.FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = busca.FTS_TABLE
+
+
+class ConsultaLivroCache(models.Model):
+    """
+    Cache persistente das respostas do provedor externo de busca de livros
+    (Google Books), por consulta normalizada. 'vazio' marca cache negativo.
+    """
+    consulta = models.CharField(max_length=200, unique=True)
+    resultados = models.JSONField(default=list, blank=True)
+    vazio = models.BooleanField(default=False)
+    expira_em = models.DateTimeField(db_index=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Consulta de livros (cache)"
+        verbose_name_plural = "Consultas de livros (cache)"
+
+    def __str__(self):
+        return f"{self.consulta} ({len(self.resultados)} resultados)"
+
+    @property
+    def expirada(self) -> bool:
+        return self.expira_em <= timezone.now()
+
+
 class LeituraDiaria(models.Model):
     """
     Registro do quanto foi lido em um determinado DIA.
@@ -96,7 +175,12 @@ class LeituraDiaria(models.Model):
                 name="leit_diaria_paginas_gte_zero",  # mude o nome para forçar a migração
             ),
         ]
-        indexes = [models.Index(fields=["usuario", "dia"])]
+        # 'paginas_lidas' na chave torna os índices cobrindo as somas quentes
+        # (progresso por livro, diário/mensal por período): sem ir à tabela
+        indexes = [
+            models.Index(fields=["usuario", "dia", "paginas_lidas"], name="leitura_usuario_dia_idx"),
+            models.Index(fields=["usuario", "livro", "paginas_lidas"], name="leitura_usuario_livro_idx"),
+        ]
         ordering = ["-dia"]
 
     def __str__(self):
@@ -137,45 +221,541 @@ class LeituraDiaria(models.Model):
     def streak_vivo(cls, usuario) -> int:
         """
         Conta streak 'vivo': se hoje não leu, conta até ontem.
+        Lê o registro materializado em StreakLeitura (uma consulta indexada).
         """
-        hoje = timezone.localdate()
-        leu_hoje = cls.objects.filter(usuario=usuario, dia=hoje).exists()
-        limite = hoje if leu_hoje else (hoje - timedelta(days=1))
-        return cls.streak_atual(usuario, ate=limite)
+        return StreakLeitura.para(usuario).vivo()
     # --------------------------------------------------------------------
 
-    def aplicar_no_progresso(self):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # guarda o estado persistido para calcular deltas no save()/delete()
+        instance._estado_db = instance._snapshot()
+        return instance
+
+    def _snapshot(self) -> dict:
+        return {
+            "usuario_id": self.__dict__.get("usuario_id"),
+            "livro_id": self.__dict__.get("livro_id"),
+            "dia": self.__dict__.get("dia"),
+            "paginas_lidas": self.__dict__.get("paginas_lidas"),
+        }
+
+    @staticmethod
+    def _aplicar_delta_progresso(usuario_id, livro_id, delta, userbook=None, livro=None):
         """
-        Recalcula o progresso do *usuário* neste livro e atualiza UserBook.
+        Soma 'delta' em UserBook.pagina_atual (travado com select_for_update).
+        Custo constante: não depende do tamanho do histórico de leituras.
+
+        'pagina_atual' guarda min(soma dos logs, total_paginas): no teto, o
+        excedente dos logs se perde, então um delta negativo ali recalcula a
+        partir dos logs em vez de subtrair do valor truncado.
         """
         from contas.models import UserBook  # evite import circular se estiver no mesmo arquivo
 
         with transaction.atomic():
-            ub, _ = UserBook.objects.select_for_update().get_or_create(
-                usuario=self.usuario,
-                livro=self.livro,
-            )
+            ub = userbook
+            if ub is None:
+                ub, _ = UserBook.objects.select_for_update().get_or_create(
+                    usuario_id=usuario_id,
+                    livro_id=livro_id,
+                )
+            if livro is not None and ub.livro_id == livro.pk:
+                ub.livro = livro  # evita nova consulta no clamp
 
-            total_user = (
-                LeituraDiaria.objects.filter(usuario=self.usuario, livro=self.livro)
-                .aggregate(total=Sum("paginas_lidas"))["total"]
-                or 0
-            )
+            if delta < 0 and (ub.pagina_atual or 0) >= (ub.livro.total_paginas or 0):
+                ub.recomputar_de_logs()
+                return ub
 
-            ub.pagina_atual = total_user
+            ub.pagina_atual = max(0, (ub.pagina_atual or 0) + delta)
             ub._clamp_and_flag_conclusao()
             ub.save(update_fields=["pagina_atual", "concluido_em", "atualizado_em"])
+        return ub
+
+    def aplicar_no_progresso(self, delta=None, userbook=None):
+        """
+        Atualiza o progresso do *usuário* neste livro (UserBook).
+
+        Com 'delta', aplica só a variação de páginas deste registro; sem ele,
+        recalcula a partir de todo o histórico (UserBook.recomputar_de_logs).
+        'userbook' reaproveita um UserBook já travado pelo chamador.
+        """
+        from contas.models import UserBook  # evite import circular se estiver no mesmo arquivo
+
+        livro = self.livro if LeituraDiaria.livro.is_cached(self) else None
+
+        if delta is not None:
+            return self._aplicar_delta_progresso(
+                self.usuario_id, self.livro_id, delta, userbook=userbook, livro=livro
+            )
+
+        with transaction.atomic():
+            ub = userbook
+            if ub is None:
+                ub, _ = UserBook.objects.select_for_update().get_or_create(
+                    usuario_id=self.usuario_id,
+                    livro_id=self.livro_id,
+                )
+            if livro is not None:
+                ub.livro = livro
+            ub.recomputar_de_logs()
+        return ub
+
+    def save(self, *args, userbook=None, **kwargs):
+        anterior = getattr(self, "_estado_db", None) if not self._state.adding else None
 
-    def save(self, *args, **kwargs):
         with transaction.atomic():
             super().save(*args, **kwargs)
-            self.aplicar_no_progresso()
+            if hasattr(self.paginas_lidas, "resolve_expression"):
+                # F() / expressões: busca o valor resultante para calcular o delta
+                self.refresh_from_db(fields=["paginas_lidas"])
 
-    def delete(self, *args, **kwargs):
+            atual = self._snapshot()
+            paginas_antes = (anterior or {}).get("paginas_lidas") or 0
+            movido = anterior is not None and (anterior["usuario_id"], anterior["livro_id"]) != (
+                atual["usuario_id"], atual["livro_id"]
+            )
+            if movido:
+                # registro mudou de usuário/livro: desfaz no vínculo antigo e
+                # soma tudo no novo ('anterior' segue valendo para resumos/streak)
+                self._aplicar_delta_progresso(anterior["usuario_id"], anterior["livro_id"], -paginas_antes)
+
+            delta = atual["paginas_lidas"] - (0 if movido else paginas_antes)
+            if delta or anterior is None or movido:
+                self.aplicar_no_progresso(delta, userbook=userbook)
+
+            # resumos diário/mensal: mesma transação, só a variação de páginas
+            if anterior is None:
+                ResumoDiario.aplicar_deltas(atual["usuario_id"], {atual["dia"]: atual["paginas_lidas"]})
+            elif (anterior["usuario_id"], anterior["dia"]) != (atual["usuario_id"], atual["dia"]):
+                ResumoDiario.aplicar_deltas(anterior["usuario_id"], {anterior["dia"]: -paginas_antes})
+                ResumoDiario.aplicar_deltas(atual["usuario_id"], {atual["dia"]: atual["paginas_lidas"]})
+            else:
+                ResumoDiario.aplicar_deltas(atual["usuario_id"], {atual["dia"]: atual["paginas_lidas"] - paginas_antes})
+
+            # streak: só muda quando um dia passa a ter (ou deixa de ter) leitura
+            if anterior is None:
+                StreakLeitura.registrar_dia(atual["usuario_id"], atual["dia"])
+            elif (anterior["usuario_id"], anterior["dia"]) != (atual["usuario_id"], atual["dia"]):
+                StreakLeitura.remover_dia(anterior["usuario_id"], anterior["dia"])
+                StreakLeitura.registrar_dia(atual["usuario_id"], atual["dia"])
+
+            # avisa os dashboards abertos (SSE) depois do commit
+            if anterior and (anterior["usuario_id"], anterior["livro_id"], anterior["dia"]) != (
+                atual["usuario_id"], atual["livro_id"], atual["dia"]
+            ):
+                self._publicar_evento(anterior)
+            self._publicar_evento(atual)
+            self._estado_db = atual
+
+    def delete(self, *args, userbook=None, **kwargs):
+        estado = getattr(self, "_estado_db", None) or self._snapshot()
+
+        livro = self.livro if LeituraDiaria.livro.is_cached(self) else None
+
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            self._aplicar_delta_progresso(
+                estado["usuario_id"], estado["livro_id"], -(estado["paginas_lidas"] or 0),
+                userbook=userbook, livro=livro,
+            )
+            ResumoDiario.aplicar_deltas(estado["usuario_id"], {estado["dia"]: -(estado["paginas_lidas"] or 0)})
+            StreakLeitura.remover_dia(estado["usuario_id"], estado["dia"])
+            self._publicar_evento(estado)
+        return resultado
+
+    @staticmethod
+    def _publicar_evento(estado):
+        eventos.publicar(
+            estado["usuario_id"], "leitura",
+            livro_id=estado["livro_id"], dia=str(estado["dia"]),
+        )
+
+
+class StreakLeitura(models.Model):
+    """
+    Streak materializado por usuário, mantido pelos hooks de LeituraDiaria.
+    'ultimo_dia' é o dia mais recente com leitura e 'atual' o tamanho da
+    sequência de dias consecutivos que termina nele. Dias depois de hoje
+    não contam (a API e a importação os recusam; aqui é só a defesa).
+    """
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="streak",
+    )
+    atual = models.PositiveIntegerField(default=0)
+    maior = models.PositiveIntegerField(default=0)
+    ultimo_dia = models.DateField(null=True, blank=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Streak de leitura"
+        verbose_name_plural = "Streaks de leitura"
+
+    def __str__(self):
+        return f"{self.usuario_id} | {self.atual} dias (maior: {self.maior})"
+
+    def vivo(self, hoje=None) -> int:
+        """Streak atual se a sequência termina hoje ou ontem; senão 0."""
+        if not self.ultimo_dia:
+            return 0
+        hoje = hoje or timezone.localdate()
+        return self.atual if self.ultimo_dia >= hoje - timedelta(days=1) else 0
+
+    @classmethod
+    def para(cls, usuario, travar: bool = False) -> "StreakLeitura":
+        """Retorna o streak do usuário, criando-o a partir do histórico se faltar."""
+        usuario_id = getattr(usuario, "pk", usuario)
+        qs = cls.objects.select_for_update() if travar else cls.objects
+        streak = qs.filter(usuario_id=usuario_id).first()
+        if streak is None:
+            streak, criado = cls.objects.get_or_create(usuario_id=usuario_id)
+            if criado:
+                streak.recalcular()
+            elif travar:
+                streak = cls.objects.select_for_update().get(pk=streak.pk)
+            streak._recem_criado = criado
+        return streak
+
+    def recalcular(self):
+        """Recalcula a partir de todos os dias lidos (O(histórico); uso raro)."""
+        dias = (
+            LeituraDiaria.objects
+            .filter(usuario_id=self.usuario_id, dia__lte=timezone.localdate())
+            .order_by("dia")
+            .values_list("dia", flat=True)
+            .distinct()
+        )
+        atual = maior = 0
+        anterior = None
+        for dia in dias.iterator():
+            atual = atual + 1 if anterior and dia == anterior + timedelta(days=1) else 1
+            maior = max(maior, atual)
+            anterior = dia
+
+        self.atual = atual
+        self.maior = maior
+        self.ultimo_dia = anterior
+        self.save()
+
+    @classmethod
+    def registrar_dia(cls, usuario_id, dia):
+        """
+        Chamado quando surge uma LeituraDiaria nova em 'dia'.
+        Leituras de hoje/ontem ou dentro da sequência atual custam O(1);
+        só um dia retroativo fora da sequência atual força recálculo.
+        """
+        if dia > timezone.localdate():
+            return
         with transaction.atomic():
-            usuario = self.usuario
-            livro = self.livro
-            super().delete(*args, **kwargs)
-            self.usuario = usuario
-            self.livro = livro
-            self.aplicar_no_progresso()
+            streak = cls.para(usuario_id, travar=True)
+            if getattr(streak, "_recem_criado", False):
+                return  # já calculado com o registro novo
+
+            ultimo = streak.ultimo_dia
+            if ultimo is None:
+                streak.atual = 1
+                streak.ultimo_dia = dia
+            elif dia == ultimo + timedelta(days=1):
+                streak.atual += 1
+                streak.ultimo_dia = dia
+            elif dia > ultimo:
+                streak.atual = 1
+                streak.ultimo_dia = dia
+            elif dia > ultimo - timedelta(days=streak.atual):
+                return  # dia já faz parte da sequência atual
+            else:
+                # retroativo: pode emendar sequências antigas (ou a atual)
+                ja_lido = (
+                    LeituraDiaria.objects
+                    .filter(usuario_id=usuario_id, dia=dia)
+                    .count() > 1
+                )
+                if not ja_lido:
+                    streak.recalcular()
+                return
+
+            streak.maior = max(streak.maior, streak.atual)
+            streak.save(update_fields=["atual", "maior", "ultimo_dia", "atualizado_em"])
+
+    @classmethod
+    def aplicar_dias(cls, usuario_id, adicionados=(), removidos=()):
+        """
+        Versão em lote: 'adicionados' são dias que passaram a ter leitura e
+        'removidos' dias que ficaram sem nenhuma. Dias novos após 'ultimo_dia'
+        avançam a sequência em O(1); o resto força um único recálculo.
+        """
+        hoje = timezone.localdate()
+        adicionados = [dia for dia in adicionados if dia <= hoje]
+        removidos = [dia for dia in removidos if dia <= hoje]
+        if not adicionados and not removidos:
+            return
+        with transaction.atomic():
+            streak = cls.para(usuario_id, travar=True)
+            if getattr(streak, "_recem_criado", False):
+                return
+            if removidos:
+                streak.recalcular()
+                return
+
+            for dia in sorted(adicionados):
+                ultimo = streak.ultimo_dia
+                if ultimo is not None and dia <= ultimo:
+                    streak.recalcular()
+                    return
+                if ultimo is not None and dia == ultimo + timedelta(days=1):
+                    streak.atual += 1
+                else:
+                    streak.atual = 1
+                streak.ultimo_dia = dia
+                streak.maior = max(streak.maior, streak.atual)
+            streak.save(update_fields=["atual", "maior", "ultimo_dia", "atualizado_em"])
+
+    @classmethod
+    def remover_dia(cls, usuario_id, dia):
+        """Chamado quando uma LeituraDiaria de 'dia' deixa de existir."""
+        if dia > timezone.localdate():
+            return
+        with transaction.atomic():
+            if LeituraDiaria.objects.filter(usuario_id=usuario_id, dia=dia).exists():
+                return  # ainda há leitura nesse dia
+            streak = cls.para(usuario_id, travar=True)
+            if not getattr(streak, "_recem_criado", False):
+                streak.recalcular()
+
+
+def _inicio_do_mes(d):
+    return d.replace(day=1)
+
+
+def _proximo_mes(d):
+    d = d.replace(day=1)
+    if d.month == 12:
+        return d.replace(year=d.year + 1, month=1)
+    return d.replace(month=d.month + 1)
+
+
+class _ResumoBase(models.Model):
+    """Campos e escrita comuns aos resumos (rollups) de páginas por usuário."""
+    paginas = models.IntegerField(default=0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    chave = None  # nome do campo de data que identifica a linha ('dia' ou 'mes')
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def _somar(cls, usuario_id, deltas: dict):
+        """Soma {data: delta} nas linhas do usuário, criando as que faltarem."""
+        deltas = {k: v for k, v in deltas.items() if v}
+        if not deltas:
+            return
+        agora = timezone.now()
+
+        if len(deltas) == 1:
+            # caminho quente (um save): UPDATE direto; cria só se a linha não existir
+            (chave, delta), = deltas.items()
+            filtro = {"usuario_id": usuario_id, cls.chave: chave}
+            if cls.objects.filter(**filtro).update(paginas=models.F("paginas") + delta, atualizado_em=agora):
+                return
+            cls.objects.bulk_create([cls(paginas=0, **filtro)], ignore_conflicts=True)
+            cls.objects.filter(**filtro).update(paginas=models.F("paginas") + delta, atualizado_em=agora)
+            return
+
+        # lote: garante as linhas, trava e atualiza tudo com número fixo de consultas
+        cls.objects.bulk_create(
+            [cls(usuario_id=usuario_id, paginas=0, **{cls.chave: k}) for k in deltas],
+            ignore_conflicts=True,
+        )
+        linhas = list(
+            cls.objects.select_for_update()
+            .filter(usuario_id=usuario_id, **{f"{cls.chave}__in": list(deltas)})
+        )
+        for linha in linhas:
+            linha.paginas += deltas[getattr(linha, cls.chave)]
+            linha.atualizado_em = agora
+        cls.objects.bulk_update(linhas, ["paginas", "atualizado_em"])
+
+
+class ResumoDiario(_ResumoBase):
+    """
+    Total de páginas lidas por usuário em cada dia (todos os livros somados).
+    Mantido por LeituraDiaria.save()/delete(); serve o diário dos gráficos.
+    """
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="resumos_diarios",
+    )
+    dia = models.DateField()
+
+    chave = "dia"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["usuario", "dia"], name="unique_resumo_diario_usuario_dia"),
+        ]
+        ordering = ["dia"]
+
+    def __str__(self):
+        return f"{self.usuario_id} | {self.dia}: {self.paginas} págs"
+
+    @classmethod
+    def aplicar_deltas(cls, usuario_id, deltas: dict):
+        """
+        Aplica {dia: delta} no resumo diário, no mensal e no total de páginas
+        do usuário (ContadoresUsuario), na mesma transação.
+        """
+        from contas.models import ContadoresUsuario
+
+        por_mes = defaultdict(int)
+        for dia, delta in deltas.items():
+            por_mes[_inicio_do_mes(dia)] += delta
+
+        with transaction.atomic():
+            cls._somar(usuario_id, deltas)
+            ResumoMensal._somar(usuario_id, por_mes)
+            ContadoresUsuario.somar(usuario_id, paginas_lidas=sum(deltas.values()))
+
+    @classmethod
+    def serie(cls, usuario, inicio, fim) -> dict:
+        """{'YYYY-MM-DD': páginas} de 'inicio' até 'fim' (exclusivo), com zeros."""
+        por_dia = dict(cls._valores_serie(usuario, inicio, fim))
+        return cls._serie_densa(por_dia, inicio, fim)
+
+    @classmethod
+    async def aserie(cls, usuario, inicio, fim) -> dict:
+        """serie() com o ORM async."""
+        por_dia = {dia: paginas async for dia, paginas in cls._valores_serie(usuario, inicio, fim)}
+        return cls._serie_densa(por_dia, inicio, fim)
+
+    @classmethod
+    def _valores_serie(cls, usuario, inicio, fim):
+        return (
+            cls.objects
+            .filter(usuario=usuario, dia__gte=inicio, dia__lt=fim)
+            .values_list("dia", "paginas")
+        )
+
+    @staticmethod
+    def _serie_densa(por_dia, inicio, fim) -> dict:
+        serie = {}
+        d = inicio
+        while d < fim:
+            serie[d.isoformat()] = por_dia.get(d, 0)
+            d += timedelta(days=1)
+        return serie
+
+    @classmethod
+    def reconstruir(cls, usuario_id, dias=None):
+        """
+        Refaz os resumos a partir das LeituraDiaria (todos os dias, ou só 'dias').
+        Usado pela reconciliação e por escritas em lote que pulam os hooks.
+        """
+        logs = LeituraDiaria.objects.filter(usuario_id=usuario_id)
+        diarios = cls.objects.filter(usuario_id=usuario_id)
+        if dias is not None:
+            dias = set(dias)
+            logs = logs.filter(dia__in=dias)
+            diarios = diarios.filter(dia__in=dias)
+
+        totais = (
+            logs.order_by()
+            .values("dia")
+            .annotate(total=Sum("paginas_lidas"))
+            .values_list("dia", "total")
+        )
+        with transaction.atomic():
+            diarios.delete()
+            cls.objects.bulk_create(
+                [cls(usuario_id=usuario_id, dia=dia, paginas=total) for dia, total in totais if total]
+            )
+
+            meses = None if dias is None else {_inicio_do_mes(d) for d in dias}
+            ResumoMensal.reconstruir(usuario_id, meses=meses)
+
+
+class ResumoMensal(_ResumoBase):
+    """Total de páginas lidas por usuário em cada mês ('mes' = 1º dia do mês)."""
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="resumos_mensais",
+    )
+    mes = models.DateField()
+
+    chave = "mes"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["usuario", "mes"], name="unique_resumo_mensal_usuario_mes"),
+        ]
+        ordering = ["mes"]
+
+    def __str__(self):
+        return f"{self.usuario_id} | {self.mes:%Y-%m}: {self.paginas} págs"
+
+    @classmethod
+    def total(cls, usuario, mes) -> int:
+        """Páginas lidas no mês de 'mes' (uma consulta indexada)."""
+        return (
+            cls.objects
+            .filter(usuario=usuario, mes=_inicio_do_mes(mes))
+            .values_list("paginas", flat=True)
+            .first()
+        ) or 0
+
+    @classmethod
+    async def atotal(cls, usuario, mes) -> int:
+        """total() com o ORM async."""
+        return (
+            await cls.objects
+            .filter(usuario=usuario, mes=_inicio_do_mes(mes))
+            .values_list("paginas", flat=True)
+            .afirst()
+        ) or 0
+
+    @classmethod
+    def serie(cls, usuario, de, ate) -> list:
+        """[(mes, páginas)] de 'de' até 'ate' (inclusivo), com zeros."""
+        de, ate = _inicio_do_mes(de), _inicio_do_mes(ate)
+        por_mes = dict(
+            cls.objects
+            .filter(usuario=usuario, mes__gte=de, mes__lte=ate)
+            .values_list("mes", "paginas")
+        )
+        serie = []
+        m = de
+        while m <= ate:
+            serie.append((m, por_mes.get(m, 0)))
+            m = _proximo_mes(m)
+        return serie
+
+    @classmethod
+    def reconstruir(cls, usuario_id, meses=None):
+        """Refaz os totais mensais a partir do ResumoDiario."""
+        from django.db.models.functions import TruncMonth
+
+        diarios = ResumoDiario.objects.filter(usuario_id=usuario_id)
+        mensais = cls.objects.filter(usuario_id=usuario_id)
+        if meses is not None:
+            filtro = Q()
+            for m in meses:
+                filtro |= Q(dia__gte=m, dia__lt=_proximo_mes(m))
+            diarios = diarios.filter(filtro) if meses else diarios.none()
+            mensais = mensais.filter(mes__in=list(meses))
+
+        totais = (
+            diarios.order_by()
+            .annotate(m=TruncMonth("dia"))
+            .values("m")
+            .annotate(total=Sum("paginas"))
+            .values_list("m", "total")
+        )
+        with transaction.atomic():
+            mensais.delete()
+            cls.objects.bulk_create(
+                [cls(usuario_id=usuario_id, mes=m, paginas=total) for m, total in totais if total]
+            )
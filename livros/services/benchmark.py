@@ -0,0 +1,199 @@
+# livros/services/benchmark.py
+"""
+Benchmark dos caminhos quentes (usado por `manage.py benchmark`).
+
+gerar_dados() cria usuários, livros, UserBooks e anos de LeituraDiaria com
+bulk_create (sem passar pelos save() incrementais) e depois reconstrói os
+derivados: progresso dos UserBooks, resumos diário/mensal e streaks.
+
+medir() roda um cenário N vezes e devolve latência (p50/p95/p99) e número
+de queries por execução.
+"""
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from contas.models import Usuario, UserBook
+from livros.models import Categoria, Livro, LeituraDiaria, ResumoDiario, StreakLeitura
+
+PALAVRAS = (
+    "amor guerra paz ação coração história tempo sol mar noite casa vida "
+    "morte céu rio pedra livro rei cidade sonho sertão memórias estrela"
+).split()
+
+
+def gerar_dados(
+    usuarios: int = 20,
+    livros: int = 2000,
+    livros_por_usuario: int = 30,
+    anos: int = 3,
+    chance_leitura: float = 0.7,
+    seed: int = 42,
+    lote: int = 5000,
+) -> dict:
+    """Gera a massa sintética e devolve as contagens criadas."""
+    rnd = random.Random(seed)
+    hoje = timezone.localdate()
+    inicio = hoje - timedelta(days=365 * anos)
+
+    categorias = Categoria.objects.bulk_create(
+        [Categoria(nome=f"Bench {i}") for i in range(10)], batch_size=lote
+    )
+    Livro.objects.bulk_create(
+        [
+            Livro(
+                titulo=" ".join(rnd.choices(PALAVRAS, k=3)).capitalize(),
+                autor=f"Autor {rnd.randint(1, max(1, livros // 4))}",
+                total_paginas=rnd.randint(80, 900),
+                categoria=rnd.choice(categorias),
+                isbn=f"978{i:010d}",
+            )
+            for i in range(livros)
+        ],
+        batch_size=lote,
+    )
+    ids_livros = list(Livro.objects.values_list("id", flat=True))
+    paginas_por_livro = dict(Livro.objects.values_list("id", "total_paginas"))
+
+    Usuario.objects.bulk_create(
+        [
+            Usuario(name=f"Leitor {i}", email=f"leitor{i}@bench.local", meta_anual_paginas=rnd.randint(3000, 12000))
+            for i in range(usuarios)
+        ],
+        batch_size=lote,
+    )
+    ids_usuarios = list(Usuario.objects.filter(email__endswith="@bench.local").values_list("id", flat=True))
+
+    userbooks, leituras = [], []
+    for usuario_id in ids_usuarios:
+        estante = rnd.sample(ids_livros, min(livros_por_usuario, len(ids_livros)))
+        userbooks.extend(UserBook(usuario_id=usuario_id, livro_id=livro_id) for livro_id in estante)
+
+        # lê um livro por vez, na ordem da estante, até terminá-lo
+        atual, lidas = 0, 0
+        dia = inicio
+        while dia <= hoje and atual < len(estante):
+            if rnd.random() < chance_leitura:
+                livro_id = estante[atual]
+                paginas = min(rnd.randint(5, 60), paginas_por_livro[livro_id] - lidas)
+                leituras.append(LeituraDiaria(usuario_id=usuario_id, livro_id=livro_id, dia=dia, paginas_lidas=paginas))
+                lidas += paginas
+                if lidas >= paginas_por_livro[livro_id]:
+                    atual, lidas = atual + 1, 0
+            dia += timedelta(days=1)
+
+    with transaction.atomic():
+        UserBook.objects.bulk_create(userbooks, batch_size=lote)
+        LeituraDiaria.objects.bulk_create(leituras, batch_size=lote)
+
+    # bulk_create não passa pelos save(): reconstrói os derivados de uma vez
+    UserBook.recomputar_de_logs_em_lote(batch_size=lote)
+    for usuario in Usuario.objects.filter(pk__in=ids_usuarios):
+        ResumoDiario.reconstruir(usuario.pk)
+        StreakLeitura.para(usuario)
+
+    return {
+        "usuarios": len(ids_usuarios),
+        "livros": len(ids_livros),
+        "userbooks": len(userbooks),
+        "leituras": len(leituras),
+    }
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil por interpolação linear (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    k = (len(valores) - 1) * p / 100
+    i = int(k)
+    j = min(i + 1, len(valores) - 1)
+    return valores[i] + (valores[j] - valores[i]) * (k - i)
+
+
+def medir(funcao, repeticoes: int = 50, aquecimento: int = 3) -> dict:
+    """Executa 'funcao' e devolve latências (ms) e queries por execução."""
+    for _ in range(aquecimento):
+        funcao()
+
+    tempos, queries = [], []
+    for _ in range(repeticoes):
+        with CaptureQueriesContext(connection) as ctx:
+            t0 = time.perf_counter()
+            funcao()
+            tempos.append((time.perf_counter() - t0) * 1000)
+        queries.append(len(ctx.captured_queries))
+
+    tempos.sort()
+    return {
+        "repeticoes": repeticoes,
+        "p50_ms": round(percentil(tempos, 50), 3),
+        "p95_ms": round(percentil(tempos, 95), 3),
+        "p99_ms": round(percentil(tempos, 99), 3),
+        "media_ms": round(statistics.fmean(tempos), 3),
+        "queries_min": min(queries),
+        "queries_max": max(queries),
+    }
+
+
+def _esperar_ok(resposta):
+    if resposta.status_code >= 400:
+        raise RuntimeError(f"{resposta.request['PATH_INFO']} -> {resposta.status_code}: {resposta.content[:200]!r}")
+    return resposta
+
+
+def cenarios(seed: int = 42) -> dict:
+    """
+    Cenários medidos, sobre o usuário com mais leituras da massa gerada.
+    Cada valor é uma função sem argumentos (uma requisição/chamada).
+    """
+    rnd = random.Random(seed)
+    usuario = (
+        Usuario.objects.annotate(n=Count("leituras"))
+        .order_by("-n")
+        .first()
+    )
+    livros_usuario = list(UserBook.objects.filter(usuario=usuario).values_list("livro_id", flat=True))
+    categoria_id = Categoria.objects.values_list("id", flat=True).first()
+
+    api = Client(HTTP_AUTHORIZATION=f"Key {usuario.access_key}")
+    web = Client()
+    web.force_login(usuario)
+
+    def adicionar_pagina():
+        _esperar_ok(api.post(
+            f"/api/user/livro/add_pagina/{rnd.choice(livros_usuario)}",
+            data={"delta_paginas": 1},
+            content_type="application/json",
+        ))
+
+    def progresso_mensal():
+        _esperar_ok(api.get("/api/user/leituras/progresso-mensal"))
+
+    def listar_livros():
+        termo = rnd.choice(PALAVRAS)
+        _esperar_ok(api.get("/api/livros/", {"q": termo, "min_paginas": 100, "limit": 20}))
+
+    def listar_livros_categoria():
+        _esperar_ok(api.get("/api/livros/", {"categoria_id": categoria_id, "ordering": "titulo", "limit": 20}))
+
+    def dashboard():
+        _esperar_ok(web.get("/"))
+
+    def streak_vivo():
+        LeituraDiaria.streak_vivo(usuario)
+
+    return {
+        "adicionar_pagina": adicionar_pagina,
+        "progresso_mensal": progresso_mensal,
+        "listar_livros_busca": listar_livros,
+        "listar_livros_categoria": listar_livros_categoria,
+        "dashboard": dashboard,
+        "streak_vivo": streak_vivo,
+    }
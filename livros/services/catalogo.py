@@ -0,0 +1,215 @@
+# livros/services/catalogo.py
+"""
+Upsert em lote do catálogo de livros (feed de editora, export de biblioteca).
+
+Cada registro traz os campos do Livro (os mesmos do LivroCreateSchema da
+API), validados aqui pelos próprios campos do modelo, e é identificado como
+no criar_livro:
+google_id, senão isbn, senão (titulo, autor, total_paginas). Por lote:
+
+1. valida os registros e descarta repetições da mesma chave (vale a última);
+2. resolve os livros existentes com um IN por tipo de chave (google_id,
+   isbn, titulo) e compara os campos: iguais são ignorados, diferentes são
+   atualizados com bulk_update pela pk;
+3. cria os novos com bulk_create(update_conflicts=True) sobre google_id ou
+   isbn: se outro processo inseriu a mesma chave entre a leitura e a
+   escrita, a linha vira UPDATE em vez de IntegrityError (e é contada como
+   atualizada: ela mantém o criado_em antigo). Livros sem google_id nem
+   isbn não têm chave única e entram com bulk_create simples.
+
+bulk_create/bulk_update pulam Livro.save(): 'atualizado_em' é preenchido
+aqui (as versões de ETag da API dependem dele) e o cache do catálogo é
+invalidado uma vez por lote gravado. A busca FTS se mantém pelos triggers.
+
+Arquivos (CSV com cabeçalho ou NDJSON) são lidos linha a linha pelo mesmo
+leitor da importação de leituras, então a memória fica limitada ao lote.
+"""
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from livros.cache import invalidar as invalidar_cache
+from livros.models import Categoria, Livro
+from livros.services.importacao import MAX_ERROS, ErroLinha, ler_linhas
+
+TAMANHO_LOTE = 1000
+CAMPOS = ("titulo", "autor", "total_paginas", "avaliacao", "categoria_id", "isbn", "capa_url", "google_id")
+
+
+@dataclass
+class RelatorioCatalogo:
+    linhas: int = 0
+    criados: int = 0
+    atualizados: int = 0
+    ignorados: int = 0          # iguais ao catálogo ou repetidos no mesmo lote
+    invalidas: int = 0
+    erros: list = field(default_factory=list)
+
+    def erro(self, numero: int, mensagem: str):
+        self.invalidas += 1
+        if len(self.erros) < MAX_ERROS:
+            self.erros.append({"linha": numero, "erro": mensagem})
+
+
+def _validar(registro: dict) -> dict:
+    """Dict com os CAMPOS do Livro; ValueError com a mensagem se inválido."""
+    # CSV traz strings vazias para colunas opcionais
+    limpo = {k: (v.strip() or None) if isinstance(v, str) else v for k, v in registro.items()}
+    if "categoria_id" not in limpo and "categoria" in limpo:
+        # a coluna do arquivo (e o dict() do schema) usa o nome do campo
+        limpo["categoria_id"] = limpo.pop("categoria")
+
+    dados = {}
+    for campo in CAMPOS:
+        modelo = Livro._meta.get_field(campo)
+        valor = limpo.get(campo)
+        if valor is None:
+            if modelo.has_default():
+                valor = modelo.get_default()
+            elif not modelo.null:
+                raise ValueError(f"'{campo}': campo obrigatório.")
+            dados[campo] = valor
+            continue
+        try:
+            # FK: só o tipo da pk aqui; a existência é conferida uma vez por lote
+            dados[campo] = (modelo.target_field if modelo.is_relation else modelo).clean(valor, None)
+        except ValidationError as exc:
+            raise ValueError(f"'{campo}': {exc.messages[0]}")
+    if dados["total_paginas"] < 1:
+        raise ValueError("'total_paginas': deve ser maior ou igual a 1.")
+    return dados
+
+
+def _chave(dados: dict) -> tuple:
+    if dados["google_id"]:
+        return ("google_id", dados["google_id"])
+    if dados["isbn"]:
+        return ("isbn", dados["isbn"])
+    return ("titulo", (dados["titulo"], dados["autor"], dados["total_paginas"]))
+
+
+def _existentes(lote: dict) -> tuple[dict, dict]:
+    """
+    ({chave: Livro}, {isbn: livro_id}) dos livros já cadastrados, com um IN
+    por tipo de chave. Os isbns de todas as linhas entram no IN de isbn:
+    um livro novo não pode reutilizar o isbn de outro.
+    """
+    por_tipo = {"google_id": set(), "isbn": set(), "titulo": set()}
+    for tipo, valor in lote:
+        por_tipo[tipo].add(valor)
+    por_tipo["isbn"] |= {dados["isbn"] for _, dados in lote.values() if dados["isbn"]}
+
+    encontrados, isbns = {}, {}
+    base = Livro.objects.only("id", *CAMPOS)
+    if por_tipo["google_id"]:
+        for livro in base.filter(google_id__in=por_tipo["google_id"]):
+            encontrados[("google_id", livro.google_id)] = livro
+    if por_tipo["isbn"]:
+        for livro in base.filter(isbn__in=por_tipo["isbn"]):
+            isbns[livro.isbn] = livro.pk
+            encontrados[("isbn", livro.isbn)] = livro
+    if por_tipo["titulo"]:
+        titulos = {titulo for titulo, _, _ in por_tipo["titulo"]}
+        for livro in base.filter(titulo__in=titulos).order_by("id"):
+            encontrados.setdefault(("titulo", (livro.titulo, livro.autor, livro.total_paginas)), livro)
+    return encontrados, isbns
+
+
+def _conflitos(livros: list) -> int:
+    """
+    Quantos dos livros do bulk_create(update_conflicts=True) já existiam.
+    O bulk_create preenche pk e criado_em das instâncias; a linha que virou
+    UPDATE devolve a pk do livro existente, que mantém o criado_em antigo.
+    """
+    gravados = dict(Livro.objects.filter(pk__in=[l.pk for l in livros]).values_list("pk", "criado_em"))
+    return sum(gravados[livro.pk] != livro.criado_em for livro in livros)
+
+
+def _gravar_lote(lote: dict, relatorio: RelatorioCatalogo):
+    """'lote' = {chave: (número da linha, dados)} já sem repetições."""
+    categorias = set(
+        Categoria.objects.filter(pk__in={d["categoria_id"] for _, d in lote.values()})
+        .values_list("pk", flat=True)
+    )
+    existentes, isbns = _existentes(lote)
+    agora = timezone.now()
+
+    novos = {"google_id": [], "isbn": [], "titulo": []}
+    alterados = {}
+    for chave, (numero, dados) in lote.items():
+        if dados["categoria_id"] not in categorias:
+            relatorio.erro(numero, f"Categoria {dados['categoria_id']} não existe.")
+            continue
+        livro = existentes.get(chave)
+        pk = livro.pk if livro is not None else None
+        if dados["isbn"] and isbns.setdefault(dados["isbn"], pk or chave) != (pk or chave):
+            relatorio.erro(numero, f"isbn {dados['isbn']} já pertence a outro livro.")
+            continue
+
+        if livro is None:
+            novos[chave[0]].append(Livro(**dados))
+        elif all(getattr(livro, campo) == valor for campo, valor in dados.items()):
+            relatorio.ignorados += 1
+        elif livro.pk in alterados:
+            relatorio.ignorados += 1  # mesmo livro por outra chave no lote: vale a primeira
+        else:
+            for campo, valor in dados.items():
+                setattr(livro, campo, valor)
+            livro.atualizado_em = agora
+            alterados[livro.pk] = livro
+
+    campos_upsert = [*CAMPOS, "atualizado_em"]
+    conflitos = 0
+    with transaction.atomic():
+        for unico in ("google_id", "isbn"):
+            if novos[unico]:
+                Livro.objects.bulk_create(
+                    novos[unico], update_conflicts=True, unique_fields=[unico],
+                    update_fields=[c for c in campos_upsert if c != unico],
+                )
+                conflitos += _conflitos(novos[unico])
+        Livro.objects.bulk_create(novos["titulo"])
+        Livro.objects.bulk_update(alterados.values(), campos_upsert)
+
+        relatorio.criados += sum(len(livros) for livros in novos.values()) - conflitos
+        relatorio.atualizados += len(alterados) + conflitos
+        if alterados or any(novos.values()):
+            # bulk_* não passa por Livro.save(): invalida o cache do catálogo aqui
+            invalidar_cache("livros")
+
+
+def upsert_livros(registros, tamanho_lote: int = TAMANHO_LOTE) -> RelatorioCatalogo:
+    """
+    Aplica os registros ((número da linha, dict | ErroLinha), como
+    ler_linhas) em lotes e devolve o relatório.
+    """
+    relatorio = RelatorioCatalogo()
+    lote = {}
+    for numero, registro in registros:
+        relatorio.linhas += 1
+        if isinstance(registro, ErroLinha):
+            relatorio.erro(numero, str(registro))
+            continue
+        try:
+            dados = _validar(registro)
+        except ValueError as exc:
+            relatorio.erro(numero, str(exc))
+            continue
+
+        chave = _chave(dados)
+        if chave in lote:
+            relatorio.ignorados += 1  # repetido no lote: vale a última ocorrência
+        lote[chave] = (numero, dados)
+        if len(lote) >= tamanho_lote:
+            _gravar_lote(lote, relatorio)
+            lote = {}
+    if lote:
+        _gravar_lote(lote, relatorio)
+    return relatorio
+
+
+def upsert_de_arquivo(arquivo, formato: str = "csv", tamanho_lote: int = TAMANHO_LOTE) -> RelatorioCatalogo:
+    """upsert_livros() lendo um CSV/NDJSON em streaming."""
+    return upsert_livros(ler_linhas(arquivo, formato), tamanho_lote=tamanho_lote)
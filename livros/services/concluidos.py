@@ -0,0 +1,97 @@
+# livros/services/concluidos.py
+"""
+Livros concluídos de um usuário, a partir de UserBook.concluido_em.
+
+- pagina(): página da lista completa, por keyset (-concluido_em, -id) com os
+  mesmos cursores da API (api/pagination.py). Uma consulta por página, sem
+  COUNT e sem OFFSET, qualquer que seja a profundidade.
+- recentes() / estatisticas(): a faixa do dashboard e os totais do topo da
+  lista, em cache (livros/cache.py) num namespace por usuário. A geração do
+  namespace avança, após o commit, quando um livro do usuário entra ou sai
+  de "concluído" ou muda de data de conclusão (invalidar()); a do catálogo ("livros") entra na chave, então edições de
+  título/capa também renovam o cache.
+"""
+from django.db.models import Avg, Count, Sum
+
+from api.pagination import campos_de_ordem, codificar_cursor, decodificar_cursor, filtro_keyset
+from contas.models import UserBook
+from livros import cache
+
+TAMANHO_PAGINA = 12
+QTD_RECENTES = 4
+
+
+def _namespace(usuario_id) -> str:
+    return f"concluidos:{usuario_id}"
+
+
+def invalidar(usuario_id):
+    """Chamado quando o conjunto de livros concluídos do usuário muda."""
+    cache.invalidar(_namespace(usuario_id))
+
+
+def do_usuario(usuario):
+    """UserBooks concluídos, do mais recente ao mais antigo, com livro e categoria."""
+    return (
+        UserBook.objects
+        .filter(usuario=usuario, concluido_em__isnull=False)
+        .select_related("livro__categoria")
+        .only(
+            "id", "usuario_id", "livro_id", "concluido_em",
+            "livro__id", "livro__titulo", "livro__autor", "livro__total_paginas",
+            "livro__avaliacao", "livro__capa_url", "livro__categoria__nome",
+        )
+        .order_by("-concluido_em", "-id")
+    )
+
+
+def pagina(usuario, cursor: str | None = None, tamanho: int = TAMANHO_PAGINA) -> dict:
+    """{'itens': [UserBook], 'proximo_cursor': str | None}. Cursor inválido: HttpError 400."""
+    qs = do_usuario(usuario)
+    ordem = campos_de_ordem(qs)
+    if cursor:
+        qs = qs.filter(filtro_keyset(ordem, decodificar_cursor(UserBook, ordem, cursor)))
+
+    # um item a mais só para saber se há próxima página
+    itens = list(qs[: tamanho + 1])
+    proximo = codificar_cursor(ordem, itens[tamanho - 1]) if len(itens) > tamanho else None
+    return {"itens": itens[:tamanho], "proximo_cursor": proximo}
+
+
+def _chave_catalogo() -> str:
+    return f"livros-{cache.geracao('livros')}"
+
+
+def recentes(usuario, n: int = QTD_RECENTES) -> list[dict]:
+    """Os 'n' últimos concluídos (dicts prontos para os cards), em cache."""
+    def construir():
+        return list(
+            do_usuario(usuario).values(
+                "concluido_em", "livro_id", "livro__titulo", "livro__autor",
+                "livro__avaliacao", "livro__capa_url",
+            )[:n]
+        )
+
+    return cache.obter(_namespace(usuario.pk), f"recentes:{n}:{_chave_catalogo()}", construir)
+
+
+def estatisticas(usuario) -> dict:
+    """{'livros', 'paginas', 'avaliacao_media'} dos concluídos (um agregado, em cache)."""
+    def construir():
+        totais = (
+            UserBook.objects
+            .filter(usuario=usuario, concluido_em__isnull=False)
+            .aggregate(
+                livros=Count("id"),
+                paginas=Sum("livro__total_paginas"),
+                avaliacao_media=Avg("livro__avaliacao"),
+            )
+        )
+        media = totais["avaliacao_media"]
+        return {
+            "livros": totais["livros"],
+            "paginas": totais["paginas"] or 0,
+            "avaliacao_media": round(media, 1) if media is not None else None,
+        }
+
+    return cache.obter(_namespace(usuario.pk), f"estatisticas:{_chave_catalogo()}", construir)
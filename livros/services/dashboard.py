@@ -0,0 +1,83 @@
+# livros/services/dashboard.py
+from functools import cached_property
+
+from django.utils import timezone
+
+from contas.models import ContadoresUsuario
+from livros.models import ResumoDiario, StreakLeitura
+from livros.services import concluidos
+
+
+class ResumoDashboard:
+    """
+    Números do dashboard de um usuário, calculados uma única vez por requisição.
+
+    Cada propriedade custa no máximo uma consulta e fica memorizada; os mesmos
+    valores alimentam os dash_cards, o progresso mensal e o gráfico.
+    """
+
+    def __init__(self, usuario, hoje=None):
+        self.usuario = usuario
+        self.hoje = hoje or timezone.localdate()
+        self.inicio_mes, self.fim_mes = usuario._month_bounds(self.hoje)
+
+    @classmethod
+    def da_requisicao(cls, request) -> "ResumoDashboard":
+        """Reaproveita o resumo já calculado nesta requisição (se houver)."""
+        resumo = getattr(request, "_resumo_dashboard", None)
+        if resumo is None or resumo.usuario.pk != request.user.pk:
+            resumo = cls(request.user)
+            request._resumo_dashboard = resumo
+        return resumo
+
+    @cached_property
+    def livros_em_andamento(self) -> list:
+        return list(
+            self.usuario.user_books
+            .filter(concluido_em__isnull=True)
+            .select_related("livro", "livro__categoria")
+            .only(
+                "pagina_atual", "iniciado_em", "usuario_id", "livro_id",
+                "livro__id", "livro__titulo", "livro__autor",
+                "livro__total_paginas", "livro__categoria", "livro__capa_url",
+            )
+        )
+
+    @cached_property
+    def contadores(self) -> ContadoresUsuario:
+        # livros ativos/concluídos e páginas mantidos por contas.models (sem COUNT/SUM)
+        return ContadoresUsuario.para(self.usuario)
+
+    @cached_property
+    def qtd_livros_ativos(self) -> int:
+        return self.contadores.livros_ativos
+
+    @cached_property
+    def concluidos_recentes(self) -> list:
+        # em cache por usuário; renovado quando um livro é concluído/reaberto
+        return concluidos.recentes(self.usuario)
+
+    @cached_property
+    def dias_consecutivos(self) -> int:
+        return StreakLeitura.para(self.usuario).vivo(self.hoje)
+
+    @cached_property
+    def diario(self) -> dict:
+        """{'YYYY-MM-DD': páginas} para todos os dias do mês (zeros incluídos)."""
+        return ResumoDiario.serie(self.usuario, self.inicio_mes, self.fim_mes)
+
+    @cached_property
+    def progresso_meta_mensal(self) -> dict:
+        # total do mês derivado do diário: sem um segundo SUM
+        return self.usuario.progresso_meta_mensal(
+            mes=self.inicio_mes, lidas=sum(self.diario.values())
+        )
+
+    def como_contexto(self) -> dict:
+        return {
+            "progresso_meta_mensal": self.progresso_meta_mensal,
+            "qtd_livros_ativos": self.qtd_livros_ativos,
+            "dias_consecutivos": self.dias_consecutivos,
+            "concluidos_recentes": self.concluidos_recentes,
+            "diario": self.diario,
+        }
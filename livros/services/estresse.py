@@ -0,0 +1,114 @@
+# livros/services/estresse.py
+"""
+Teste de concorrência do registro de páginas (usado por `manage.py estresse`).
+
+Várias threads chamam POST /api/user/livro/add_pagina/<livro> pelo caminho
+real (auth, select_for_update + atomic, hooks de LeituraDiaria) sobre poucos
+usuários e livros, de propósito: as transações disputam as mesmas linhas de
+UserBook, ResumoDiario e StreakLeitura. Mede vazão, latência, erros (ex.:
+"database is locked") e confere no fim se nenhuma página se perdeu (nem no
+log, nem no progresso, nem nos contadores somados com F()).
+"""
+import random
+import threading
+import time
+from collections import Counter
+
+import orjson
+from django.db import close_old_connections, connection
+from django.db.models import Sum
+from django.test import Client
+
+from contas.models import ContadoresUsuario, Usuario, UserBook
+from livros.models import Categoria, Livro, LeituraDiaria
+from livros.services.benchmark import percentil
+
+
+def preparar(usuarios: int = 4, livros_por_usuario: int = 3) -> list[tuple[str, int]]:
+    """Cria usuários com livros em andamento; devolve os alvos (chave, livro_id)."""
+    categoria, _ = Categoria.objects.get_or_create(nome="Estresse")
+    alvos = []
+    for i in range(usuarios):
+        usuario = Usuario.objects.create_user(f"estresse{i}@exemplo.com", "x", name=f"Estresse {i}")
+        for j in range(livros_por_usuario):
+            livro = Livro.objects.create(
+                titulo=f"Estresse {i}-{j}", autor="Autor", total_paginas=1_000_000, categoria=categoria
+            )
+            UserBook.objects.create(usuario=usuario, livro=livro)
+            alvos.append((usuario.access_key, livro.pk))
+    return alvos
+
+
+def _trabalhador(alvos, operacoes, seed, largada, latencias, status, erros):
+    rnd = random.Random(seed)
+    cliente = Client()
+    corpo = orjson.dumps({"delta_paginas": 1})
+    largada.wait()
+    try:
+        for _ in range(operacoes):
+            chave, livro_id = rnd.choice(alvos)
+            inicio = time.perf_counter()
+            try:
+                r = cliente.post(
+                    f"/api/user/livro/add_pagina/{livro_id}", data=corpo,
+                    content_type="application/json", HTTP_AUTHORIZATION=f"Key {chave}",
+                )
+                status[r.status_code] += 1
+            except Exception as exc:  # o test client repassa a exceção da view
+                erros[f"{type(exc).__name__}: {str(exc)[:80]}"] += 1
+                continue
+            finally:
+                latencias.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        close_old_connections()
+        connection.close()
+
+
+def _totais() -> tuple[int, int, int]:
+    """(páginas no log diário, no progresso dos UserBooks e nos contadores)."""
+    gravadas = LeituraDiaria.objects.aggregate(n=Sum("paginas_lidas"))["n"] or 0
+    progresso = UserBook.objects.aggregate(n=Sum("pagina_atual"))["n"] or 0
+    contadas = ContadoresUsuario.objects.aggregate(n=Sum("paginas_lidas"))["n"] or 0
+    return gravadas, progresso, contadas
+
+
+def executar(alvos, threads: int = 16, operacoes: int = 100, seed: int = 42) -> dict:
+    """Roda 'threads' x 'operacoes' registros de 1 página e devolve as métricas."""
+    latencias, status, erros = [], Counter(), Counter()
+    gravadas_antes, progresso_antes, contadas_antes = _totais()
+    largada = threading.Barrier(threads + 1)
+    workers = [
+        threading.Thread(
+            target=_trabalhador,
+            args=(alvos, operacoes, seed + i, largada, latencias, status, erros),
+        )
+        for i in range(threads)
+    ]
+    for w in workers:
+        w.start()
+    largada.wait()
+    inicio = time.perf_counter()
+    for w in workers:
+        w.join()
+    decorrido = time.perf_counter() - inicio
+
+    sucesso = sum(n for codigo, n in status.items() if 200 <= codigo < 300)
+    gravadas, progresso, contadas = _totais()
+    latencias.sort()
+    return {
+        "threads": threads,
+        "operacoes": threads * operacoes,
+        "duracao_s": round(decorrido, 2),
+        "ops_s": round(sucesso / decorrido, 1) if decorrido else 0.0,
+        "p50_ms": round(percentil(latencias, 50), 2),
+        "p95_ms": round(percentil(latencias, 95), 2),
+        "p99_ms": round(percentil(latencias, 99), 2),
+        "sucesso": sucesso,
+        "status": {str(k): v for k, v in sorted(status.items())},
+        "erros": dict(erros),
+        # cada sucesso soma 1 página: log, progresso e contadores precisam bater com ele
+        "consistente": (
+            gravadas - gravadas_antes == progresso - progresso_antes
+            == contadas - contadas_antes == sucesso
+        ),
+    }
@@ -0,0 +1,395 @@
+# livros/services/importacao.py
+"""
+Importação de histórico de leitura (CSV ou NDJSON) de outros apps.
+
+O arquivo é lido linha a linha e processado em lotes:
+
+1. valida as linhas do lote (dia, paginas_lidas e identificação do livro);
+2. resolve os livros do lote em poucas queries: livro_id, google_id, isbn e
+   (titulo, autor), nessa ordem; livros desconhecidos são criados com
+   bulk_create quando a linha traz total_paginas;
+3. grava as LeituraDiaria com bulk_create(ignore_conflicts=True): um dia que
+   já existe para (usuario, livro, dia) é mantido e a linha é ignorada.
+
+Como o bulk_create pula os hooks de LeituraDiaria.save(), os derivados são
+refeitos uma vez no final: UserBook dos livros afetados, resumos diário e
+mensal dos dias afetados, o streak e os contadores do usuário.
+
+Colunas (as mesmas da exportação): dia, paginas_lidas, livro_id, titulo,
+autor, total_paginas, isbn, google_id, categoria. Linhas repetidas para o
+mesmo livro e dia no arquivo são somadas num único registro.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import date
+
+import orjson
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from contas.models import ContadoresUsuario, UserBook
+from livros import eventos
+from livros.models import Categoria, Livro, LeituraDiaria, ResumoDiario, StreakLeitura
+
+TAMANHO_LOTE = 1000
+MAX_ERROS = 100             # erros detalhados no relatório (o total é sempre contado)
+MAX_DIAS_RECONSTRUCAO = 900  # acima disso reconstrói todos os resumos do usuário
+CATEGORIA_PADRAO = "Importados"
+ERRO_CODIFICACAO = "Linha com bytes inválidos: o arquivo deve estar em UTF-8."
+
+
+class ErroLinha(ValueError):
+    pass
+
+
+@dataclass
+class RelatorioImportacao:
+    linhas: int = 0
+    importadas: int = 0
+    ignoradas: int = 0          # já existiam (usuario, livro, dia)
+    invalidas: int = 0
+    livros_criados: int = 0
+    erros: list = field(default_factory=list)
+
+    def erro(self, numero: int, mensagem: str):
+        self.invalidas += 1
+        if len(self.erros) < MAX_ERROS:
+            self.erros.append({"linha": numero, "erro": mensagem})
+
+
+# ---------------------------------------------------------------------------
+# Leitura incremental
+# ---------------------------------------------------------------------------
+
+def _linhas(arquivo):
+    """
+    (número, linha) de um arquivo binário (upload) ou de texto, sem ler tudo
+    na memória. No binário cada linha é decodificada sozinha (UTF-8, BOM
+    opcional): bytes inválidos viram ErroLinha daquela linha em vez de
+    derrubar a importação inteira.
+    """
+    if isinstance(arquivo, io.TextIOBase):
+        numero = 0
+        try:
+            for numero, linha in enumerate(arquivo, start=1):
+                yield numero, linha
+        except UnicodeDecodeError:
+            # o decodificador do arquivo não se recupera: o resto não é lido
+            yield numero + 1, ErroLinha(ERRO_CODIFICACAO)
+        return
+
+    for numero, bruta in enumerate(arquivo, start=1):
+        try:
+            yield numero, bruta.decode("utf-8-sig" if numero == 1 else "utf-8")
+        except UnicodeDecodeError:
+            yield numero, ErroLinha(ERRO_CODIFICACAO)
+
+
+def ler_linhas(arquivo, formato: str):
+    """
+    Gera (número da linha, dict | ErroLinha) a partir de CSV (com cabeçalho)
+    ou NDJSON. Linhas ilegíveis (JSON inválido, bytes fora do UTF-8, CSV
+    malformado) saem como ErroLinha, para o relatório apontar a linha.
+    """
+    linhas = _linhas(arquivo)
+    if formato == "ndjson":
+        for numero, linha in linhas:
+            if isinstance(linha, ErroLinha):
+                yield numero, linha
+                continue
+            if not linha.strip():
+                continue
+            try:
+                dados = orjson.loads(linha)
+            except orjson.JSONDecodeError:
+                dados = None
+            yield numero, dados if isinstance(dados, dict) else ErroLinha("Linha não é um objeto JSON válido.")
+        return
+
+    ilegiveis = []
+    lidas = 0
+
+    def texto():
+        nonlocal lidas
+        for lidas, linha in linhas:
+            if isinstance(linha, ErroLinha):
+                ilegiveis.append((lidas, linha))
+                linha = "\n"  # linha em branco: o csv a pula e a contagem segue certa
+            yield linha
+
+    leitor = csv.DictReader(texto())
+    while True:
+        try:
+            registro = next(leitor)
+            numero = leitor.line_num
+        except StopIteration:
+            break
+        except csv.Error as exc:
+            # o line_num do csv não avança no erro: vale a última linha entregue
+            registro, numero = ErroLinha(f"CSV inválido: {exc}."), lidas
+        # as ilegíveis lidas até aqui vêm antes, na ordem do arquivo
+        yield from ilegiveis
+        ilegiveis.clear()
+        yield numero, registro
+    yield from ilegiveis
+
+
+def _limpo(valor):
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    return valor or None
+
+
+def _inteiro(valor, campo: str, minimo: int):
+    try:
+        numero = int(_limpo(valor))
+    except (TypeError, ValueError):
+        raise ErroLinha(f"'{campo}' inválido.")
+    if numero < minimo:
+        raise ErroLinha(f"'{campo}' deve ser maior ou igual a {minimo}.")
+    return numero
+
+
+def _validar(registro: dict, hoje: date) -> dict:
+    try:
+        dia = date.fromisoformat(_limpo(registro.get("dia")) or "")
+    except ValueError:
+        raise ErroLinha("'dia' inválido (use AAAA-MM-DD).")
+    if dia > hoje:
+        raise ErroLinha("'dia' no futuro.")
+
+    linha = {
+        "dia": dia,
+        "paginas_lidas": _inteiro(registro.get("paginas_lidas"), "paginas_lidas", 1),
+        "livro_id": _limpo(registro.get("livro_id")),
+        "google_id": _limpo(registro.get("google_id")),
+        "isbn": _limpo(registro.get("isbn")),
+        "titulo": (_limpo(registro.get("titulo")) or "")[:100],
+        "autor": (_limpo(registro.get("autor")) or "")[:100],
+        "categoria": _limpo(registro.get("categoria")),
+        "total_paginas": None,
+    }
+    if linha["livro_id"] is not None:
+        linha["livro_id"] = _inteiro(linha["livro_id"], "livro_id", 1)
+    if _limpo(registro.get("total_paginas")) is not None:
+        linha["total_paginas"] = _inteiro(registro.get("total_paginas"), "total_paginas", 1)
+    if not (linha["livro_id"] or linha["google_id"] or linha["isbn"] or (linha["titulo"] and linha["autor"])):
+        raise ErroLinha("Informe livro_id, google_id, isbn ou titulo + autor.")
+    return linha
+
+
+# ---------------------------------------------------------------------------
+# Resolução de livros em lote
+# ---------------------------------------------------------------------------
+
+class ResolvedorLivros:
+    """Mapeia as chaves do arquivo para Livro.id, com memória entre lotes."""
+
+    def __init__(self):
+        self.por_id = set()
+        self.por_google = {}
+        self.por_isbn = {}
+        self.por_titulo_autor = {}
+        self.categorias = {}
+
+    @staticmethod
+    def _chave_ta(titulo, autor):
+        return (titulo.casefold(), autor.casefold())
+
+    def _procurar(self, linha):
+        if linha["livro_id"] and linha["livro_id"] in self.por_id:
+            return linha["livro_id"]
+        if linha["google_id"] and linha["google_id"] in self.por_google:
+            return self.por_google[linha["google_id"]]
+        if linha["isbn"] and linha["isbn"] in self.por_isbn:
+            return self.por_isbn[linha["isbn"]]
+        if linha["titulo"] and linha["autor"]:
+            return self.por_titulo_autor.get(self._chave_ta(linha["titulo"], linha["autor"]))
+        return None
+
+    def _memorizar(self, livros):
+        for livro_id, google_id, isbn, titulo, autor in livros:
+            self.por_id.add(livro_id)
+            if google_id:
+                self.por_google[google_id] = livro_id
+            if isbn:
+                self.por_isbn[isbn] = livro_id
+            self.por_titulo_autor.setdefault(self._chave_ta(titulo, autor), livro_id)
+
+    def _carregar(self, pendentes):
+        ids = {l["livro_id"] for l in pendentes if l["livro_id"]}
+        google_ids = {l["google_id"] for l in pendentes if l["google_id"]}
+        isbns = {l["isbn"] for l in pendentes if l["isbn"]}
+        titulos = {l["titulo"] for l in pendentes if l["titulo"] and l["autor"]}
+        # a memória compara sem caixa; o LOWER do SQLite só cobre ASCII, então
+        # o IN exato continua valendo para os títulos acentuados
+        filtro = (
+            Q(pk__in=ids) | Q(google_id__in=google_ids) | Q(isbn__in=isbns)
+            | Q(titulo__in=titulos) | Q(titulo_minusculo__in={t.lower() for t in titulos})
+        )
+        self._memorizar(
+            Livro.objects.alias(titulo_minusculo=Lower("titulo")).filter(filtro)
+            .values_list("id", "google_id", "isbn", "titulo", "autor")
+        )
+
+    def _categoria(self, nome):
+        nome = (nome or CATEGORIA_PADRAO)[:100]
+        if nome not in self.categorias:
+            categoria = Categoria.objects.filter(nome__iexact=nome).first()
+            if categoria is None:
+                categoria, _ = Categoria.objects.get_or_create(nome=nome)
+            self.categorias[nome] = categoria.pk
+        return self.categorias[nome]
+
+    def resolver(self, linhas, relatorio: RelatorioImportacao):
+        """Preenche linha['livro'] (id) e devolve só as linhas resolvidas."""
+        pendentes = [l for l in linhas if self._procurar(l) is None]
+        if pendentes:
+            self._carregar(pendentes)
+
+        novos = {}
+        for linha in pendentes:
+            if self._procurar(linha) is not None or linha["livro_id"]:
+                continue
+            if not (linha["titulo"] and linha["autor"] and linha["total_paginas"]):
+                continue
+            chave = linha["google_id"] or linha["isbn"] or self._chave_ta(linha["titulo"], linha["autor"])
+            novos.setdefault(chave, Livro(
+                titulo=linha["titulo"],
+                autor=linha["autor"],
+                total_paginas=linha["total_paginas"],
+                isbn=linha["isbn"],
+                google_id=linha["google_id"],
+                categoria_id=self._categoria(linha["categoria"]),
+            ))
+        if novos:
+            conhecidos = set(self.por_id)
+            Livro.objects.bulk_create(novos.values(), ignore_conflicts=True)
+            chaves = [
+                {"livro_id": None, "google_id": l.google_id, "isbn": l.isbn, "titulo": l.titulo, "autor": l.autor}
+                for l in novos.values()
+            ]
+            self._carregar(chaves)
+            relatorio.livros_criados += len({self._procurar(c) for c in chaves} - conhecidos - {None})
+
+        resolvidas = []
+        for linha in linhas:
+            livro_id = self._procurar(linha)
+            if livro_id is None:
+                relatorio.erro(
+                    linha["numero"],
+                    "Livro não encontrado (livro novo exige titulo, autor e total_paginas).",
+                )
+                continue
+            linha["livro"] = livro_id
+            resolvidas.append(linha)
+        return resolvidas
+
+
+# ---------------------------------------------------------------------------
+# Importação
+# ---------------------------------------------------------------------------
+
+def _gravar_lote(usuario, linhas, relatorio, afetados):
+    # soma linhas repetidas do mesmo (livro, dia) dentro do lote
+    paginas = {}
+    for linha in linhas:
+        chave = (linha["livro"], linha["dia"])
+        paginas[chave] = paginas.get(chave, 0) + linha["paginas_lidas"]
+
+    existentes = set(
+        LeituraDiaria.objects.filter(
+            usuario=usuario,
+            livro_id__in={livro for livro, _ in paginas},
+            dia__in={dia for _, dia in paginas},
+        ).values_list("livro_id", "dia")
+    )
+    # dias criados por esta importação num lote anterior recebem a soma;
+    # os que já existiam antes dela ficam como estão
+    somar = {chave: n for chave, n in paginas.items() if chave in existentes and chave in afetados["chaves"]}
+    novos = {chave: n for chave, n in paginas.items() if chave not in existentes}
+
+    with transaction.atomic():
+        LeituraDiaria.objects.bulk_create(
+            [
+                LeituraDiaria(usuario=usuario, livro_id=livro_id, dia=dia, paginas_lidas=n)
+                for (livro_id, dia), n in novos.items()
+            ],
+            ignore_conflicts=True,
+        )
+        for (livro_id, dia), n in somar.items():
+            LeituraDiaria.objects.filter(usuario=usuario, livro_id=livro_id, dia=dia).update(
+                paginas_lidas=F("paginas_lidas") + n
+            )
+        UserBook.objects.bulk_create(
+            [UserBook(usuario=usuario, livro_id=livro_id) for livro_id, _ in novos],
+            ignore_conflicts=True,
+        )
+
+    gravadas = novos.keys() | somar.keys()
+    importadas = sum(1 for linha in linhas if (linha["livro"], linha["dia"]) in gravadas)
+    relatorio.importadas += importadas
+    relatorio.ignoradas += len(linhas) - importadas
+    afetados["chaves"].update(novos)
+    afetados["livros"].update(livro_id for livro_id, _ in gravadas)
+    afetados["dias"].update(dia for _, dia in gravadas)
+
+
+def _recalcular_derivados(usuario, afetados):
+    """Uma vez por importação: progresso dos livros afetados, resumos e streak."""
+    if not afetados["livros"]:
+        return
+    UserBook.recomputar_de_logs_em_lote(usuario=usuario, livros=afetados["livros"])
+
+    dias = afetados["dias"]
+    ResumoDiario.reconstruir(usuario.pk, dias=None if len(dias) > MAX_DIAS_RECONSTRUCAO else dias)
+
+    streak = StreakLeitura.para(usuario)
+    if not getattr(streak, "_recem_criado", False):
+        streak.recalcular()
+
+    # vínculos criados com bulk_create e páginas fora de aplicar_deltas
+    ContadoresUsuario.para(usuario).recalcular()
+
+    eventos.publicar(usuario.pk, "lote", livro_ids=sorted(afetados["livros"]))
+
+
+def formato_do_nome(nome: str) -> str:
+    return "ndjson" if (nome or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def importar_leituras(usuario, arquivo, formato: str = "csv", tamanho_lote: int = TAMANHO_LOTE) -> RelatorioImportacao:
+    """Importa o arquivo para 'usuario' e devolve o relatório."""
+    relatorio = RelatorioImportacao()
+    resolvedor = ResolvedorLivros()
+    afetados = {"chaves": set(), "livros": set(), "dias": set()}
+    hoje = timezone.localdate()
+
+    lote = []
+    try:
+        for numero, registro in ler_linhas(arquivo, formato):
+            relatorio.linhas += 1
+            if isinstance(registro, ErroLinha):
+                relatorio.erro(numero, str(registro))
+                continue
+            try:
+                linha = _validar(registro, hoje)
+            except ErroLinha as exc:
+                relatorio.erro(numero, str(exc))
+                continue
+            linha["numero"] = numero
+            lote.append(linha)
+
+            if len(lote) >= tamanho_lote:
+                _gravar_lote(usuario, resolvedor.resolver(lote, relatorio), relatorio, afetados)
+                lote = []
+        if lote:
+            _gravar_lote(usuario, resolvedor.resolver(lote, relatorio), relatorio, afetados)
+    finally:
+        # mesmo se o arquivo quebrar no meio, os lotes já gravados ficam consistentes
+        _recalcular_derivados(usuario, afetados)
+    return relatorio
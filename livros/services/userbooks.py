@@ -0,0 +1,54 @@
+# livros/services/userbooks.py
+from contas.models import UserBook
+
+
+class ResolvedorUserBook:
+    """
+    Mapa livro_id -> UserBook de um usuário, com escopo de requisição.
+
+    Views registram os UserBooks que já carregaram; templates e helpers de
+    Livro leem daqui. Livros ainda desconhecidos são buscados em lote com
+    carregar(), então listagens mantêm um número constante de consultas.
+    """
+
+    def __init__(self, usuario):
+        self.usuario = usuario
+        self._por_livro = {}
+
+    @classmethod
+    def da_requisicao(cls, request) -> "ResolvedorUserBook":
+        resolvedor = getattr(request, "_resolvedor_userbook", None)
+        if resolvedor is None or resolvedor.usuario.pk != request.user.pk:
+            resolvedor = cls(request.user)
+            request._resolvedor_userbook = resolvedor
+        return resolvedor
+
+    def registrar(self, user_books):
+        """Guarda UserBooks já carregados (ex.: com select_related('livro'))."""
+        for ub in user_books:
+            self._por_livro[ub.livro_id] = ub
+            if UserBook.livro.is_cached(ub):
+                ub.livro.lembrar_userbook(self.usuario, ub)
+        return self
+
+    def carregar(self, livros):
+        """Busca numa única consulta os UserBooks dos livros ainda não resolvidos."""
+        livros = {livro.pk: livro for livro in livros if livro.pk not in self._por_livro}
+        if not livros:
+            return self
+
+        encontrados = UserBook.objects.filter(usuario=self.usuario, livro_id__in=list(livros))
+        for ub in encontrados:
+            ub.livro = livros[ub.livro_id]  # reaproveita o objeto: sem consulta extra
+            self._por_livro[ub.livro_id] = ub
+
+        for livro_id, livro in livros.items():
+            self._por_livro.setdefault(livro_id, None)
+            livro.lembrar_userbook(self.usuario, self._por_livro[livro_id])
+        return self
+
+    def para(self, livro):
+        """UserBook do usuário para 'livro' (ou None)."""
+        if livro.pk not in self._por_livro:
+            self.carregar([livro])
+        return self._por_livro[livro.pk]
@@ -7,6 +7,7 @@ VARIANTS = {
         "class_icon": "fa-solid fa-book",
         "label": "Este mês",
         "descricao_qtd": "páginas lidas",
+        "ao_vivo": "mes",
     },
     "sequencia": {
         "bg_color": "cyan-100",
@@ -15,6 +16,7 @@ VARIANTS = {
         "label": "Sequência",
         "descricao_qtd": "dias consecutivos",
         "texto_positivo": "Mantendo o rítmo",
+        "ao_vivo": "sequencia",
     },
     "andamento": {
         "bg_color": "violet-100",
@@ -24,5 +24,7 @@ def dotfloat(value, digits=2):
 
 @register.simple_tag(takes_context=True)
 def userbook(context, livro):
-    user = context["request"].user
-    return livro.user_books.filter(usuario=user).first()
+    """UserBook do usuário logado via resolvedor da requisição (sem N+1)."""
+    from livros.services.userbooks import ResolvedorUserBook
+
+    return ResolvedorUserBook.da_requisicao(context["request"]).para(livro)
@@ -1,3 +1,636 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import skipUnless
 
-# Create your tests here.
+from django.db import connection
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase
+
+from contas.models import Usuario, UserBook
+from livros.models import Categoria, LeituraDiaria, Livro
+
+
+@skipUnless(connection.vendor == "sqlite", "verifica o EXPLAIN QUERY PLAN do SQLite")
+class PlanosDeConsultaTests(TestCase):
+    """
+    As consultas quentes precisam de planos só no índice: as somas de
+    LeituraDiaria saem de índices cobrindo (sem ir à tabela) e o dashboard
+    usa o índice parcial dos livros em andamento.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Planos")
+        cls.usuario = Usuario.objects.create_user("planos@exemplo.com", "x", name="Planos")
+        outro = Usuario.objects.create_user("outro@exemplo.com", "x", name="Outro")
+        livros = [
+            Livro.objects.create(titulo=f"Livro {i}", autor="Autor", total_paginas=300, categoria=categoria)
+            for i in range(4)
+        ]
+        cls.livro = livros[0]
+        inicio = date(2025, 1, 1)
+        for usuario in (cls.usuario, outro):
+            for livro in livros:
+                UserBook.objects.create(usuario=usuario, livro=livro)
+                for d in range(40):
+                    LeituraDiaria.objects.create(
+                        usuario=usuario, livro=livro, dia=inicio + timedelta(days=d), paginas_lidas=1
+                    )
+
+    def assertPlano(self, qs, esperado):
+        plano = qs.explain()
+        self.assertIn(esperado, plano, msg=f"plano inesperado:\n{plano}")
+        return plano
+
+    def test_soma_do_progresso_por_livro_usa_indice_cobrindo(self):
+        qs = (
+            LeituraDiaria.objects
+            .filter(usuario=self.usuario, livro=self.livro)
+            .values("usuario").annotate(total=Sum("paginas_lidas")).values("total")
+        )
+        self.assertPlano(qs, "USING COVERING INDEX leitura_usuario_livro_idx")
+
+    def test_soma_por_livro_em_lote_usa_indice_cobrindo(self):
+        qs = (
+            LeituraDiaria.objects.filter(usuario=self.usuario)
+            .order_by().values("livro_id").annotate(total=Sum("paginas_lidas"))
+        )
+        self.assertPlano(qs, "USING COVERING INDEX leitura_usuario_livro_idx")
+
+    def test_totais_por_periodo_usam_indice_cobrindo(self):
+        periodo = LeituraDiaria.objects.filter(
+            usuario=self.usuario, dia__gte=date(2025, 1, 1), dia__lt=date(2025, 2, 1)
+        ).order_by()
+        por_dia = periodo.values("dia").annotate(total=Sum("paginas_lidas"))
+        no_mes = periodo.values("usuario").annotate(total=Sum("paginas_lidas")).values("total")
+        for qs in (por_dia, no_mes):
+            self.assertPlano(qs, "USING COVERING INDEX leitura_usuario_dia_idx")
+
+    def test_dias_lidos_do_streak_usam_indice_cobrindo(self):
+        qs = (
+            LeituraDiaria.objects.filter(usuario=self.usuario)
+            .order_by("dia").values_list("dia", flat=True).distinct()
+        )
+        self.assertPlano(qs, "USING COVERING INDEX leitura_usuario_dia_idx")
+
+    def test_livros_em_andamento_usam_indice_parcial(self):
+        qs = UserBook.objects.filter(usuario=self.usuario, concluido_em__isnull=True)
+        self.assertPlano(qs, "USING INDEX userbook_ativos_idx")
+
+    def test_pagina_de_concluidos_usa_indice_parcial(self):
+        from livros.services import concluidos
+
+        qs = concluidos.do_usuario(self.usuario)[:13]
+        plano = self.assertPlano(qs, "USING INDEX userbook_concluidos_idx")
+        self.assertNotIn("TEMP B-TREE", plano)  # já sai na ordem do índice
+
+
+class LeituraMovidaTests(TestCase):
+    """Uma leitura que troca de livro/dia sai inteira do estado antigo e entra no novo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Movida")
+        cls.usuario = Usuario.objects.create_user("movida@exemplo.com", "x", name="Movida")
+        cls.livro_a = Livro.objects.create(titulo="A", autor="Autor", total_paginas=100, categoria=categoria)
+        cls.livro_b = Livro.objects.create(titulo="B", autor="Autor", total_paginas=100, categoria=categoria)
+
+    def test_mover_para_outro_livro_e_dia(self):
+        from contas.models import ContadoresUsuario
+        from livros.models import ResumoDiario, ResumoMensal, StreakLeitura
+
+        dia_antigo, dia_novo = date(2025, 10, 10), date(2025, 10, 12)
+        leitura = LeituraDiaria.objects.create(
+            usuario=self.usuario, livro=self.livro_a, dia=dia_antigo, paginas_lidas=10
+        )
+        leitura = LeituraDiaria.objects.get(pk=leitura.pk)
+        leitura.livro, leitura.dia = self.livro_b, dia_novo
+        leitura.save()
+
+        progresso = dict(UserBook.objects.filter(usuario=self.usuario).values_list("livro_id", "pagina_atual"))
+        self.assertEqual(progresso, {self.livro_a.pk: 0, self.livro_b.pk: 10})
+        self.assertEqual(
+            dict(ResumoDiario.objects.filter(usuario=self.usuario, paginas__gt=0).values_list("dia", "paginas")),
+            {dia_novo: 10},
+        )
+        self.assertEqual(ResumoMensal.total(self.usuario, dia_novo), 10)
+        self.assertEqual(ContadoresUsuario.para(self.usuario).paginas_lidas, 10)
+        self.assertEqual(ContadoresUsuario.verificar(self.usuario, corrigir=False), 0)
+
+        streak = StreakLeitura.para(self.usuario)
+        self.assertEqual((streak.ultimo_dia, streak.atual), (dia_novo, 1))
+
+    def test_mover_de_livro_no_mesmo_dia(self):
+        from livros.models import ResumoDiario
+
+        dia = date(2025, 10, 10)
+        leitura = LeituraDiaria.objects.create(usuario=self.usuario, livro=self.livro_a, dia=dia, paginas_lidas=10)
+        leitura = LeituraDiaria.objects.get(pk=leitura.pk)
+        leitura.livro, leitura.paginas_lidas = self.livro_b, 7
+        leitura.save()
+
+        progresso = dict(UserBook.objects.filter(usuario=self.usuario).values_list("livro_id", "pagina_atual"))
+        self.assertEqual(progresso, {self.livro_a.pk: 0, self.livro_b.pk: 7})
+        self.assertEqual(ResumoDiario.objects.get(usuario=self.usuario, dia=dia).paginas, 7)
+
+    def test_mover_publica_evento_do_estado_antigo(self):
+        from unittest import mock
+
+        leitura = LeituraDiaria.objects.create(
+            usuario=self.usuario, livro=self.livro_a, dia=date(2025, 10, 10), paginas_lidas=10
+        )
+        leitura = LeituraDiaria.objects.get(pk=leitura.pk)
+        leitura.livro, leitura.dia = self.livro_b, date(2025, 10, 12)
+        with mock.patch("livros.models.eventos.publicar") as publicar:
+            leitura.save()
+        livros = [chamada.kwargs["livro_id"] for chamada in publicar.call_args_list]
+        self.assertEqual(livros, [self.livro_a.pk, self.livro_b.pk])
+
+
+class ProgressoIncrementalTests(TestCase):
+    """
+    O progresso incremental (deltas em save()/delete()) tem que bater com o
+    recálculo a partir dos logs: pagina_atual = min(soma dos logs, total).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Deltas")
+        cls.usuario = Usuario.objects.create_user("deltas@exemplo.com", "x", name="Deltas")
+        cls.livro = Livro.objects.create(titulo="Curto", autor="Autor", total_paginas=100, categoria=categoria)
+        cls.outro = Livro.objects.create(titulo="Outro", autor="Autor", total_paginas=100, categoria=categoria)
+
+    def ler(self, dia, paginas, livro=None):
+        return LeituraDiaria.objects.create(
+            usuario=self.usuario, livro=livro or self.livro, dia=dia, paginas_lidas=paginas
+        )
+
+    def assertProgresso(self, esperado, livro=None):
+        livro = livro or self.livro
+        ub = UserBook.objects.get(usuario=self.usuario, livro=livro)
+        soma = LeituraDiaria.objects.filter(usuario=self.usuario, livro=livro).aggregate(
+            s=Sum("paginas_lidas"))["s"] or 0
+        self.assertEqual(ub.pagina_atual, esperado)
+        self.assertEqual(ub.pagina_atual, min(soma, livro.total_paginas))
+        self.assertEqual(ub.concluido_em is not None, esperado >= livro.total_paginas)
+
+    def test_criar_editar_e_apagar(self):
+        leitura = self.ler(date(2025, 3, 1), 30)
+        self.ler(date(2025, 3, 2), 20)
+        self.assertProgresso(50)
+
+        leitura = LeituraDiaria.objects.get(pk=leitura.pk)
+        leitura.paginas_lidas = 10
+        leitura.save()
+        self.assertProgresso(30)
+
+        leitura.delete()
+        self.assertProgresso(20)
+
+    def test_atualizacao_com_expressao_f(self):
+        from django.db.models import F
+
+        leitura = self.ler(date(2025, 3, 1), 30)
+        leitura.paginas_lidas = F("paginas_lidas") + 15
+        leitura.save()
+        self.assertEqual(leitura.paginas_lidas, 45)
+        self.assertProgresso(45)
+
+    def test_mover_para_outro_livro(self):
+        leitura = LeituraDiaria.objects.get(pk=self.ler(date(2025, 3, 1), 30).pk)
+        leitura.livro = self.outro
+        leitura.save()
+        self.assertProgresso(0)
+        self.assertProgresso(30, livro=self.outro)
+
+    def test_edicao_negativa_depois_de_passar_do_total(self):
+        self.ler(date(2025, 3, 1), 80)
+        excedente = self.ler(date(2025, 3, 2), 60)   # logs somam 140 > 100
+        self.assertProgresso(100)
+
+        excedente = LeituraDiaria.objects.get(pk=excedente.pk)
+        excedente.paginas_lidas = 30                 # 110: continua concluído
+        excedente.save()
+        self.assertProgresso(100)
+
+        excedente.paginas_lidas = 10                 # 90
+        excedente.save()
+        self.assertProgresso(90)
+
+    def test_apagar_depois_de_passar_do_total(self):
+        primeira = self.ler(date(2025, 3, 1), 70)
+        self.ler(date(2025, 3, 2), 70)
+        self.assertProgresso(100)
+
+        primeira.delete()
+        self.assertProgresso(70)
+
+
+class StreakIncrementalTests(TestCase):
+    """StreakLeitura mantido pelos hooks tem que bater com recalcular()."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Streak")
+        cls.usuario = Usuario.objects.create_user("streak@exemplo.com", "x", name="Streak")
+        cls.livro = Livro.objects.create(titulo="Longo", autor="Autor", total_paginas=1000, categoria=categoria)
+
+    def ler(self, dia):
+        return LeituraDiaria.objects.create(usuario=self.usuario, livro=self.livro, dia=dia, paginas_lidas=1)
+
+    def assertStreak(self, atual, maior, ultimo_dia):
+        from livros.models import StreakLeitura
+
+        streak = StreakLeitura.para(self.usuario)
+        self.assertEqual((streak.atual, streak.maior, streak.ultimo_dia), (atual, maior, ultimo_dia))
+        streak.recalcular()
+        self.assertEqual((streak.atual, streak.maior, streak.ultimo_dia), (atual, maior, ultimo_dia))
+
+    def test_dias_seguidos_lacuna_e_retroativo(self):
+        inicio = date(2025, 5, 1)
+        for d in (0, 1, 2):
+            self.ler(inicio + timedelta(days=d))
+        self.assertStreak(3, 3, date(2025, 5, 3))
+
+        self.ler(date(2025, 5, 5))                     # lacuna no dia 4
+        self.assertStreak(1, 3, date(2025, 5, 5))
+
+        self.ler(date(2025, 5, 4))                     # retroativo emenda as duas
+        self.assertStreak(5, 5, date(2025, 5, 5))
+
+    def test_apagar_dia_do_meio(self):
+        leituras = [self.ler(date(2025, 5, 1) + timedelta(days=d)) for d in range(5)]
+        leituras[2].delete()
+        self.assertStreak(2, 2, date(2025, 5, 5))
+
+    def test_dia_com_duas_leituras_so_sai_quando_as_duas_saem(self):
+        from livros.models import StreakLeitura
+
+        categoria = self.livro.categoria
+        outro = Livro.objects.create(titulo="Outro", autor="Autor", total_paginas=10, categoria=categoria)
+        dia = date(2025, 5, 1)
+        primeira = self.ler(dia)
+        segunda = LeituraDiaria.objects.create(usuario=self.usuario, livro=outro, dia=dia, paginas_lidas=1)
+
+        primeira.delete()
+        self.assertEqual(StreakLeitura.para(self.usuario).ultimo_dia, dia)
+        segunda.delete()
+        self.assertStreak(0, 0, None)
+
+    def test_dias_futuros_nao_entram_no_streak(self):
+        from django.utils import timezone
+
+        from livros.models import StreakLeitura
+
+        hoje = timezone.localdate()
+        self.ler(hoje)
+        for d in (1, 2):
+            self.ler(hoje + timedelta(days=d))
+        self.assertStreak(1, 1, hoje)
+        self.assertEqual(StreakLeitura.para(self.usuario).vivo(), 1)
+
+        StreakLeitura.aplicar_dias(self.usuario.pk, adicionados=[hoje + timedelta(days=3)])
+        self.assertStreak(1, 1, hoje)
+
+    def test_api_recusa_data_futura(self):
+        from django.utils import timezone
+
+        self.client.force_login(self.usuario)
+        amanha = timezone.localdate() + timedelta(days=1)
+        resposta = self.client.post(
+            f"/api/user/livro/add_pagina/{self.livro.pk}",
+            {"delta_paginas": 5, "data_de_leitura": amanha.isoformat()},
+            content_type="application/json",
+        )
+        self.assertEqual(resposta.status_code, 422)
+        self.assertFalse(LeituraDiaria.objects.exists())
+
+
+class CacheCatalogoTests(TestCase):
+    """livros/cache.py: save()/delete() de Categoria e Livro trocam a geração do catálogo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = Categoria.objects.create(nome="Romance")
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def opcoes(self):
+        from livros.forms import LivroForm
+
+        return [nome for pk, nome in LivroForm().fields["categoria"].choices if pk != ""]
+
+    def test_opcoes_de_categoria_em_cache_e_renovadas(self):
+        self.assertEqual(self.opcoes(), ["Romance"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.opcoes(), ["Romance"])
+
+        Categoria.objects.create(nome="Poesia")
+        self.assertEqual(self.opcoes(), ["Poesia", "Romance"])
+
+        self.categoria.nome = "Drama"
+        self.categoria.save()
+        self.assertEqual(self.opcoes(), ["Drama", "Poesia"])
+
+        Categoria.objects.get(nome="Poesia").delete()
+        self.assertEqual(self.opcoes(), ["Drama"])
+
+    def test_listagem_reflete_livro_e_categoria_editados(self):
+        livro = Livro.objects.create(titulo="Antes", autor="Autor", total_paginas=10, categoria=self.categoria)
+        url = f"/api/livro/{livro.pk}"
+        self.assertEqual(self.client.get(url).json()["titulo"], "Antes")
+        self.assertEqual([c["nome"] for c in self.client.get("/api/categorias/").json()], ["Romance"])
+
+        livro.titulo = "Depois"
+        livro.save()
+        self.categoria.nome = "Drama"
+        self.categoria.save()
+
+        detalhe = self.client.get(url).json()
+        self.assertEqual((detalhe["titulo"], detalhe["categoria"]["nome"]), ("Depois", "Drama"))
+        self.assertEqual([c["nome"] for c in self.client.get("/api/categorias/").json()], ["Drama"])
+
+
+class ConcluidosCacheTests(TestCase):
+    """Cache da faixa de concluídos: renova após o commit, inclusive quando só a data muda."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Concluídos")
+        cls.usuario = Usuario.objects.create_user("concluidos@exemplo.com", "x", name="Concluídos")
+        cls.livro = Livro.objects.create(titulo="Fim", autor="Autor", total_paginas=10, categoria=categoria)
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_nova_data_de_conclusao_renova_a_faixa(self):
+        from django.utils import timezone
+
+        from livros.services import concluidos
+
+        ub = UserBook.objects.create(usuario=self.usuario, livro=self.livro, concluido_em=timezone.now() - timedelta(days=3))
+        self.assertEqual(concluidos.recentes(self.usuario)[0]["concluido_em"], ub.concluido_em)
+
+        ub = UserBook.objects.get(pk=ub.pk)
+        ub.concluido_em = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            ub.save(update_fields=["concluido_em"])
+        self.assertEqual(concluidos.recentes(self.usuario)[0]["concluido_em"], ub.concluido_em)
+
+    def test_invalida_so_depois_do_commit(self):
+        from django.utils import timezone
+
+        from livros import cache as cache_catalogo
+        from livros.services import concluidos
+
+        ub = UserBook.objects.create(usuario=self.usuario, livro=self.livro)
+        namespace = concluidos._namespace(self.usuario.pk)
+        antes = cache_catalogo.geracao(namespace)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ub.concluido_em = timezone.now()
+            ub.save()
+            self.assertEqual(cache_catalogo.geracao(namespace), antes)
+        self.assertNotEqual(cache_catalogo.geracao(namespace), antes)
+
+
+class LeituraDeArquivoTests(TestCase):
+    """ler_linhas(): linhas ilegíveis viram erro da própria linha, não exceção."""
+
+    def ler(self, conteudo: bytes, formato: str):
+        import io
+
+        from livros.services.importacao import ErroLinha, ler_linhas
+
+        return [
+            (numero, str(registro) if isinstance(registro, ErroLinha) else registro["dia"])
+            for numero, registro in ler_linhas(io.BytesIO(conteudo), formato)
+        ]
+
+    def test_csv_com_bytes_fora_do_utf8(self):
+        conteudo = "dia,paginas_lidas,titulo\n2025-01-01,5,Ok\n2025-01-02,5,Cora\xe7\xe3o\n2025-01-03,5,Ok\n"
+        linhas = self.ler(b"\xef\xbb\xbf" + conteudo.encode("latin-1"), "csv")
+        self.assertEqual([n for n, _ in linhas], [2, 3, 4])
+        self.assertEqual(linhas[0][1], "2025-01-01")
+        self.assertIn("UTF-8", linhas[1][1])
+        self.assertEqual(linhas[2][1], "2025-01-03")
+
+    def test_csv_malformado(self):
+        conteudo = "dia,paginas_lidas\n" + "x" * 200_000 + ",1\n2025-01-03,5\n"
+        linhas = self.ler(conteudo.encode(), "csv")
+        self.assertEqual([n for n, _ in linhas], [2, 3])
+        self.assertIn("CSV inválido", linhas[0][1])
+
+    def test_ndjson_com_bytes_fora_do_utf8_e_json_invalido(self):
+        conteudo = b'{"dia": "2025-01-01"}\n{"dia": "\xe7"}\n[1]\n{"dia": "2025-01-04"}\n'
+        linhas = self.ler(conteudo, "ndjson")
+        self.assertEqual([n for n, _ in linhas], [1, 2, 3, 4])
+        self.assertIn("UTF-8", linhas[1][1])
+        self.assertIn("JSON", linhas[2][1])
+
+    def test_importacao_latin1_pela_api_nao_quebra(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        usuario = Usuario.objects.create_user("import@exemplo.com", "x", name="Import")
+        Livro.objects.create(titulo="Ok", autor="A", total_paginas=50, categoria=Categoria.objects.create(nome="I"))
+        self.client.force_login(usuario)
+        conteudo = "dia,paginas_lidas,titulo,autor\n2025-01-01,5,Ok,A\n2025-01-02,5,S\xe3o,A\n".encode("latin-1")
+        resposta = self.client.post(
+            "/api/user/leituras/import", {"arquivo": SimpleUploadedFile("l.csv", conteudo)}
+        )
+        self.assertEqual(resposta.status_code, 200, resposta.content)
+        dados = resposta.json()
+        self.assertEqual((dados["importadas"], dados["invalidas"]), (1, 1))
+        self.assertEqual(dados["erros"][0]["linha"], 3)
+
+    def test_titulo_com_outra_caixa_usa_o_livro_existente(self):
+        import io
+
+        from livros.services.importacao import importar_leituras
+
+        usuario = Usuario.objects.create_user("caixa@exemplo.com", "x", name="Caixa")
+        livro = Livro.objects.create(
+            titulo="Dom Casmurro", autor="Machado de Assis", total_paginas=256, categoria=Categoria.objects.create(nome="C")
+        )
+        conteudo = b"dia,paginas_lidas,titulo,autor,total_paginas\n2025-01-01,5,dom casmurro,MACHADO DE ASSIS,256\n"
+        relatorio = importar_leituras(usuario, io.BytesIO(conteudo), "csv")
+
+        self.assertEqual(relatorio.importadas, 1)
+        self.assertEqual(Livro.objects.count(), 1)
+        self.assertTrue(LeituraDiaria.objects.filter(usuario=usuario, livro=livro).exists())
+
+
+class BuscaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nome="Busca")
+        cls.titulo = Livro.objects.create(titulo="Coração das Trevas", autor="Conrad", total_paginas=1, categoria=categoria)
+        cls.autor = Livro.objects.create(titulo="Outro", autor="Coração Alegre", total_paginas=1, categoria=categoria)
+        Livro.objects.create(titulo="Nada a ver", autor="Ninguém", total_paginas=1, categoria=categoria)
+
+    def test_prefixo_sem_acentos_e_titulo_primeiro(self):
+        from livros import busca
+
+        qs = busca.filtrar(Livro.objects.all(), "corac")
+        if "relevancia" in qs.query.annotations:
+            qs = qs.order_by("relevancia", "id")
+        self.assertEqual(list(qs), [self.titulo, self.autor])
+
+    def test_combina_com_outros_filtros(self):
+        from livros import busca
+
+        qs = busca.filtrar(Livro.objects.filter(autor="Conrad"), "coração")
+        self.assertEqual(list(qs), [self.titulo])
+
+
+
+class CatalogoUpsertTests(TestCase):
+    """upsert_livros: o relatório conta cada linha pelo que de fato aconteceu no banco."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = Categoria.objects.create(nome="Catálogo")
+
+    def registro(self, **campos):
+        return {"titulo": "Livro", "autor": "Autor", "total_paginas": 100, "categoria": self.categoria.pk, **campos}
+
+    def upsert(self, *registros):
+        from livros.services.catalogo import upsert_livros
+
+        return upsert_livros(enumerate(registros, start=2))
+
+    def contagens(self, relatorio):
+        return relatorio.criados, relatorio.atualizados, relatorio.ignorados, relatorio.invalidas
+
+    def test_cria_por_cada_tipo_de_chave(self):
+        relatorio = self.upsert(
+            self.registro(google_id="g1"),
+            self.registro(isbn="978-1"),
+            self.registro(titulo="Sem chave única"),
+        )
+        self.assertEqual(self.contagens(relatorio), (3, 0, 0, 0))
+        self.assertEqual(Livro.objects.count(), 3)
+
+    def test_atualiza_so_o_que_mudou(self):
+        livro = Livro.objects.create(titulo="Antigo", autor="Autor", total_paginas=100, categoria=self.categoria, google_id="g1")
+        igual = Livro.objects.create(titulo="Igual", autor="Autor", total_paginas=100, categoria=self.categoria, isbn="978-1")
+        versao_igual = igual.atualizado_em
+
+        relatorio = self.upsert(self.registro(google_id="g1", titulo="Novo"), self.registro(titulo="Igual", isbn="978-1"))
+        self.assertEqual(self.contagens(relatorio), (0, 1, 1, 0))
+        livro.refresh_from_db()
+        igual.refresh_from_db()
+        self.assertEqual(livro.titulo, "Novo")
+        self.assertEqual(igual.atualizado_em, versao_igual)
+
+    def test_repetido_no_lote_vale_a_ultima_linha(self):
+        relatorio = self.upsert(self.registro(google_id="g1", titulo="Primeira"), self.registro(google_id="g1", titulo="Última"))
+        self.assertEqual(self.contagens(relatorio), (1, 0, 1, 0))
+        self.assertEqual(list(Livro.objects.values_list("titulo", flat=True)), ["Última"])
+
+    def test_isbn_de_outro_livro_e_erro(self):
+        Livro.objects.create(titulo="Dono", autor="Autor", total_paginas=100, categoria=self.categoria, isbn="978-1")
+        relatorio = self.upsert(
+            self.registro(google_id="g1", isbn="978-1"),   # isbn já cadastrado
+            self.registro(google_id="g2", isbn="978-2"),
+            self.registro(google_id="g3", isbn="978-2"),   # isbn de outra linha do lote
+        )
+        self.assertEqual(self.contagens(relatorio), (1, 0, 0, 2))
+        self.assertEqual([e["linha"] for e in relatorio.erros], [2, 4])
+        self.assertEqual(Livro.objects.get(isbn="978-2").google_id, "g2")
+
+    def test_linhas_invalidas_viram_erro_da_linha(self):
+        relatorio = self.upsert(
+            self.registro(titulo=" "),
+            self.registro(total_paginas="abc"),
+            self.registro(total_paginas=0),
+            self.registro(avaliacao=7),
+            self.registro(capa_url="não é url"),
+            self.registro(categoria=999999),
+            # como vem do CSV: tudo texto
+            self.registro(google_id="g1", total_paginas="120", avaliacao="4", categoria=str(self.categoria.pk)),
+        )
+        self.assertEqual(self.contagens(relatorio), (1, 0, 0, 6))
+        self.assertEqual(
+            [e["erro"].split(":")[0] for e in relatorio.erros],
+            ["'titulo'", "'total_paginas'", "'total_paginas'", "'avaliacao'", "'capa_url'", "Categoria 999999 não existe."],
+        )
+        livro = Livro.objects.get(google_id="g1")
+        self.assertEqual((livro.total_paginas, livro.avaliacao), (120, 4))
+
+    def test_insercao_concorrente_conta_como_atualizacao(self):
+        from unittest import mock
+
+        from livros.services import catalogo
+
+        livro = Livro.objects.create(titulo="Antigo", autor="Autor", total_paginas=100, categoria=self.categoria, google_id="g1")
+        # outro processo inseriu g1 depois da leitura dos existentes
+        with mock.patch.object(catalogo, "_existentes", return_value=({}, {})):
+            relatorio = self.upsert(self.registro(google_id="g1", titulo="Novo"), self.registro(google_id="g2"))
+
+        self.assertEqual(self.contagens(relatorio), (1, 1, 0, 0))
+        self.assertEqual(Livro.objects.count(), 2)
+        livro.refresh_from_db()
+        self.assertEqual(livro.titulo, "Novo")
+
+
+class CargaClienteTests(SimpleTestCase):
+    """Cliente HTTP do teste de carga contra um servidor local de respostas fixas."""
+
+    RESPOSTAS = {
+        "/chunked": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                    b"4\r\nabcd\r\n3;ext=1\r\nefg\r\n0\r\nX-Trailer: 1\r\n\r\n",
+        "/vazio": b"HTTP/1.1 304 Not Modified\r\nContent-Length: 10\r\n\r\n",
+        "/tamanho": b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok",
+        "/ate-fechar": b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\ncorpo",
+    }
+
+    def setUp(self):
+        import socketserver
+        import threading
+        import time
+
+        respostas = self.RESPOSTAS
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while linha := self.rfile.readline():
+                    caminho = linha.split()[1].decode()
+                    while self.rfile.readline() not in (b"\r\n", b""):
+                        pass
+                    if caminho == "/trava":
+                        self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\nmeio")
+                        time.sleep(0.5)
+                        return
+                    self.wfile.write(respostas[caminho])
+                    if caminho == "/ate-fechar":
+                        return
+
+        class Servidor(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+
+        self.servidor = Servidor(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+        self.base = f"http://127.0.0.1:{self.servidor.server_address[1]}"
+
+    def test_formatos_de_corpo(self):
+        from core import carga
+
+        urls = [self.base + caminho for caminho in self.RESPOSTAS]
+        resultado = carga.executar(urls, concorrencia=2, duracao=0.3, timeout=1)
+        self.assertEqual(resultado["erros"], {})
+        self.assertEqual(set(resultado["status"]), {"200", "304"})
+        self.assertGreater(resultado["requisicoes"], len(urls))
+
+    def test_leitura_parcial_expira_e_conta_como_erro(self):
+        from core import carga
+
+        resultado = carga.executar([self.base + "/trava"], concorrencia=1, duracao=0.2, timeout=0.1)
+        self.assertEqual(resultado["requisicoes"], 0)
+        self.assertIn("TimeoutError", resultado["erros"])
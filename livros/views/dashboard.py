@@ -3,16 +3,17 @@ from django.http import HttpResponseRedirect
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
 from django.db import transaction, IntegrityError
-from django.db.models.functions import Coalesce
-from django.db.models import Sum
 from django.utils import timezone
 from django.contrib import messages
 import logging
 
+from livros import eventos
 from livros.forms import LivroForm
-from livros.models import Livro, LeituraDiaria
+from livros.models import Livro
+from livros.services.dashboard import ResumoDashboard
+from livros.services.userbooks import ResolvedorUserBook
 from contas.models import UserBook  # e opcionalmente UserBookMonthlyGoal se for usar metas
-from datetime import timedelta, date as date_cls
+from datetime import date as date_cls
 from calendar import monthrange
 
 
@@ -85,52 +86,19 @@ class DashboardView(LoginRequiredMixin, CreateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        user_books = (
-            self.request.user.user_books
-            .filter(concluido_em__isnull=True)
-            .select_related("livro", "livro__categoria")
-            .only(
-                "pagina_atual",
-                "livro__id", "livro__titulo", "livro__autor",
-                "livro__total_paginas", "livro__categoria", "livro__capa_url",
-            )
-        )
-        context["livros_em_andamento"] = user_books
-
-        user = self.request.user
-        hoje = timezone.localdate()
-        inicio_mes = hoje.replace(day=1)
-        fim_mes = self.fim_do_mes(hoje)
-
-        livros_ativos = user.user_books.filter(concluido_em__isnull=True).count()
-        dias_consecutivos = LeituraDiaria.streak_vivo(user) or 0
-        # pct_meta_mensal =
-
-        # diário agregado no banco
-        agg = (
-            LeituraDiaria.objects
-            .filter(usuario=user, dia__gte=inicio_mes, dia__lt=fim_mes)
-            .values("dia")
-            .annotate(total=Coalesce(Sum("paginas_lidas"), 0))
-        )
-        diario = {row["dia"].isoformat(): int(row["total"]) for row in agg}
-
-
-        # preenche zeros para todos os dias do mês
-        d = inicio_mes
-        while d < fim_mes:
-            diario.setdefault(d.isoformat(), 0)
-            d += timedelta(days=1)
+        # todos os números saem de um único resumo (poucas consultas, memorizado)
+        resumo = ResumoDashboard.da_requisicao(self.request)
+        context["livros_em_andamento"] = resumo.livros_em_andamento
+
+        # os cards leem os UserBooks já carregados ({% userbook livro %})
+        ResolvedorUserBook.da_requisicao(self.request).registrar(resumo.livros_em_andamento)
 
         # ✅ agregue, não sobrescreva
-        dashboard = {
-            "progresso_meta_mensal": user.progresso_meta_mensal,
-            "qtd_livros_ativos": int(livros_ativos),
-            "dias_consecutivos": int(dias_consecutivos),
-            "diario": dict(sorted(diario.items())),
-        }
         # Se já existir algo em context["dashboard"], preserve e atualize:
-        context.setdefault("dashboard", {}).update(dashboard)
+        context.setdefault("dashboard", {}).update(resumo.como_contexto())
+
+        # sem ASGI o /api/user/eventos só responde 503: nem inclui o script
+        context["eventos_ao_vivo"] = eventos.disponivel(self.request)
 
         return context
 
@@ -1,15 +1,33 @@
-from django.contrib.auth.decorators import login_required
-from django.views.generic import ListView
-from livros.models import Livro
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest
+from django.views.generic import TemplateView
+from ninja.errors import HttpError
 
+from livros.services import concluidos
 
-class LivroDoneListView(ListView):
-    model = Livro                          # modelo a ser listado
-    template_name = "livros/livros_concluidos.html"     # template usado
-    context_object_name = "livros_concluidos"          # nome da variável no template
-    paginate_by = 10                        # paginação automática (10 por página)
 
-    # opcional: personalizar a query
-    def get_queryset(self):
-        # exemplo: ordenar ou filtrar
-        return Livro.objects.all()
+class LivroDoneListView(LoginRequiredMixin, TemplateView):
+    """
+    Livros concluídos do usuário, do mais recente ao mais antigo.
+
+    Paginação por cursor (?cursor=...): uma consulta por página, sem COUNT
+    nem OFFSET; os totais do topo vêm do cache (concluidos.estatisticas).
+    """
+    template_name = "livros/livros_concluidos.html"
+    paginate_by = concluidos.TAMANHO_PAGINA
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        cursor = self.request.GET.get("cursor") or None
+        try:
+            pagina = concluidos.pagina(self.request.user, cursor=cursor, tamanho=self.paginate_by)
+        except HttpError as exc:  # cursor adulterado ou de outra ordenação
+            raise BadRequest(exc.message)
+
+        context.update({
+            "livros_concluidos": pagina["itens"],
+            "proximo_cursor": pagina["proximo_cursor"],
+            "primeira_pagina": cursor is None,
+            "estatisticas": concluidos.estatisticas(self.request.user),
+        })
+        return context
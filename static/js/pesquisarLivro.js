@@ -43,34 +43,22 @@
   let lastResults = [];
   let selectedBook = null;
 
-  // Busca (Google Books)
+  // Busca (servidor: catálogo local -> cache -> Google Books)
   async function searchBooks(q, signal) {
-    const url = `https://www.googleapis.com/books/v1/volumes?q=${encodeURIComponent(q)}&printType=books&maxResults=8&fields=items(id,volumeInfo/title,volumeInfo/authors,volumeInfo/pageCount,volumeInfo/imageLinks,volumeInfo/industryIdentifiers)`;
-    const res = await fetch(url, { signal });
+    const url = `/api/livros/buscar?q=${encodeURIComponent(q)}&limite=8`;
+    const res = await fetch(url, { signal, headers: { 'Accept': 'application/json' } });
     if (!res.ok) return [];
     const data = await res.json();
 
-    return (data.items || []).map(it => {
-      const v = it.volumeInfo || {};
-      const img = (v.imageLinks?.thumbnail || v.imageLinks?.smallThumbnail || "").replace(/^http:/, "https:");
-      const ids = v.industryIdentifiers || [];
-      const isbn13 = ids.find(x => x.type === "ISBN_13")?.identifier;
-      const isbn10 = ids.find(x => x.type === "ISBN_10")?.identifier;
-      const isbn = isbn13 || isbn10 || null;
-
-      const cover = img || (isbn
-        ? `https://covers.openlibrary.org/b/isbn/${encodeURIComponent(isbn)}-M.jpg`
-        : `https://api.dicebear.com/7.x/initials/svg?seed=${encodeURIComponent(v.title || q)}`);
-
-      return {
-        title: v.title || "",
-        authors: v.authors || [],
-        pageCount: v.pageCount,
-        isbn,
-        cover,
-        id: it.id
-      };
-    });
+    return (data || []).map(b => ({
+      title: b.titulo || "",
+      authors: b.autor ? b.autor.split(', ') : [],
+      pageCount: b.total_paginas ?? undefined,
+      isbn: b.isbn || null,
+      cover: b.capa_url || `https://api.dicebear.com/7.x/initials/svg?seed=${encodeURIComponent(b.titulo || q)}`,
+      id: b.google_id || "",
+      livroId: b.livro_id || null
+    }));
   }
 
   function render(items) {
@@ -169,8 +157,8 @@
     showSelectedMessage(book);
   });
 
-  // Busca com debounce — começa com 1 caractere
-  const MIN_CHARS = 1;
+  // Busca com debounce — começa com 2 caracteres (mínimo aceito pela API)
+  const MIN_CHARS = 2;
   const onInput = debounce(async (e) => {
     if (selectedBook) return;
 
@@ -0,0 +1,37 @@
+/**
+ * Dashboard ao vivo: assina o feed SSE de /api/user/eventos e atualiza, sem
+ * recarregar, os elementos marcados com data-ao-vivo (mês e sequência) e os
+ * cards dos livros em andamento (evento 'progresso-livro' na window).
+ * Só é incluído pelo dashboard quando o feed está disponível (ASGI e
+ * EVENTOS['ATIVO']). Um 503 faz o EventSource desistir sem reconectar.
+ */
+(function () {
+    if (!window.EventSource) return;
+
+    function preencher(nome, valor) {
+        document.querySelectorAll(`[data-ao-vivo="${nome}"]`).forEach(el => {
+            el.textContent = valor;
+        });
+    }
+
+    function aplicar(estado) {
+        const mes = estado.mes;
+        preencher('mes', mes.lidas);
+        preencher('mes-meta', mes.meta);
+        preencher('mes-pct', mes.pct);
+        preencher('mes-restante', mes.restante);
+        document.querySelectorAll('[data-ao-vivo="mes-barra"]').forEach(el => {
+            el.style.setProperty('--target', `${mes.pct}%`);
+        });
+        preencher('sequencia', estado.streak.vivo);
+
+        estado.livros.forEach(livro => {
+            window.dispatchEvent(new CustomEvent('progresso-livro', {detail: livro}));
+        });
+    }
+
+    const fonte = new EventSource('/api/user/eventos');
+    ['estado', 'progresso'].forEach(tipo => {
+        fonte.addEventListener(tipo, e => aplicar(JSON.parse(e.data)));
+    });
+})();